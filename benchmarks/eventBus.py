@@ -0,0 +1,127 @@
+# Encoding: utf-8
+# Module name: eventBus
+# Description: Throughput of the EventBus: untyped signal fan-out vs. topic dispatch vs. coalesced delivery
+
+# Usage: QT_QPA_PLATFORM=offscreen python -m benchmarks.eventBus [-m MESSAGES] [-s SUBSCRIBERS]
+
+# Imports (standard)
+from __future__ import annotations
+import argparse
+import sys
+import time
+
+# Imports (third party)
+from PySide6 import QtCore
+
+# Imports (local)
+from events.messages import GeometryProgress, ItemUpdated, OpenInTab
+from events.widgetEvents import EventBus
+
+
+# Class Subscriber:
+class Subscriber(QtCore.QObject):
+    """
+    Counts what it receives; `on_instruction` filters by string compare, as untyped subscribers must.
+    """
+
+    def __init__(self, topic: str):
+        super().__init__()
+        self.topic = topic
+        self.count = 0
+
+    def on_instruction(self, message: dict) -> None:
+        if message.get("command", "") == self.topic:
+            self.count += 1
+
+    def on_message(self, message) -> None:
+        self.count += 1
+
+
+# Time a callable:
+def _timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def run(messages: int, subscribers: int) -> list[tuple[str, float, int]]:
+    """
+    :return: (case, seconds, deliveries) for each case.
+    """
+
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication(sys.argv)
+    bus = EventBus.instance()
+
+    # One subscriber in ten listens to the published topic, the others to unrelated ones:
+    topics = [ItemUpdated.topic if index % 10 == 0 else OpenInTab.topic for index in range(subscribers)]
+    items = [object() for _ in range(100)]
+    results = []
+
+    # Untyped: every subscriber gets every message and compares strings.
+    receivers = [Subscriber(topic) for topic in topics]
+    for receiver in receivers:
+        bus.instruction.connect(receiver.on_instruction)
+    bus.coalesce(ItemUpdated.topic, False)
+
+    def untyped():
+        for index in range(messages):
+            bus.instruction.emit({"command": ItemUpdated.topic, "payload": {"item": items[index % 100]}})
+
+    seconds = _timed(untyped)
+    results.append(("signal fan-out", seconds, sum(receiver.count for receiver in receivers)))
+    for receiver in receivers:
+        bus.instruction.disconnect(receiver.on_instruction)
+
+    # Typed: the dispatch table calls only the topic's subscribers.
+    receivers = [Subscriber(topic) for topic in topics]
+    for receiver in receivers:
+        bus.subscribe(receiver.topic, receiver.on_message)
+
+    def typed():
+        for index in range(messages):
+            bus.publish(ItemUpdated(items[index % 100]))
+
+    seconds = _timed(typed)
+    results.append(("topic dispatch", seconds, sum(receiver.count for receiver in receivers)))
+
+    # Coalesced: repeated updates of the same item within a tick are delivered once.
+    for receiver in receivers:
+        receiver.count = 0
+    bus.coalesce(ItemUpdated.topic)
+
+    def coalesced():
+        for index in range(messages):
+            bus.publish(ItemUpdated(items[index % 100]))
+        app.processEvents()
+
+    seconds = _timed(coalesced)
+    results.append(("coalesced", seconds, sum(receiver.count for receiver in receivers)))
+
+    # Payload size (dataclasses with __slots__ vs. the dicts they replace):
+    message = GeometryProgress("map.shp", 1, 3, 2, 1000)
+    untyped_payload = {"command": message.topic, "payload": message.fields()}
+    results.append(("message bytes", sys.getsizeof(message), sys.getsizeof(untyped_payload["payload"])))
+
+    for receiver in receivers:
+        bus.unsubscribe(receiver.topic, receiver.on_message)
+
+    return results
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-m", "--messages", type=int, default=100_000)
+    parser.add_argument("-s", "--subscribers", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.messages} messages, {args.subscribers} subscribers")
+    for case, seconds, count in run(args.messages, args.subscribers):
+        if case == "message bytes":
+            print(f"{case:>16}: {seconds} (dataclass) vs {count} (dict)")
+        else:
+            print(f"{case:>16}: {seconds * 1e3:9.1f} ms  {args.messages / seconds:12,.0f} msg/s  {count} deliveries")
+
+
+if __name__ == "__main__":
+    main()
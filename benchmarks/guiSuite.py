@@ -0,0 +1,351 @@
+# Encoding: utf-8
+# Module name: guiSuite
+# Description: Offscreen canvas benchmarks on synthetic schematics, with a stored baseline to flag regressions
+
+# Usage:
+#   python -m benchmarks.guiSuite                          # Default cases, compared against benchmarks/baseline.json
+#   python -m benchmarks.guiSuite grid:4096 dag:2000:6000 -o report.json
+#   python -m benchmarks.guiSuite --save-baseline          # Record the default cases as the new baseline
+
+# Imports (standard)
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+
+# Default options:
+SuiteOpts = {
+    "cases": ("chain:1000", "grid:1024", "hub:1000", "dag:1000:2000"),  # Generator and arguments (see GENERATORS).
+    "steps": 20,  # Repaints per pan, zoom and drag phase.
+    "viewport": (1280, 800),
+    "baseline": os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json"),
+    "tolerance": 0.25,  # Relative slowdown (or growth of peak RSS) reported as a regression.
+    "floor": 0.005,  # Phases faster than this (seconds) in both runs are not compared; they are mostly noise.
+}
+
+PHASES = ("construct", "first-paint", "pan", "zoom", "drag", "select-all", "save", "load")
+
+
+# Peak resident set size of this process, in MB:
+def _peak_rss() -> float:
+
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # Bytes on macOS, KB elsewhere.
+
+
+# Scene records of a schematic (the input of GraphicsScene.insert_nodes):
+def records(schematic) -> tuple[list[dict], list[dict]]:
+    """
+    Every node gets one many-to-many input and output handle, so that any edge of the schematic can be drawn.
+    """
+
+    from PySide6 import QtCore
+    from ui.graph.node import NodeOpts
+
+    frame = QtCore.QRectF(NodeOpts["frame"])
+    n = schematic.nodes
+
+    def handle(uid: int, x: float) -> dict:
+        return {
+            "id": uid,
+            "name": "Flow",
+            "flow": "Flow",
+            "color": "#899878",
+            "cpos": {"x": x, "y": 0.0},
+            "connectivity": "MANY_TO_MANY",
+        }
+
+    nodes = [
+        {
+            "attr": {"id": index + 1, "name": f"N{index + 1}", "frame": QtCore.QRectF(frame)},
+            "database": {
+                "inp": [handle(n + 1 + index, frame.left())],
+                "out": [handle(2 * n + 1 + index, frame.right())],
+                "par": {},
+                "eqn": [],
+            },
+            "cpos": {"x": x, "y": y},
+        }
+        for index, (x, y) in enumerate(schematic.positions)
+    ]
+    edges = [{"origin": 2 * n + 1 + origin, "target": n + 1 + target} for origin, target in schematic.edges]
+    return nodes, edges
+
+
+# Time a phase:
+@contextlib.contextmanager
+def _phase(timings: dict, name: str):
+
+    start = time.perf_counter()
+    yield
+    timings[name] = time.perf_counter() - start
+
+
+# Run one case in this process:
+def run_case(case: str) -> dict:
+    """
+    :param case: "<generator>:<arg>[:<arg>...]", e.g. "dag:1000:2000".
+    :return: {"case", "schematic", "nodes", "edges", "items", "phases": {phase: seconds}, "peak_rss_mb"}.
+    """
+
+    from PySide6 import QtCore, QtGui, QtWidgets
+    from benchmarks.schematics import GENERATORS
+    from ui.components.graphicsView import GraphicsView
+    from ui.graph.graphicsScene import GraphicsScene
+    from ui.graph.clipboard import pack, unpack
+    from ui.graph.node import NodeItem
+
+    kind, *args = case.split(":")
+    schematic = GENERATORS[kind](*map(int, args))
+    nodes, edges = records(schematic)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    steps = SuiteOpts["steps"]
+
+    xs, ys = [x for x, _ in schematic.positions], [y for _, y in schematic.positions]
+    bounds = QtCore.QRectF(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)).adjusted(-500, -500, 500, 500)
+
+    scene = GraphicsScene(bounds)
+    view = GraphicsView(scene)
+    if QtGui.QGuiApplication.platformName() == "offscreen":
+        view.setViewport(QtWidgets.QWidget())  # OpenGL is not available offscreen.
+    view.resize(*SuiteOpts["viewport"])
+    view.show()
+    app.processEvents()
+
+    def frame():
+        app.processEvents()
+        view.viewport().repaint()
+
+    timings: dict[str, float] = {}
+
+    with _phase(timings, "construct"):
+        scene.insert_nodes(nodes, edges, keep_ids=True)
+        scene.touch()
+        app.processEvents()
+
+    with _phase(timings, "first-paint"):
+        view.centerOn(bounds.center())
+        frame()
+
+    # Pan diagonally across the schematic:
+    with _phase(timings, "pan"):
+        for step in range(steps):
+            t = step / max(1, steps - 1)
+            view.centerOn(bounds.left() + t * bounds.width(), bounds.top() + t * bounds.height())
+            frame()
+
+    # Zoom from the closest to the farthest level:
+    with _phase(timings, "zoom"):
+        view.centerOn(bounds.center())
+        low, high = view._zoom.min, view._zoom.max
+        for step in range(steps):
+            view.zoom = high - (high - low) * step / max(1, steps - 1)
+            frame()
+        view.zoom = 1.0
+
+    # Drag the most connected node (its edges follow):
+    degree = [0] * schematic.nodes
+    for origin, target in schematic.edges:
+        degree[origin] += 1
+        degree[target] += 1
+    uid = max(range(schematic.nodes), key=degree.__getitem__) + 1
+    node = scene.find_items([uid])[uid]
+    view.centerOn(node)
+
+    with _phase(timings, "drag"):
+        origin = node.pos()
+        for step in range(steps):
+            node.setPos(origin + QtCore.QPointF(10 * step, 5 * step))
+            frame()
+
+    # Rubber-band selection of everything:
+    with _phase(timings, "select-all"):
+        path = QtGui.QPainterPath()
+        path.addRect(scene.itemsBoundingRect())
+        scene.setSelectionArea(path)
+        frame()
+    scene.clearSelection()
+
+    # Save to and load from disk, through the canvas's snapshot format (see ui/components/tabManager.py):
+    handle, file = tempfile.mkstemp(suffix=".clmt")
+    os.close(handle)
+    try:
+        with _phase(timings, "save"):
+            with open(file, "wb") as stream:
+                stream.write(pack(scene.snapshot()))
+
+        with _phase(timings, "load"):
+            with open(file, "rb") as stream:
+                payload = unpack(stream.read())
+            loaded = GraphicsScene(bounds)
+            loaded.restore(payload)
+            view.setScene(loaded)
+            frame()
+
+        size = os.path.getsize(file)
+
+    finally:
+        os.remove(file)
+
+    return {
+        "case": case,
+        "schematic": schematic.name,
+        "nodes": sum(isinstance(item, NodeItem) for item in loaded.items()),
+        "edges": len(schematic.edges),
+        "items": len(loaded.items()),
+        "file_bytes": size,
+        "phases": timings,
+        "peak_rss_mb": round(_peak_rss(), 1),
+    }
+
+
+# Run each case in a fresh offscreen interpreter, so that peak RSS is per case:
+def run_suite(cases: list[str]) -> dict:
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "QT_QPA_PLATFORM": "offscreen"}
+
+    results = {}
+    for case in cases:
+        process = subprocess.run(
+            [sys.executable, "-m", "benchmarks.guiSuite", "--child", case],
+            cwd=root,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        lines = process.stdout.strip().splitlines()
+        if process.returncode != 0 or not lines:
+            results[case] = {"case": case, **_failure(process)}
+        else:
+            results[case] = json.loads(lines[-1])
+
+        print(_describe(results[case]), file=sys.stderr)
+
+    from PySide6 import __version__ as pyside
+
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pyside": pyside,
+            "machine": platform.platform(),
+            "steps": SuiteOpts["steps"],
+        },
+        "cases": results,
+    }
+
+
+# How a child process failed:
+def _failure(process: subprocess.CompletedProcess) -> dict:
+
+    code = process.returncode
+    if code < 0:
+        try:
+            status = f"killed by {signal.Signals(-code).name}"
+        except ValueError:
+            status = f"killed by signal {-code}"
+    else:
+        status = f"exit code {code}"
+
+    last = (process.stderr.strip().splitlines() or ["no output"])[-1]
+    return {"error": f"{status}: {last}", "returncode": code, "signal": -code if code < 0 else None}
+
+
+# One line per case:
+def _describe(result: dict) -> str:
+
+    if "error" in result:
+        return f"{result['case']:>16}: failed ({result['error']})"
+
+    phases = " ".join(f"{name} {seconds * 1e3:.0f}" for name, seconds in result["phases"].items())
+    return f"{result['case']:>16}: {phases} ms, peak {result['peak_rss_mb']:.0f} MB"
+
+
+# Regressions of a report against a baseline:
+def compare(report: dict, baseline: dict, tolerance: float = SuiteOpts["tolerance"]) -> list[str]:
+    """
+    :return: One message per failed case, and per phase (or peak RSS) that is more than `tolerance` worse than the
+             baseline; cases or phases missing from either side are not compared.
+    """
+
+    regressions = []
+    for case, result in report["cases"].items():
+        if "error" in result:
+            regressions.append(f"{case}: failed ({result['error']})")
+            continue
+
+        reference = baseline.get("cases", {}).get(case)
+        if reference is None or "error" in reference:
+            continue
+
+        for phase, seconds in result["phases"].items():
+            before = reference["phases"].get(phase)
+            if before is None or max(seconds, before) < SuiteOpts["floor"]:
+                continue
+            if seconds > before * (1 + tolerance):
+                regressions.append(f"{case} {phase}: {before * 1e3:.1f} -> {seconds * 1e3:.1f} ms")
+
+        before, after = reference["peak_rss_mb"], result["peak_rss_mb"]
+        if after > before * (1 + tolerance):
+            regressions.append(f"{case} peak RSS: {before:.0f} -> {after:.0f} MB")
+
+    return regressions
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description="Offscreen canvas benchmarks on synthetic schematics")
+    parser.add_argument("cases", nargs="*", default=list(SuiteOpts["cases"]), help="e.g. chain:1000 dag:1000:2000")
+    parser.add_argument("-o", "--output", help="Write the report (JSON) to this file", default=None)
+    parser.add_argument("-b", "--baseline", help="Baseline report to compare against", default=SuiteOpts["baseline"])
+    parser.add_argument("-t", "--tolerance", type=float, default=SuiteOpts["tolerance"])
+    parser.add_argument("--save-baseline", action="store_true", help="Store the report as the baseline")
+    parser.add_argument("--child", help=argparse.SUPPRESS, default=None)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_case(args.child)
+        print(json.dumps(result))
+        sys.stdout.flush()
+        os._exit(0)  # Skip the teardown of thousands of items; it is not measured.
+
+    report = run_suite(args.cases)
+    text = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    # Without a baseline, failed cases are still reported:
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    regressions = compare(report, baseline, args.tolerance)
+
+    for message in regressions:
+        print(f"Regression: {message}", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+# Encoding: utf-8
+# Module name: memoryAudit
+# Description: Bytes per node, edge and handle, broken down by sub-component, and how a canvas's footprint scales
+
+# Usage:
+#   python -m benchmarks.memoryAudit                  # Per-item breakdown and scaling, as a table
+#   python -m benchmarks.memoryAudit -o audit.json    # ... and as JSON, to track releases
+
+# Imports (standard)
+from __future__ import annotations
+import os
+import gc
+import sys
+import json
+import time
+import ctypes
+import argparse
+import platform
+import tracemalloc
+import subprocess
+from typing import Any, Callable
+
+# Default options:
+AuditOpts = {
+    "count": 500,  # Instances built per component.
+    "scaling": (250, 500, 1000, 2000),  # Grid sizes of the scaling run (one process each).
+    "sites": 8,  # Python allocation sites listed for a node.
+}
+
+
+# Class _MallInfo2 (glibc >= 2.33):
+class _MallInfo2(ctypes.Structure):
+    _fields_ = [
+        (name, ctypes.c_size_t)
+        for name in ("arena", "ordblks", "smblks", "hblks", "hblkhd", "usmblks", "fsmblks", "uordblks", "fordblks", "keepcost")
+    ]
+
+
+def _mallinfo() -> Callable[[], int] | None:
+
+    try:
+        function = ctypes.CDLL(None).mallinfo2
+    except (OSError, AttributeError):
+        return None
+
+    function.restype = _MallInfo2
+    return lambda: (info := function()).uordblks + info.hblkhd
+
+
+# Bytes of the C heap in use (Qt's allocations, and Python's larger objects), or None if unavailable:
+_heap = _mallinfo() or (lambda: None)
+
+# Python objects up to this size come from pymalloc's arenas, larger ones from the C heap:
+_SMALL_REQUEST = 512
+
+
+# Qt objects owned by an item, by class:
+def _qt_objects(item) -> dict[str, int]:
+
+    from PySide6 import QtCore, QtWidgets
+
+    counts: dict[str, int] = {}
+
+    def add(name: str):
+        counts[name] = counts.get(name, 0) + 1
+
+    def visit(obj):
+        if isinstance(obj, QtCore.QObject):
+            add(obj.metaObject().className())
+            for child in obj.findChildren(QtCore.QObject, options=QtCore.Qt.FindChildOption.FindDirectChildrenOnly):
+                if not isinstance(child, QtWidgets.QGraphicsItem):  # Child items are visited below.
+                    visit(child)
+        else:
+            add(type(obj).__name__)
+
+        if isinstance(obj, QtWidgets.QGraphicsItem):
+            for child in obj.childItems():
+                visit(child)
+
+    for part in item if isinstance(item, (list, tuple)) else (item,):
+        visit(part)
+
+    return counts
+
+
+# Measure `count` instances built by `build(context, index)`:
+def measure(setup: Callable[[int], Any], build: Callable[[Any, int], Any], count: int, release: Callable) -> dict:
+    """
+    :return: {"python", "native", "total"} in bytes per instance, and "sites" (Python allocations by source line).
+
+    Note:
+        - Two passes, each on fresh instances: the first reads the C heap without tracemalloc (whose bookkeeping
+          lives on the C heap), the second traces Python allocations.
+        - `native` is the C heap growth less Python's large objects; `python` is everything tracemalloc saw.
+    """
+
+    from PySide6 import QtWidgets
+
+    app = QtWidgets.QApplication.instance()
+
+    def run(trace: bool):
+        context = setup(count)
+        app.processEvents()
+        gc.collect()
+
+        if trace:
+            tracemalloc.start(1)
+        before = _heap()
+
+        items = [build(context, index) for index in range(count)]
+        app.processEvents()
+
+        after = _heap()
+        snapshot = tracemalloc.take_snapshot() if trace else None
+        tracemalloc.stop()
+
+        objects = _qt_objects(items[0]) if items and items[0] is not None else {}
+        release(context, items)
+        del items
+        app.processEvents()
+        gc.collect()
+        return before, after, snapshot, objects
+
+    before, after, _, objects = run(False)
+    _, _, snapshot, _ = run(True)
+
+    sizes = [trace.size for trace in snapshot.traces]
+    python = sum(sizes)
+    large = sum(size for size in sizes if size > _SMALL_REQUEST)
+    native = None if before is None else max(0, after - before - large)
+
+    sites = [
+        {"site": f"{os.path.relpath(stat.traceback[0].filename)}:{stat.traceback[0].lineno}", "bytes": stat.size / count}
+        for stat in snapshot.statistics("lineno")[: AuditOpts["sites"]]
+    ]
+
+    return {
+        "python": python / count,
+        "native": None if native is None else native / count,
+        "total": (python + (native or 0)) / count,
+        "qt_objects": objects,
+        "sites": sites,
+    }
+
+
+# The audited components:
+def components() -> dict[str, tuple[Callable, Callable, Callable]]:
+    """
+    :return: name -> (setup(count), build(context, index), release(context, items)).
+    """
+
+    from PySide6 import QtCore
+    from ui.components import Label, StaticLabel
+    from ui.graph.anchor import AnchorItem
+    from ui.graph.graphicsScene import GraphicsScene
+    from ui.graph.handle import HandleRole, HandleConnectivity
+    from ui.graph.image import Image
+    from ui.graph.node import NodeItem, NodeOpts, ResizeHandle
+
+    frame = NodeOpts["frame"]
+
+    def noop(*args):
+        pass
+
+    def position(index: int) -> QtCore.QPointF:
+        return QtCore.QPointF((index % 50) * 160.0, (index // 50) * 160.0)
+
+    def scene(count: int) -> GraphicsScene:
+        return GraphicsScene(QtCore.QRectF(0, 0, 50 * 160, (count // 50 + 1) * 160))
+
+    def nodes(count: int, handles: bool = False) -> tuple:
+        canvas = scene(count + 1)
+        items = []
+        for index in range(count + 1):
+            node = NodeItem(position(index))
+            canvas.addItem(node)
+            if handles:
+                node.create_handle(HandleRole.INP, QtCore.QPointF(frame.left(), 0), connectivity=HandleConnectivity.MANY_TO_MANY)
+                node.create_handle(HandleRole.OUT, QtCore.QPointF(frame.right(), 0), connectivity=HandleConnectivity.MANY_TO_MANY)
+            items.append(node)
+        return canvas, items
+
+    def release_scene(context, items):
+        canvas = context if isinstance(context, GraphicsScene) else context[0]
+        canvas.release()
+
+    def release_items(context, items):
+        for item in items:
+            for part in item if isinstance(item, tuple) else (item,):
+                part.deleteLater()
+
+    def add_node(canvas, index):
+        node = NodeItem(position(index))
+        canvas.addItem(node)
+        return node
+
+    def add_handle(context, index):
+        return context[1][index].create_handle(HandleRole.OUT, QtCore.QPointF(frame.right(), 0))
+
+    def add_edge(context, index):
+        canvas, items = context
+        return canvas.connect_handles(next(iter(items[index].database.out)), next(iter(items[index + 1].database.inp)))
+
+    def add_menu(context, index):
+        node = context[1][index]
+        node._menu = node._init_menu()
+        return node._menu
+
+    return {
+        "node": (scene, add_node, release_scene),
+        "label": (lambda count: None, lambda _, i: StaticLabel("Process", color=QtCore.Qt.GlobalColor.white, width=frame.width() - 4), release_items),
+        "label-editor": (lambda count: None, lambda _, i: Label("Process", color=QtCore.Qt.GlobalColor.white, width=frame.width() - 4), release_items),
+        "image": (
+            lambda count: None,
+            lambda _, i: Image(":/assets/icons/pack-svg/component.svg", size=QtCore.QSize(32, 32)),
+            release_items,
+        ),
+        "anchors": (
+            lambda count: None,
+            lambda _, i: (
+                AnchorItem(HandleRole.INP.value, cpos=QtCore.QPointF(frame.left(), 0), callback=noop),
+                AnchorItem(HandleRole.OUT.value, cpos=QtCore.QPointF(frame.right(), 0), callback=noop),
+            ),
+            release_items,
+        ),
+        "resize-handle": (lambda count: None, lambda _, i: ResizeHandle(callback=noop), release_items),
+        "menu": (nodes, add_menu, release_scene),
+        "handle": (nodes, add_handle, release_scene),
+        "edge": (lambda count: nodes(count, handles=True), add_edge, release_scene),
+    }
+
+
+# Parts of a node, measured on their own (the context menu and the label's editor are built on first use, so they are
+# listed separately):
+NODE_PARTS = ("label", "image", "anchors", "resize-handle")
+
+
+def audit(count: int = AuditOpts["count"]) -> dict:
+    """
+    :return: {"items": {name: measure(...)}, "node_breakdown": {part: bytes}}; the breakdown's "core" is the node's
+             total less its parts: the item itself, its Python state (`attr`, `database`), properties and scene index.
+    """
+
+    items = {}
+    for name, (setup, build, release) in components().items():
+        items[name] = measure(setup, build, count, release)
+
+    breakdown = {part: items[part]["total"] for part in NODE_PARTS}
+    breakdown["core"] = items["node"]["total"] - sum(breakdown.values())
+    return {"count": count, "items": items, "node_breakdown": breakdown}
+
+
+# C heap and Python memory of a whole canvas (run in a fresh process per size):
+def footprint(n: int) -> dict:
+
+    from PySide6 import QtCore, QtWidgets
+    from benchmarks.guiSuite import records
+    from benchmarks.schematics import grid
+    from ui.graph.graphicsScene import GraphicsScene
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    schematic = grid(n)
+    nodes, edges = records(schematic)
+
+    canvas = GraphicsScene(QtCore.QRectF(-500, -500, 1000 + schematic.positions[-1][0], 1000 + schematic.positions[-1][1]))
+    app.processEvents()
+    gc.collect()
+
+    before = _heap()
+    tracemalloc.start(1)
+    canvas.insert_nodes(nodes, edges, keep_ids=True)
+    app.processEvents()
+    python = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    after = _heap()
+
+    return {
+        "nodes": schematic.nodes,
+        "edges": len(schematic.edges),
+        "items": len(canvas.items()),
+        "python": python,
+        "heap": None if before is None else after - before,
+    }
+
+
+def scaling(sizes=AuditOpts["scaling"]) -> dict:
+    """
+    :return: {"runs": [footprint(n), ...], "per_node", "fixed"}: a least-squares fit of total bytes against nodes
+             (grids have about two edges per node, so `per_node` includes them).
+    """
+
+    import numpy as np
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = []
+    for n in sizes:
+        process = subprocess.run(
+            [sys.executable, "-m", "benchmarks.memoryAudit", "--child", str(n)],
+            cwd=root,
+            env=os.environ,
+            capture_output=True,
+            text=True,
+        )
+        lines = process.stdout.strip().splitlines()
+        if process.returncode == 0 and lines:
+            runs.append(json.loads(lines[-1]))
+
+    fit = {"per_node": None, "fixed": None}
+    if len(runs) >= 2 and all(run["heap"] is not None for run in runs):
+        x = np.array([run["nodes"] for run in runs], dtype=float)
+        y = np.array([run["python"] + run["heap"] for run in runs], dtype=float)
+        slope, intercept = np.polyfit(x, y, 1)
+        fit = {"per_node": float(slope), "fixed": float(intercept)}
+
+    return {"runs": runs, **fit}
+
+
+# Human-readable report:
+def _table(report: dict) -> str:
+
+    def kb(value):
+        return "     n/a" if value is None else f"{value / 1024:8.1f}"
+
+    lines = [f"Per instance (KB), {report['audit']['count']} instances each:", f"{'':<14} {'python':>8} {'native':>8} {'total':>8}  Qt objects"]
+    for name, entry in report["audit"]["items"].items():
+        objects = ", ".join(f"{count} {cls}" for cls, count in sorted(entry["qt_objects"].items()))
+        lines.append(f"{name:<14} {kb(entry['python'])} {kb(entry['native'])} {kb(entry['total'])}  {objects}")
+
+    lines.append("")
+    lines.append("Node breakdown (KB):")
+    total = report["audit"]["items"]["node"]["total"]
+    for part, value in report["audit"]["node_breakdown"].items():
+        lines.append(f"  {part:<14} {kb(value)}  ({100 * value / total:4.1f}%)")
+
+    lines.append("")
+    lines.append("Python allocation sites of a node (bytes):")
+    for site in report["audit"]["items"]["node"]["sites"]:
+        lines.append(f"  {site['bytes']:8.0f}  {site['site']}")
+
+    scale = report["scaling"]
+    if scale["runs"]:
+        lines.append("")
+        lines.append("Canvas footprint (grids):")
+        for run in scale["runs"]:
+            total = run["python"] + (run["heap"] or 0)
+            lines.append(f"  {run['nodes']:6d} nodes {run['edges']:6d} edges  {total / 2**20:8.1f} MB")
+        if scale["per_node"] is not None:
+            lines.append(f"  fit: {scale['per_node'] / 1024:.1f} KB per node (with its edges) + {scale['fixed'] / 2**20:.1f} MB")
+
+    return "\n".join(lines)
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description="Per-item memory audit of the canvas")
+    parser.add_argument("-n", "--count", type=int, default=AuditOpts["count"], help="Instances built per component")
+    parser.add_argument("-s", "--scaling", type=int, nargs="*", default=list(AuditOpts["scaling"]), help="Grid sizes")
+    parser.add_argument("-o", "--output", help="Also write the report (JSON) to this file", default=None)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS, default=None)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PySide6 import QtWidgets
+    import opts
+    import resources  # Node icons come from the compiled resources.
+
+    if args.child is not None:
+        QtWidgets.QApplication(sys.argv[:1])
+        print(json.dumps(footprint(args.child)))
+        sys.stdout.flush()
+        os._exit(0)  # Skip the teardown; it is not measured.
+
+    app = QtWidgets.QApplication(sys.argv[:1])
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "version": opts.ClimactMeta.app_version,
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "native_heap": _heap() is not None,
+        },
+        "audit": audit(args.count),
+        "scaling": scaling(args.scaling),
+    }
+
+    print(_table(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
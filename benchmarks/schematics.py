@@ -0,0 +1,122 @@
+# Encoding: utf-8
+# Module name: schematics
+# Description: Synthetic schematics (chains, grids, hub-and-spoke layouts, random DAGs) for benchmarks
+
+# Imports (standard)
+from __future__ import annotations
+import math
+import random
+import dataclasses
+
+# Default options:
+SchematicOpts = {
+    "spacing": 160.0,  # Distance between neighbouring nodes (scene units).
+    "seed": 7,  # Seed of the random generators, so that runs are reproducible.
+}
+
+
+# Class Schematic:
+@dataclasses.dataclass(slots=True)
+class Schematic:
+    """
+    A generated schematic: node positions and edges between node indices (`origin` -> `target`).
+    """
+
+    name: str
+    positions: list[tuple[float, float]]
+    edges: list[tuple[int, int]]
+
+    @property
+    def nodes(self) -> int:
+        return len(self.positions)
+
+
+# Nodes in rows of `width`, left to right:
+def _rows(count: int, width: int, spacing: float) -> list[tuple[float, float]]:
+    return [((index % width) * spacing, (index // width) * spacing) for index in range(count)]
+
+
+# A chain of `n` nodes, laid out in a serpentine so that it stays roughly square:
+def chain(n: int, spacing: float = SchematicOpts["spacing"]) -> Schematic:
+
+    width = max(1, math.isqrt(n))
+    positions = []
+    for index in range(n):
+        row, column = divmod(index, width)
+        if row % 2:
+            column = width - 1 - column
+        positions.append((column * spacing, row * spacing))
+
+    return Schematic(f"chain-{n}", positions, [(index, index + 1) for index in range(n - 1)])
+
+
+# A grid of about `n` nodes, each connected to its right and lower neighbours:
+def grid(n: int, spacing: float = SchematicOpts["spacing"]) -> Schematic:
+
+    width = max(1, math.isqrt(n))
+    rows = max(1, n // width)
+    count = width * rows
+
+    edges = []
+    for index in range(count):
+        row, column = divmod(index, width)
+        if column + 1 < width:
+            edges.append((index, index + 1))
+        if row + 1 < rows:
+            edges.append((index, index + width))
+
+    return Schematic(f"grid-{count}", _rows(count, width, spacing), edges)
+
+
+# `hubs` hubs, each feeding an equal share of the other `n - hubs` nodes placed on a ring around it:
+def hub(n: int, hubs: int = 8, spacing: float = SchematicOpts["spacing"]) -> Schematic:
+
+    hubs = max(1, min(hubs, n))
+    spokes = n - hubs
+    per_hub = math.ceil(spokes / hubs) if spokes else 0
+    radius = max(spacing, per_hub * spacing / (2 * math.pi))
+    columns = max(1, math.isqrt(hubs))
+
+    positions: list[tuple[float, float]] = []
+    centers = []
+    for index in range(hubs):
+        cx = (index % columns) * (2 * radius + 2 * spacing)
+        cy = (index // columns) * (2 * radius + 2 * spacing)
+        centers.append((cx, cy))
+        positions.append((cx, cy))
+
+    edges = []
+    for index in range(spokes):
+        owner, slot = divmod(index, per_hub)
+        angle = 2 * math.pi * slot / per_hub
+        cx, cy = centers[owner]
+        edges.append((owner, len(positions)))
+        positions.append((cx + radius * math.cos(angle), cy + radius * math.sin(angle)))
+
+    return Schematic(f"hub-{n}", positions, edges)
+
+
+# A random DAG of `n` nodes and (up to) `e` distinct edges, in layers of about sqrt(n) nodes:
+def dag(n: int, e: int, seed: int = SchematicOpts["seed"], spacing: float = SchematicOpts["spacing"]) -> Schematic:
+    """
+    Edges always go from a lower to a higher node index, so the graph is acyclic; nodes are laid out in index order,
+    one layer per row.
+    """
+
+    rng = random.Random(seed)
+    limit = n * (n - 1) // 2
+    edges: set[tuple[int, int]] = set()
+    while len(edges) < min(e, limit):
+        origin, target = sorted(rng.sample(range(n), 2))
+        edges.add((origin, target))
+
+    width = max(1, math.isqrt(n))
+    return Schematic(f"dag-{n}-{e}", _rows(n, width, spacing), sorted(edges))
+
+
+# Generators by name, for the command line (see benchmarks/guiSuite.py):
+GENERATORS = {"chain": chain, "grid": grid, "hub": hub, "dag": dag}
+
+
+# Exported names
+__all__ = ["SchematicOpts", "Schematic", "GENERATORS", "chain", "grid", "hub", "dag"]
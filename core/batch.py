@@ -0,0 +1,180 @@
+# Encoding: utf-8
+# Module name: batch
+# Description: Headless pipeline that loads, validates, solves and exports a project without Qt
+
+# Imports (standard)
+from __future__ import annotations
+import os
+import csv
+import json
+import time
+import logging
+
+# Imports (third party)
+import numpy as np
+
+# Imports (local)
+from core.project import load_project
+from core.graphModel import GraphModel
+from core.validation import validate
+
+logger = logging.getLogger(__name__)
+
+
+# Exit codes:
+EXIT_OK = 0
+EXIT_INVALID = 2
+EXIT_SOLVER = 3
+
+
+# Write solver results to disk:
+def export_results(model: GraphModel, result, issues: list, output: str, timings: dict) -> None:
+    """
+    Write `summary.json` and, if the model was solved, `flows.csv` into the output directory.
+    """
+
+    os.makedirs(output, exist_ok=True)
+
+    summary = {
+        "nodes": model.num_nodes,
+        "edges": model.num_edges,
+        "epochs": model.epochs,
+        "issues": [issue.to_dict() for issue in issues],
+        "timings": timings,
+    }
+
+    if result is not None:
+        summary.update(
+            status=result.status, message=result.message, objective=result.objective
+        )
+
+        with open(os.path.join(output, "flows.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["origin", "target", "stream", "epoch", "flow"])
+            for edge in range(model.num_edges):
+                origin, target = model.edge_origin[edge], model.edge_target[edge]
+                for epoch in range(model.epochs):
+                    writer.writerow(
+                        [
+                            int(model.handle_ids[origin]),
+                            int(model.handle_ids[target]),
+                            model.streams[model.handle_stream[origin]],
+                            epoch,
+                            float(result.flows[edge, epoch]),
+                        ]
+                    )
+
+    with open(os.path.join(output, "summary.json"), "w") as file:
+        json.dump(summary, file, indent=2)
+
+
+# Run the headless pipeline:
+def run_batch(project: str, output: str, solve: bool = True) -> int:
+    """
+    Load a project, build its model, validate it, optionally solve it and export the results.
+    :param project: Path to the project file.
+    :param output: Directory for the exported results.
+    :param solve: Whether to run the solver after validation.
+    :return: A process exit code.
+    """
+
+    timings = {}
+    clock = time.perf_counter()
+
+    model = GraphModel.from_dict(load_project(project))
+    timings["load"] = time.perf_counter() - clock
+
+    clock = time.perf_counter()
+    issues = validate(model)
+    timings["validate"] = time.perf_counter() - clock
+
+    errors = [issue for issue in issues if issue.severity == "error"]
+    for issue in issues:
+        logger.log(
+            logging.ERROR if issue.severity == "error" else logging.WARNING,
+            issue.message,
+        )
+
+    result = None
+    if solve and not errors:
+
+        # Import the solver lazily, SciPy dominates the start-up cost:
+        from core.solver import solve as solve_model
+
+        clock = time.perf_counter()
+        result = solve_model(model)
+        timings["solve"] = time.perf_counter() - clock
+
+    export_results(model, result, issues, output, timings)
+    logger.info(f"Results written to {output}")
+
+    if errors:
+        return EXIT_INVALID
+
+    if result is not None and not result.success:
+        logger.error(f"Solver failed: {result.message}")
+        return EXIT_SOLVER
+
+    return EXIT_OK
+
+
+# Run a parameter sweep:
+def run_sweep(project: str, spec: str, output: str) -> int:
+    """
+    Run a parameter sweep described by a JSON file and store the results in the output directory.
+
+    Layout of the sweep file (parameters are addressed as "<node id>:<parameter name>"):
+        {"grid": {"<node id>:<name>": [v1, v2, ...], ...}}
+        {"lhs": {"bounds": {"<node id>:<name>": [lower, upper], ...}, "samples": <int>, "seed": <int>}}
+
+    :param project: Path to the project file.
+    :param spec: Path to the sweep file.
+    :param output: Directory of the (resumable) result store.
+    :return: A process exit code.
+    """
+
+    from core.sweep import SweepRunner, latin_hypercube, parameter_grid
+
+    model = GraphModel.from_dict(load_project(project))
+    errors = [issue for issue in validate(model) if issue.severity == "error"]
+    if errors:
+        for issue in errors:
+            logger.error(issue.message)
+        return EXIT_INVALID
+
+    with open(spec, "r") as file:
+        spec = json.load(file)
+
+    parse = lambda key: (int(key.split(":", 1)[0]), key.split(":", 1)[1])
+    if "grid" in spec:
+        scenarios = parameter_grid({parse(k): v for k, v in spec["grid"].items()})
+    else:
+        lhs = spec["lhs"]
+        scenarios = latin_hypercube(
+            {parse(k): tuple(v) for k, v in lhs["bounds"].items()},
+            int(lhs["samples"]),
+            lhs.get("seed", None),
+        )
+
+    runner = SweepRunner(
+        model,
+        scenarios,
+        output,
+        progress=lambda done, total: logger.info(f"Sweep progress: {done}/{total}"),
+    )
+    results = runner.run()
+
+    failed = int(np.count_nonzero(results["status"] != 0))
+    logger.info(f"Sweep finished: {len(results['status'])} scenarios, {failed} failed")
+    return EXIT_OK if not failed else EXIT_SOLVER
+
+
+# Exported names
+__all__ = [
+    "run_batch",
+    "run_sweep",
+    "export_results",
+    "EXIT_OK",
+    "EXIT_INVALID",
+    "EXIT_SOLVER",
+]
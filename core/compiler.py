@@ -0,0 +1,336 @@
+# Encoding: utf-8
+# Module name: compiler
+# Description: Vectorized assembly of sparse flow-balance constraints from a GraphModel
+
+# Imports (standard)
+from __future__ import annotations
+import dataclasses
+
+# Imports (third party)
+import numpy as np
+from scipy import sparse
+
+# Imports (local)
+from core.graphModel import GraphModel, ROLE_INP, ROLE_OUT
+from core.equations import EquationError, compile_equation
+
+
+# Class BalanceBlock:
+@dataclasses.dataclass
+class BalanceBlock:
+    """
+    Constraints of a single epoch; every epoch shares the same structure and differs only in its data.
+
+    Layout:
+        - Column `edge` is the flow on `edges[edge]`.
+        - Data that may vary over epochs (`b_eq`, `b_ub`, `cost`) carries a trailing epoch axis.
+        - Equation rows (see core.equations) have per-epoch coefficients and are stored as COO entries
+          (`eqn_row`, `eqn_col`, `eqn_val`) instead of a single-epoch matrix.
+    """
+
+    epochs: int
+    edges: np.ndarray  # Indices (into the model's edge columns) of the edges that became variables.
+
+    a_eq: sparse.csr_matrix  # (rows, edges)
+    b_eq: np.ndarray  # (rows, epochs)
+    a_ub: sparse.csr_matrix  # (capacity rows, edges)
+    b_ub: np.ndarray  # (capacity rows, epochs)
+    cost: np.ndarray  # (edges, epochs)
+
+    row_node: np.ndarray  # Node index of each equality row.
+    row_stream: np.ndarray  # Stream index of each equality row.
+    cap_node: np.ndarray  # Node index of each capacity row.
+
+    upper: np.ndarray | None = None  # Per-column upper bound (default: unbounded).
+
+    # Equation rows:
+    eqn_row: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, np.int64))
+    eqn_col: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, np.int64))
+    eqn_val: np.ndarray | None = None  # (entries, epochs)
+    eqn_b: np.ndarray | None = None  # (equation rows, epochs)
+    eqn_node: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, np.int64))
+
+
+# Class BalanceSystem:
+@dataclasses.dataclass
+class BalanceSystem:
+    """
+    Constraint matrices of the flow-balance problem over all epochs.
+
+    Layout:
+        - Columns are epoch-major: column `epoch * len(edges) + edge` is the flow on `edges[edge]` in `epoch`.
+        - Equality and capacity rows are epoch-major as well; equation rows follow the balance rows.
+    """
+
+    epochs: int
+    edges: np.ndarray
+
+    a_eq: sparse.csr_matrix
+    b_eq: np.ndarray
+    a_ub: sparse.csr_matrix
+    b_ub: np.ndarray
+    cost: np.ndarray
+    upper: np.ndarray  # Upper bound of every column (lower bounds are zero).
+
+    @property
+    def num_vars(self) -> int:
+        return self.a_eq.shape[1]
+
+
+# Compile the incidence matrix of one epoch:
+def incidence(model: GraphModel, edges: np.ndarray | None = None) -> tuple:
+    """
+    Build the (node, stream) x edge incidence matrix of a single epoch directly from the edge columns.
+    Rows exist for every (node, stream) pair that appears on a handle of a node with at least one input and no
+    equations.
+    :param model: The model.
+    :param edges: Edge indices to include (default: all edges with valid endpoints).
+    :return: (matrix, row_node, row_stream, edges)
+    :raises ValueError: If an edge connects handles of different streams.
+    """
+
+    if edges is None:
+        edges = np.flatnonzero((model.edge_origin >= 0) & (model.edge_target >= 0))
+
+    streams = max(1, len(model.streams))
+    origin = model.edge_origin[edges]
+    target = model.edge_target[edges]
+
+    # Nodes with an input handle get balance rows:
+    balanced = np.zeros(model.num_nodes, dtype=bool)
+    balanced[model.handle_node[model.handle_role == ROLE_INP]] = True
+    balanced[[node for node, eqn in enumerate(model.node_eqn) if eqn]] = False
+
+    # One row key per (node, stream) pair of the balanced nodes' handles:
+    handle_keys = (
+        model.handle_node.astype(np.int64) * streams + model.handle_stream
+    )[balanced[model.handle_node]]
+    keys = np.unique(handle_keys)
+
+    # Entries: +1 where an edge enters a node, -1 where it leaves:
+    stream = model.handle_stream[origin].astype(np.int64)
+    node = np.concatenate([model.handle_node[target], model.handle_node[origin]])
+    sign = np.concatenate([np.ones(len(edges)), -np.ones(len(edges))])
+    cols = np.concatenate([np.arange(len(edges)), np.arange(len(edges))])
+    entry = node.astype(np.int64) * streams + np.concatenate([stream, stream])
+
+    mask = balanced[node]
+    rows = np.searchsorted(keys, entry[mask])
+
+    # An entry without a row means that the edge's ends carry different streams (see core.validation):
+    found = rows < len(keys)
+    found[found] = keys[rows[found]] == entry[mask][found]
+    if not found.all():
+        bad = np.unique(np.flatnonzero(mask)[~found] % len(edges))
+        raise ValueError(
+            f"Edge(s) {edges[bad].tolist()} connect handles of different streams and cannot be balanced"
+        )
+
+    matrix = sparse.csr_matrix(
+        (sign[mask], (rows, cols[mask])), shape=(len(keys), len(edges))
+    )
+    return matrix, (keys // streams).astype(np.int32), (keys % streams).astype(np.int32), edges
+
+
+# Compile the equation rows of every node that has equations:
+def equations(model: GraphModel, edges: np.ndarray) -> tuple:
+    """
+    Build the rows of the nodes' equations (see core.equations for the syntax).
+    Nodes with identical equation lists (e.g. instances of one template) are evaluated together in one kernel call.
+    :param model: The model.
+    :param edges: Edge indices that became variables.
+    :return: (row, col, val, b, row_node) with `val` of shape (entries, epochs) and `b` of shape (rows, epochs).
+    """
+
+    groups: dict[tuple[str, ...], list[int]] = {}
+    for node, eqn in enumerate(model.node_eqn):
+        if eqn:
+            groups.setdefault(tuple(eqn), []).append(node)
+
+    empty = np.empty(0, np.int64)
+    if not groups:
+        return empty, empty, np.zeros((0, model.epochs)), np.zeros((0, model.epochs)), empty
+
+    # Edge ends (INP ends are targets, OUT ends are origins) on nodes with equations, sorted by
+    # (group, role, stream) so that every variable of a group maps to a contiguous slice:
+    group_of = np.full(model.num_nodes, -1, dtype=np.int64)
+    position = np.zeros(model.num_nodes, dtype=np.int64)
+    for index, nodes in enumerate(groups.values()):
+        group_of[nodes] = index
+        position[nodes] = np.arange(len(nodes))
+
+    streams = max(1, len(model.streams))
+    stream = np.tile(model.handle_stream[model.edge_origin[edges]], 2).astype(np.int64)
+    owner = model.handle_node[np.concatenate([model.edge_target[edges], model.edge_origin[edges]])]
+    role = np.repeat(np.array([ROLE_INP, ROLE_OUT], dtype=np.int64), len(edges))
+    col = np.tile(np.arange(len(edges)), 2)
+
+    mask = group_of[owner] >= 0
+    keys = (group_of[owner[mask]] * 2 + role[mask]) * streams + stream[mask]
+    order = np.argsort(keys, kind="stable")
+    keys, owner, col = keys[order], owner[mask][order], col[mask][order]
+
+    label = {name: index for index, name in enumerate(model.streams)}
+    matrices: dict[str, np.ndarray] = {}
+    rows, cols, vals, b, row_node = [], [], [], [], []
+    offset = 0
+
+    for index, (eqns, nodes) in enumerate(groups.items()):
+        for text in eqns:
+            equation = compile_equation(text)
+
+            # Parameters of every node of the group as (nodes, epochs) matrices:
+            par = {}
+            for name in equation.parameters:
+                if name not in matrices:
+                    matrices[name] = model.parameter_matrix(name, np.nan)
+                par[name] = matrices[name][nodes]
+                if np.isnan(par[name]).any():
+                    node = nodes[int(np.isnan(par[name]).any(axis=1).argmax())]
+                    raise EquationError(
+                        f"Missing or non-numeric parameter '{name}' on {model.node_names[node]}: {text}"
+                    )
+
+            coef, const = equation.coefficients(par, (len(nodes), model.epochs))
+
+            for variable, (var_role, var_stream) in enumerate(equation.variables):
+                if var_stream not in label:
+                    continue
+                key = (index * 2 + var_role) * streams + label[var_stream]
+                lo, hi = np.searchsorted(keys, [key, key + 1])
+                rows.append(offset + position[owner[lo:hi]])
+                cols.append(col[lo:hi])
+                vals.append(coef[variable][position[owner[lo:hi]]])
+
+            b.append(-const)
+            row_node.append(np.asarray(nodes, dtype=np.int64))
+            offset += len(nodes)
+
+    return (
+        np.concatenate(rows) if rows else empty,
+        np.concatenate(cols) if cols else empty,
+        np.concatenate(vals) if vals else np.zeros((0, model.epochs)),
+        np.concatenate(b),
+        np.concatenate(row_node),
+    )
+
+
+# Compile the constraints of one epoch:
+def compile_block(model: GraphModel) -> BalanceBlock:
+    """
+    Assemble the single-epoch constraints of the flow-balance problem.
+
+    Rules:
+        - Nodes with inputs and outputs conserve every stream they carry (inflow - outflow = 0).
+        - Nodes with equations are constrained by their equations instead of by conservation.
+        - Nodes without outputs (sinks) absorb their `demand` parameter on every input stream.
+        - Nodes with a `capacity` parameter bound their total outflow.
+        - Each edge costs its origin node's `cost` parameter (default 1) per unit of flow.
+
+    :param model: The model to compile.
+    :return: A BalanceBlock.
+    """
+
+    block, row_node, row_stream, edges = incidence(model)
+    eqn_row, eqn_col, eqn_val, eqn_b, eqn_node = equations(model, edges)
+
+    # Right-hand side: demand on the rows of sink nodes, zero elsewhere:
+    has_out = np.zeros(model.num_nodes, dtype=bool)
+    has_out[model.handle_node[model.handle_role == ROLE_OUT]] = True
+    demand = model.parameter_matrix("demand", 0.0)  # (nodes, epochs)
+    b_eq = np.where(has_out[row_node][:, None], 0.0, demand[row_node])
+
+    # Capacity rows on total outflow:
+    origin_node = model.handle_node[model.edge_origin[edges]]
+    capacity = model.parameter_matrix("capacity", np.nan)
+    cap_node = np.flatnonzero(~np.isnan(capacity).all(axis=1)).astype(np.int32)
+    cap_row = np.full(model.num_nodes, -1, dtype=np.int64)
+    cap_row[cap_node] = np.arange(len(cap_node))
+
+    mask = cap_row[origin_node] >= 0
+    cap_block = sparse.csr_matrix(
+        (np.ones(int(mask.sum())), (cap_row[origin_node[mask]], np.flatnonzero(mask))),
+        shape=(len(cap_node), len(edges)),
+    )
+
+    return BalanceBlock(
+        epochs=model.epochs,
+        edges=edges,
+        a_eq=block,
+        b_eq=b_eq,
+        a_ub=cap_block,
+        b_ub=np.nan_to_num(capacity[cap_node], nan=np.inf),
+        cost=model.parameter_matrix("cost", 1.0)[origin_node],
+        row_node=row_node,
+        row_stream=row_stream,
+        cap_node=cap_node,
+        eqn_row=eqn_row,
+        eqn_col=eqn_col,
+        eqn_val=eqn_val,
+        eqn_b=eqn_b,
+        eqn_node=eqn_node,
+    )
+
+
+# Expand a single-epoch block over all epochs:
+def expand(block: BalanceBlock) -> BalanceSystem:
+    """
+    Expand a BalanceBlock into the block-diagonal multi-epoch system.
+    """
+
+    ident = sparse.identity(block.epochs, format="csr")
+    upper = (
+        np.full(len(block.edges), np.inf) if block.upper is None else block.upper
+    )
+
+    a_eq, b_eq = sparse.kron(ident, block.a_eq, format="csr"), block.b_eq.T.ravel()
+
+    # Equation rows: replicate the entries per epoch with their per-epoch coefficients:
+    if block.eqn_b is not None and len(block.eqn_b):
+        count, epoch = len(block.eqn_b), np.arange(block.epochs)
+        eqn = sparse.csr_matrix(
+            (
+                block.eqn_val.T.ravel(),
+                (
+                    (epoch[:, None] * count + block.eqn_row).ravel(),
+                    (epoch[:, None] * len(block.edges) + block.eqn_col).ravel(),
+                ),
+            ),
+            shape=(count * block.epochs, len(block.edges) * block.epochs),
+        )
+        a_eq = sparse.vstack([a_eq, eqn], format="csr")
+        b_eq = np.concatenate([b_eq, block.eqn_b.T.ravel()])
+
+    return BalanceSystem(
+        epochs=block.epochs,
+        edges=block.edges,
+        a_eq=a_eq,
+        b_eq=b_eq,
+        a_ub=sparse.kron(ident, block.a_ub, format="csr"),
+        b_ub=block.b_ub.T.ravel(),
+        cost=block.cost.T.ravel(),
+        upper=np.tile(upper, block.epochs),
+    )
+
+
+# Compile the full multi-epoch system:
+def compile_balance(model: GraphModel) -> BalanceSystem:
+    """
+    Assemble the flow-balance problem solved by `core.solver.solve` (see `compile_block` for the rules).
+    :param model: The model to compile.
+    :return: A BalanceSystem.
+    """
+
+    return expand(compile_block(model))
+
+
+# Exported names
+__all__ = [
+    "BalanceBlock",
+    "BalanceSystem",
+    "incidence",
+    "equations",
+    "compile_block",
+    "expand",
+    "compile_balance",
+]
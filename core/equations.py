@@ -0,0 +1,296 @@
+# Encoding: utf-8
+# Module name: equations
+# Description: Parser and compiler for the user-written equations in NodeItem.database["eqn"]
+
+# Imports (standard)
+from __future__ import annotations
+import re
+import ast
+import dataclasses
+import functools
+from typing import Any, Callable, Mapping
+
+# Imports (third party)
+import numpy as np
+
+# Imports (local)
+from core.graphModel import broadcast, ROLE_INP, ROLE_OUT
+
+
+# Equation syntax:
+#   - `inp.<Stream>` and `out.<Stream>` are the node's total inflow and outflow of a stream; use
+#     `inp["Natural gas"]` for labels that are not valid identifiers.
+#   - Bare names are node parameters (NodeItem.database["par"]).
+#   - Operators: + - * / ** and parentheses; functions: min, max, abs, exp, log, sqrt.
+#   - Exactly one `=` separates the two sides, e.g. "out.Electricity = efficiency * inp.Coal".
+EqnOpts = {
+    "roles": {"inp": ROLE_INP, "out": ROLE_OUT},
+    "functions": {
+        "min": "minimum",
+        "max": "maximum",
+        "abs": "abs",
+        "exp": "exp",
+        "log": "log",
+        "sqrt": "sqrt",
+    },
+}
+
+_SPLIT = re.compile(r"(?<![<>=!])=(?!=)")
+_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Attribute, ast.Subscript,
+    ast.Constant, ast.Load, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd,
+)
+
+
+# Class EquationError:
+class EquationError(ValueError):
+    """
+    Raised for equations that cannot be parsed, compiled or evaluated.
+    """
+
+
+# Class CompiledEquation:
+@dataclasses.dataclass(frozen=True)
+class CompiledEquation:
+    """
+    An equation compiled to a vectorized residual kernel.
+
+    Note:
+        - `kernel(F, P)` returns `lhs - rhs`, where `F[i]` is the flow of `variables[i]` and `P` maps parameter
+          names to values. Any NumPy broadcasting is allowed, so one call can evaluate every epoch (or scenario).
+        - Instances are shared between all nodes with the same equation text (see `compile_equation`).
+    """
+
+    text: str
+    variables: tuple[tuple[int, str], ...]  # (role, stream label) of every flow the equation references.
+    parameters: tuple[str, ...]
+    linear: bool  # Whether the residual is affine in the flows.
+    kernel: Callable[[Any, Mapping[str, Any]], np.ndarray]
+
+    # Evaluate the residual:
+    def residual(self, flows: Mapping[tuple[int, str], Any], par: Mapping[str, Any]) -> np.ndarray:
+        """
+        Evaluate `lhs - rhs`.
+        :param flows: Maps (role, stream label) to flow values; missing flows are zero.
+        :param par: Maps parameter names to values.
+        :return: The residual, broadcast over the inputs.
+        """
+
+        try:
+            return np.asarray(self.kernel([flows.get(v, 0.0) for v in self.variables], par), dtype=np.float64)
+        except (OverflowError, ZeroDivisionError) as error:
+            raise EquationError(f"Cannot evaluate '{self.text}': {error}") from None
+
+    # Extract the linear form:
+    def coefficients(self, par: Mapping[str, Any], shape: tuple[int, ...]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the linear form `sum(coef[i] * flow[i]) + const = 0` of the equation.
+        :param par: Maps parameter names to scalars or arrays broadcastable to `shape`.
+        :param shape: Shape of the evaluation, e.g. (epochs,) for one node or (nodes, epochs) for many.
+        :return: (coef of shape (variables, *shape), const of shape `shape`)
+        """
+
+        if not self.linear:
+            raise EquationError(f"Equation is not linear in its flows: {self.text}")
+
+        # Evaluate once at zero and once per unit vector, all in a single kernel call:
+        count = len(self.variables)
+        basis = np.eye(count + 1, count).reshape(count + 1, count, *(1,) * len(shape))
+        flows = [basis[:, index] for index in range(count)]
+        try:
+            values = np.broadcast_to(self.kernel(flows, par), (count + 1, *shape))
+        except (OverflowError, ZeroDivisionError) as error:
+            raise EquationError(f"Cannot evaluate '{self.text}': {error}") from None
+
+        if not np.isfinite(values).all():
+            raise EquationError(f"Equation has non-finite coefficients: {self.text}")
+
+        const = values[count]
+        return values[:count] - const, const
+
+
+# Translate the parsed AST into a kernel expression and collect its symbols:
+class _Translator(ast.NodeTransformer):
+
+    def __init__(self):
+        self.variables: dict[tuple[int, str], int] = {}
+        self.parameters: dict[str, None] = {}
+
+    # Flow reference -> F[index]:
+    def _flow(self, role: str, stream: str, node: ast.AST) -> ast.AST:
+        index = self.variables.setdefault((EqnOpts["roles"][role], stream), len(self.variables))
+        result = ast.Subscript(ast.Name("F", ast.Load()), ast.Constant(index), ast.Load())
+        return ast.copy_location(result, node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        if isinstance(node.value, ast.Name) and node.value.id in EqnOpts["roles"]:
+            return self._flow(node.value.id, node.attr, node)
+        raise EquationError(f"Unsupported attribute: {ast.unparse(node)}")
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        if (
+            isinstance(node.value, ast.Name)
+            and node.value.id in EqnOpts["roles"]
+            and isinstance(node.slice, ast.Constant)
+            and isinstance(node.slice.value, str)
+        ):
+            return self._flow(node.value.id, node.slice.value, node)
+        raise EquationError(f"Unsupported subscript: {ast.unparse(node)}")
+
+    # Parameter reference -> P["name"]:
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in EqnOpts["roles"]:
+            raise EquationError(f"'{node.id}' must be followed by a stream, e.g. {node.id}.Coal")
+        self.parameters.setdefault(node.id)
+        result = ast.Subscript(ast.Name("P", ast.Load()), ast.Constant(node.id), ast.Load())
+        return ast.copy_location(result, node)
+
+    # Function call -> np.<function>(...):
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if name not in EqnOpts["functions"] or node.keywords:
+            raise EquationError(f"Unsupported function: {ast.unparse(node.func)}")
+
+        args = [self.visit(arg) for arg in node.args]
+        func = ast.Attribute(ast.Name("np", ast.Load()), EqnOpts["functions"][name], ast.Load())
+        if name in ("min", "max"):
+            result = functools.reduce(lambda a, b: ast.Call(func, [a, b], []), args)
+        else:
+            result = ast.Call(func, args, [])
+        return ast.copy_location(result, node)
+
+    # Numbers are evaluated as floats, so that powers overflow instead of growing into huge integers:
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise EquationError(f"Unsupported constant: {node.value!r}")
+        return ast.copy_location(ast.Constant(float(node.value)), node)
+
+
+# Polynomial degree of an (untranslated) expression in the flows, None if not a polynomial:
+def _degree(node: ast.AST) -> int | None:
+
+    if isinstance(node, ast.Constant) or isinstance(node, ast.Name):
+        return 0
+
+    if isinstance(node, (ast.Attribute, ast.Subscript)):
+        return 1
+
+    if isinstance(node, ast.UnaryOp):
+        return _degree(node.operand)
+
+    if isinstance(node, ast.Call):
+        degrees = [_degree(arg) for arg in node.args]
+        return 0 if all(d == 0 for d in degrees) else None
+
+    left, right = _degree(node.left), _degree(node.right)
+    if left is None or right is None:
+        return None
+
+    if isinstance(node.op, (ast.Add, ast.Sub)):
+        return max(left, right)
+
+    if isinstance(node.op, ast.Mult):
+        return left + right
+
+    if isinstance(node.op, ast.Div):
+        return left if right == 0 else None
+
+    return 0 if left == right == 0 else None  # Powers of flows are not polynomial in general.
+
+
+# Compile an equation (cached by text):
+@functools.lru_cache(maxsize=4096)
+def compile_equation(text: str) -> CompiledEquation:
+    """
+    Parse and compile an equation. Results are cached by equation text, so nodes sharing a template compile once.
+    :param text: The equation, e.g. "out.CO2 = factor * inp.Coal".
+    :return: A CompiledEquation.
+    """
+
+    sides = _SPLIT.split(text)
+    if len(sides) != 2:
+        raise EquationError(f"Expected exactly one '=' in: {text}")
+
+    try:
+        lhs, rhs = (ast.parse(side.strip(), mode="eval").body for side in sides)
+    except SyntaxError as error:
+        raise EquationError(f"Invalid syntax in '{text}': {error.msg}") from None
+
+    tree = ast.Expression(ast.BinOp(lhs, ast.Sub(), rhs))
+    for node in ast.walk(tree):
+        if not isinstance(node, _NODES):
+            raise EquationError(f"Unsupported syntax in '{text}': {type(node).__name__}")
+
+    degree = _degree(tree.body)
+    translator = _Translator()
+    body = translator.visit(tree).body
+
+    # Wrap the translated expression in `lambda F, P: ...` and compile it once:
+    args = ast.arguments(
+        posonlyargs=[], args=[ast.arg("F"), ast.arg("P")], kwonlyargs=[], kw_defaults=[], defaults=[]
+    )
+    lambda_ = ast.fix_missing_locations(ast.Expression(ast.Lambda(args, body)))
+    kernel = eval(compile(lambda_, f"<equation: {text}>", "eval"), {"np": np, "__builtins__": {}})
+
+    return CompiledEquation(
+        text=text,
+        variables=tuple(translator.variables),
+        parameters=tuple(translator.parameters),
+        linear=degree is not None and degree <= 1,
+        kernel=kernel,
+    )
+
+
+# Assemble the linear rows of one node:
+def linear_rows(
+    equations: list[str],
+    par: Mapping[str, Any],
+    epochs: int,
+    incident: Mapping[tuple[int, str], list[int]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build the constraint rows of a node's equations.
+    :param equations: The node's equation texts.
+    :param par: The node's parameters (scalars or per-epoch lists).
+    :param epochs: Number of epochs.
+    :param incident: Maps (role, stream label) to the columns of the edges carrying that flow into or out of the node.
+    :return: (row, col, vals of shape (entries, epochs), rhs of shape (len(equations), epochs))
+    """
+
+    rows, cols, vals = [], [], []
+    rhs = np.zeros((len(equations), epochs))
+
+    for row, text in enumerate(equations):
+        equation = compile_equation(text)
+
+        values = {}
+        for name in equation.parameters:
+            values[name] = broadcast(par.get(name), epochs)
+            if values[name] is None:
+                raise EquationError(f"Missing or non-numeric parameter '{name}' in: {text}")
+
+        coef, const = equation.coefficients(values, (epochs,))
+        rhs[row] = -const
+
+        for index, variable in enumerate(equation.variables):
+            for col in incident.get(variable, ()):
+                rows.append(row)
+                cols.append(col)
+                vals.append(coef[index])
+
+    return (
+        np.asarray(rows, dtype=np.int64),
+        np.asarray(cols, dtype=np.int64),
+        np.asarray(vals, dtype=np.float64).reshape(len(rows), epochs),
+        rhs,
+    )
+
+
+# Exported names
+__all__ = [
+    "EqnOpts",
+    "EquationError",
+    "CompiledEquation",
+    "compile_equation",
+    "linear_rows",
+]
@@ -0,0 +1,126 @@
+# Encoding: utf-8
+# Module name: geometry
+# Description: GeoJSON parsing, simplification and packing routines that run inside worker processes
+
+# Imports (standard)
+from __future__ import annotations
+import os
+import json
+import functools
+
+# Imports (third party)
+import numpy as np
+
+
+# Default options for geometry building:
+GeometryOpts = {
+    "levels": (0.1, 0.02, 0.0),  # Simplification tolerances (in degrees), ordered coarse to fine.
+    "dtype": np.float64,  # Data type of the coordinate buffers.
+}
+
+
+# Parse a GeoJSON file into a list of rings (cached per worker process):
+@functools.lru_cache(maxsize=4)
+def load_rings(path: str, mtime: float = 0.0) -> tuple[list[np.ndarray], np.ndarray]:
+    """
+    Parse a GeoJSON file into closed rings.
+    :param path: Path to the GeoJSON file.
+    :param mtime: Modification time of the file, used only to invalidate the cache.
+    :return: A list of (n, 2) coordinate arrays and the feature index of each ring.
+    """
+
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    rings, owner = [], []
+    for index, feature in enumerate(data.get("features", [])):
+
+        geometry = feature.get("geometry") or {}
+        polygons = (
+            [geometry.get("coordinates", [])]
+            if geometry.get("type") == "Polygon"
+            else geometry.get("coordinates", [])
+        )
+
+        for polygon in polygons:
+            for ring in polygon:
+                if len(ring) >= 3:
+                    rings.append(np.asarray(ring, dtype=GeometryOpts["dtype"])[:, :2])
+                    owner.append(index)
+
+    return rings, np.asarray(owner, dtype=np.int32)
+
+
+# Douglas-Peucker simplification with an explicit stack (no recursion):
+def simplify(ring: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Simplify a ring using the Douglas-Peucker algorithm.
+    :param ring: An (n, 2) array of coordinates.
+    :param tolerance: Maximum perpendicular deviation; values <= 0 return the ring unchanged.
+    :return: The simplified (m, 2) array, with m <= n.
+    """
+
+    if tolerance <= 0 or len(ring) < 4:
+        return ring
+
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(ring) - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        # Perpendicular distance of every interior point to the chord (vectorized):
+        chord = ring[last] - ring[first]
+        delta = ring[first + 1 : last] - ring[first]
+        norm = np.hypot(chord[0], chord[1])
+        dist = (
+            np.abs(chord[0] * delta[:, 1] - chord[1] * delta[:, 0]) / norm
+            if norm > 0
+            else np.hypot(delta[:, 0], delta[:, 1])
+        )
+
+        index = int(np.argmax(dist))
+        if dist[index] > tolerance:
+            split = first + 1 + index
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+
+    return ring[keep]
+
+
+# Pack rings into flat buffers:
+def pack(rings: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Concatenate rings into a single coordinate buffer.
+    :return: An (N, 2) coordinate array and an (R + 1,) offset array into it.
+    """
+
+    sizes = np.fromiter((len(ring) for ring in rings), dtype=np.int64, count=len(rings))
+    offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+
+    coords = (
+        np.concatenate(rings)
+        if rings
+        else np.empty((0, 2), dtype=GeometryOpts["dtype"])
+    )
+    return coords, offsets
+
+
+# Simplified and packed rings of a file:
+def level_arrays(path: str, tolerance: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :return: Coordinates (N, 2), ring offsets (R + 1,) and ring-to-feature indices (R,).
+    """
+
+    rings, owner = load_rings(path, os.path.getmtime(path))
+    coords, offsets = pack([simplify(ring, tolerance) for ring in rings])
+    return coords, offsets, owner
+
+
+# Exported names
+__all__ = ["GeometryOpts", "load_rings", "simplify", "pack", "level_arrays"]
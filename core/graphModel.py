@@ -0,0 +1,199 @@
+# Encoding: utf-8
+# Module name: graphModel
+# Description: A Qt-free, columnar representation of a schematic for validation and solving
+
+# Imports (standard)
+from __future__ import annotations
+import dataclasses
+from typing import Any
+
+# Imports (third party)
+import numpy as np
+
+# Imports (local)
+from core.templates import resolve_node
+
+
+# Handle roles (mirrors ui.graph.handle.HandleRole without importing Qt):
+ROLE_INP = 0
+ROLE_OUT = 1
+
+
+# Broadcast a parameter value over epochs:
+def broadcast(value: Any, epochs: int) -> np.ndarray | None:
+    """
+    Convert a scalar or per-epoch list to a float array of length `epochs`; lists are padded with their last value.
+    :return: The array, or None if the value is missing or not numeric.
+    """
+
+    if value is None or isinstance(value, bool) or not isinstance(value, (int, float, list, tuple)):
+        return None
+
+    array = np.asarray(value, dtype=np.float64)
+    if array.ndim == 0:
+        return np.full(epochs, float(array))
+
+    out = np.full(epochs, array[-1] if len(array) else 0.0)
+    out[: min(len(array), epochs)] = array[:epochs]
+    return out
+
+
+# Class GraphModel:
+@dataclasses.dataclass
+class GraphModel:
+    """
+    Columnar view of nodes, handles and edges.
+
+    Note:
+        - Node and handle ids are the `attr["id"]` values of the canvas items they came from.
+        - Handles and edges are stored as parallel NumPy arrays, so whole-graph queries need no per-item traversal.
+    """
+
+    epochs: int = 1
+
+    # Node columns:
+    node_ids: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, np.int64))
+    node_names: list[str] = dataclasses.field(default_factory=list)
+    node_par: list[dict[str, Any]] = dataclasses.field(default_factory=list)  # ChainMaps for templated nodes.
+    node_eqn: list[tuple[str, ...]] = dataclasses.field(default_factory=list)
+
+    # Handle columns:
+    handle_ids: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, np.int64))
+    handle_node: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, np.int32))
+    handle_role: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, np.int8))
+    handle_stream: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, np.int32))
+
+    # Edge columns (indices into the handle columns):
+    edge_origin: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, np.int32))
+    edge_target: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, np.int32))
+
+    # Stream labels, indexed by `handle_stream`:
+    streams: list[str] = dataclasses.field(default_factory=list)
+
+    # Incremented on every mutation, used by caches:
+    version: int = 0
+
+    # Derived results keyed by name, each tagged with the version it was computed for (see core.topology):
+    cache: dict[str, Any] = dataclasses.field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_handles(self) -> int:
+        return len(self.handle_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_origin)
+
+    # Construct a model from a project dictionary (see core.project):
+    @classmethod
+    def from_dict(cls, project: dict) -> "GraphModel":
+        """
+        Build a model from a project dictionary.
+        :param project: A dictionary with `epochs`, `nodes` and `edges` keys (and optionally `templates`).
+        :return: A new GraphModel.
+        """
+
+        # Templates' equations as tuples, shared by their instances (the project itself is left untouched):
+        templates = {
+            key: {**template, "eqn": tuple(template.get("eqn", ()))}
+            for key, template in project.get("templates", {}).items()
+        }
+        streams: dict[str, int] = {}
+        node_ids, node_names, node_par, node_eqn = [], [], [], []
+        handle_ids, handle_node, handle_role, handle_stream = [], [], [], []
+
+        for index, node in enumerate(project.get("nodes", [])):
+
+            attr = node.get("attr", {})
+            database = node.get("database", {})
+            name, par, eqn = resolve_node(node, templates)
+
+            node_ids.append(int(attr["id"]))
+            node_names.append(name)
+            node_par.append(par)
+            node_eqn.append(eqn)
+
+            for role, key in ((ROLE_INP, "inp"), (ROLE_OUT, "out")):
+                for handle in database.get(key, []):
+                    label = handle.get("flow") or handle.get("name") or "Resource"
+                    handle_ids.append(int(handle["id"]))
+                    handle_node.append(index)
+                    handle_role.append(role)
+                    handle_stream.append(streams.setdefault(label, len(streams)))
+
+        # Resolve edge endpoints from handle ids to handle indices:
+        lookup = {hid: index for index, hid in enumerate(handle_ids)}
+        edges = project.get("edges", [])
+        edge_origin = [lookup.get(int(edge["origin"]), -1) for edge in edges]
+        edge_target = [lookup.get(int(edge["target"]), -1) for edge in edges]
+
+        return cls(
+            epochs=max(1, int(project.get("epochs", 1))),
+            node_ids=np.asarray(node_ids, dtype=np.int64),
+            node_names=node_names,
+            node_par=node_par,
+            node_eqn=node_eqn,
+            handle_ids=np.asarray(handle_ids, dtype=np.int64),
+            handle_node=np.asarray(handle_node, dtype=np.int32),
+            handle_role=np.asarray(handle_role, dtype=np.int8),
+            handle_stream=np.asarray(handle_stream, dtype=np.int32),
+            edge_origin=np.asarray(edge_origin, dtype=np.int32),
+            edge_target=np.asarray(edge_target, dtype=np.int32),
+            streams=list(streams),
+        )
+
+    # Get a node's parameter as a per-epoch series:
+    def series(self, node: int, name: str, default: float | None = None) -> np.ndarray | None:
+        """
+        Return a node parameter broadcast over all epochs.
+        :param node: Node index.
+        :param name: Parameter name.
+        :param default: Value used when the parameter is missing or not numeric.
+        :return: A float array of length `epochs`, or None if missing and no default is given.
+        """
+
+        series = broadcast(self.node_par[node].get(name, None), self.epochs)
+        if series is None and default is not None:
+            series = np.full(self.epochs, float(default))
+
+        return series
+
+    # Get a parameter of every node as a (nodes, epochs) matrix:
+    def parameter_matrix(self, name: str, default: float) -> np.ndarray:
+        """
+        Return a parameter of every node broadcast over all epochs.
+        :param name: Parameter name.
+        :param default: Value used where the parameter is missing or not numeric.
+        :return: A float array of shape (num_nodes, epochs).
+        """
+
+        scalar = np.full(self.num_nodes, default, dtype=np.float64)
+        series = []
+
+        for node, par in enumerate(self.node_par):
+            value = par.get(name, None)
+            if value is None or isinstance(value, bool):
+                continue
+            if isinstance(value, (int, float)):
+                scalar[node] = value
+            elif isinstance(value, (list, tuple)):
+                series.append(node)
+
+        matrix = np.repeat(scalar[:, None], self.epochs, axis=1)
+        for node in series:
+            matrix[node] = self.series(node, name, default)
+
+        return matrix
+
+    # Mark the model as modified:
+    def touch(self) -> int:
+        self.version += 1
+        return self.version
+
+
+# Exported names
+__all__ = ["GraphModel", "broadcast", "ROLE_INP", "ROLE_OUT"]
@@ -0,0 +1,733 @@
+# Encoding: utf-8
+# Module name: incremental
+# Description: Incremental recompilation of the flow-balance problem after single canvas edits
+
+# Imports (standard)
+from __future__ import annotations
+from typing import Any
+
+# Imports (third party)
+import numpy as np
+from scipy import sparse
+
+# Imports (local)
+from core.graphModel import GraphModel, broadcast, ROLE_INP, ROLE_OUT
+from core.compiler import BalanceBlock, BalanceSystem, compile_block, expand
+from core.equations import linear_rows
+from core.solver import WARM_START, SolveResult, solve_system
+
+
+# Grow an array's first axis to hold at least `size` entries, doubling its capacity (new entries are `fill`):
+def _reserve(array: np.ndarray, size: int, fill: float) -> np.ndarray:
+
+    if size <= len(array):
+        return array
+
+    grown = np.full((max(size, 2 * len(array), 16), *array.shape[1:]), fill, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+# Replace whole rows of a CSR matrix in one vectorized pass over its arrays:
+def _splice(matrix: sparse.csr_matrix, rows: np.ndarray, counts: np.ndarray, cols: np.ndarray, vals: np.ndarray):
+    """
+    :param rows: Rows to replace (sorted, unique).
+    :param counts: Number of new entries of each row.
+    :param cols: Column indices of the new entries, row after row.
+    :param vals: Values of the new entries, row after row.
+    :return: A new CSR matrix of the same shape.
+    """
+
+    indptr = matrix.indptr.astype(np.int64)
+    lengths = np.diff(indptr)
+    replaced = np.zeros(matrix.shape[0], dtype=bool)
+    replaced[rows] = True
+
+    new_lengths = lengths.copy()
+    new_lengths[rows] = counts
+    new_indptr = np.zeros(len(indptr), dtype=np.int64)
+    np.cumsum(new_lengths, out=new_indptr[1:])
+
+    indices = np.empty(new_indptr[-1], dtype=np.int64)
+    data = np.empty(new_indptr[-1], dtype=np.float64)
+
+    # Entries of the rows that are kept move by their row's shift:
+    row_of = np.repeat(np.arange(matrix.shape[0]), lengths)
+    kept = np.flatnonzero(~replaced[row_of])
+    shift = new_indptr[:-1] - indptr[:-1]
+    indices[kept + shift[row_of[kept]]] = matrix.indices[kept]
+    data[kept + shift[row_of[kept]]] = matrix.data[kept]
+
+    # New entries fill the replaced rows:
+    within = np.arange(len(cols)) - np.repeat(np.cumsum(counts) - counts, counts)
+    target = np.repeat(new_indptr[rows], counts) + within
+    indices[target] = cols
+    data[target] = vals
+
+    return sparse.csr_matrix((data, indices, new_indptr), shape=matrix.shape)
+
+
+# Class IncrementalCompiler:
+class IncrementalCompiler:
+    """
+    Keeps the single-epoch constraint block of a model and patches only the rows and columns an edit touches.
+
+    Note:
+        - Nodes and handles are addressed by their canvas ids (`NodeItem.attr["id"]`, `HandleItem.attr["id"]`),
+          edges by their (origin handle id, target handle id) pair.
+        - Row and column slots are never reused: removed rows become empty and removed columns are fixed at zero.
+          Call `compact()` to drop dead slots after many deletions.
+        - Per-slot arrays (costs, bounds, right-hand sides) grow by doubling, and the expanded multi-epoch matrices
+          are laid out by slot capacity (column `epoch * capacity + slot`). An edit therefore only re-expands the
+          rows it touched; the whole system is rebuilt from the single-epoch block only when a capacity grows.
+        - After edits that only change parameters, the next solve warm-starts from the previous basis (see `solve`).
+    """
+
+    def __init__(self, epochs: int = 1):
+
+        self.epochs = max(1, int(epochs))
+
+        # Canvas state:
+        self._par: dict[int, dict[str, Any]] = {}
+        self._eqn: dict[int, list[str]] = {}
+        self._handles: dict[int, tuple[int, int, str]] = {}  # hid -> (nid, role, stream)
+        self._node_handles: dict[int, set[int]] = {}
+        self._handle_edges: dict[int, set[tuple[int, int]]] = {}
+
+        # Slot maps (dependency tracking):
+        self._row_of: dict[tuple[int, str], int] = {}
+        self._row_key: list[tuple[int, str] | None] = []
+        self._node_rows: dict[int, set[tuple[int, str]]] = {}
+        self._streams: dict[str, int] = {}
+        self._col_of: dict[tuple[int, int], int] = {}
+        self._col_key: list[tuple[int, int] | None] = []
+        self._cap_of: dict[int, int] = {}
+        self._cap_key: list[int | None] = []
+        self._eqn_rows: dict[int, tuple] = {}  # nid -> (row, col, val, b), see core.equations.linear_rows
+
+        # Numeric state (single epoch); the arrays are buffers, slots past the live count are padding:
+        self._a_eq = sparse.csr_matrix((0, 0))
+        self._a_ub = sparse.csr_matrix((0, 0))
+        self._b_eq = np.zeros((0, self.epochs))
+        self._b_ub = np.full((0, self.epochs), np.inf)
+        self._cost = np.zeros((0, self.epochs))
+        self._upper = np.zeros(0)  # Padding and removed columns are fixed at zero.
+
+        # Expanded (multi-epoch) matrices, the capacities they were laid out for, and the rows to re-expand:
+        self._system_eq: sparse.csr_matrix | None = None
+        self._system_ub: sparse.csr_matrix | None = None
+        self._system_eqn: tuple[sparse.csr_matrix, np.ndarray] | None = None
+        self._layout: tuple[int, int, int] | None = None
+        self._expand_rows: set[int] = set()
+        self._expand_caps: set[int] = set()
+
+        # Pending patches:
+        self._dirty_rows: set[int] = set()
+        self._dirty_caps: set[int] = set()
+        self._dirty_nodes: set[int] = set()  # Nodes whose right-hand sides and costs need refreshing.
+        self._dirty_eqn: set[int] = set()  # Nodes whose equation rows need recompiling.
+
+        # Previous solve (for warm starts):
+        self._basis: tuple[np.ndarray, np.ndarray] | None = None
+        self._basis_structure = -1  # Value of `structure` when the basis was taken.
+
+        self.version = 0  # Incremented on every edit.
+        self.structure = 0  # Incremented on edits that add or remove rows or columns.
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Bulk loading
+
+    @classmethod
+    def from_model(cls, model: GraphModel) -> "IncrementalCompiler":
+        """
+        Build the compiler from a GraphModel using the vectorized compiler for the initial block.
+        """
+
+        self = cls(model.epochs)
+        block = compile_block(model)
+
+        nids = model.node_ids.tolist()
+        hids = model.handle_ids.tolist()
+        self._par = {nid: dict(par) for nid, par in zip(nids, model.node_par)}
+        self._eqn = {nid: list(eqn) for nid, eqn in zip(nids, model.node_eqn) if eqn}
+
+        for index, hid in enumerate(hids):
+            nid = nids[model.handle_node[index]]
+            self._handles[hid] = (nid, int(model.handle_role[index]), model.streams[model.handle_stream[index]])
+            self._node_handles.setdefault(nid, set()).add(hid)
+            self._handle_edges[hid] = set()
+
+        for nid in nids:
+            self._node_handles.setdefault(nid, set())
+
+        for edge in block.edges.tolist():
+            key = (hids[model.edge_origin[edge]], hids[model.edge_target[edge]])
+            self._col_of[key] = len(self._col_key)
+            self._col_key.append(key)
+            self._handle_edges[key[0]].add(key)
+            self._handle_edges[key[1]].add(key)
+
+        self._streams = {label: index for index, label in enumerate(model.streams)}
+        for node, stream in zip(block.row_node.tolist(), block.row_stream.tolist()):
+            key = (nids[node], model.streams[stream])
+            self._row_of[key] = len(self._row_key)
+            self._row_key.append(key)
+            self._node_rows.setdefault(key[0], set()).add(key)
+
+        for node in block.cap_node.tolist():
+            self._cap_of[nids[node]] = len(self._cap_key)
+            self._cap_key.append(nids[node])
+
+        self._a_eq, self._a_ub = block.a_eq.tocsr(), block.a_ub.tocsr()
+        self._b_eq, self._b_ub = np.array(block.b_eq, dtype=np.float64), np.array(block.b_ub, dtype=np.float64)
+        self._cost = np.array(block.cost, dtype=np.float64)
+        self._upper = np.full(len(self._col_key), np.inf)
+        self._split_equations(block, nids)
+        return self
+
+    # Split the equation rows of a compiled block into per-node entries:
+    def _split_equations(self, block: BalanceBlock, nids: list[int]) -> None:
+
+        count = len(block.eqn_b)
+        if not count:
+            return
+
+        order = np.argsort(block.eqn_node, kind="stable")  # Keeps each node's equations in order.
+        starts = np.flatnonzero(np.r_[True, np.diff(block.eqn_node[order]) != 0])
+        local = np.empty(count, dtype=np.int64)
+        local[order] = np.arange(count) - np.repeat(starts, np.diff(np.r_[starts, count]))
+
+        entry_node = block.eqn_node[block.eqn_row]
+        entries = np.argsort(entry_node, kind="stable")
+        bounds = np.searchsorted(entry_node[entries], block.eqn_node[order[starts]])
+
+        for index, start in enumerate(starts.tolist()):
+            node = int(block.eqn_node[order[start]])
+            stop = starts[index + 1] if index + 1 < len(starts) else count
+            picked = entries[bounds[index] : bounds[index + 1] if index + 1 < len(bounds) else None]
+            self._eqn_rows[nids[node]] = (
+                local[block.eqn_row[picked]],
+                block.eqn_col[picked],
+                block.eqn_val[picked],
+                block.eqn_b[order[start:stop]],
+            )
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Dependency queries
+
+    def rows_of(self, nid: int) -> list[int]:
+        """
+        Equality-row slots (of one epoch) that the node contributes.
+        """
+        return [self._row_of[key] for key in self._node_rows.get(nid, ())]
+
+    def columns_of(self, hid: int) -> list[int]:
+        """
+        Column slots (of one epoch) of the edges attached to the handle.
+        """
+        return [self._col_of[key] for key in self._handle_edges.get(hid, ())]
+
+    def column_keys(self) -> list[tuple[int, int] | None]:
+        """
+        The (origin, target) handle ids of every column slot; None for removed edges.
+        """
+        return list(self._col_key)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Edits
+
+    def add_node(self, nid: int, par: dict[str, Any] | None = None, eqn: list[str] | None = None) -> None:
+        self._par[nid] = dict(par or {})
+        self._node_handles.setdefault(nid, set())
+        if eqn:
+            self._eqn[nid] = list(eqn)
+            self.structure += 1
+        self._touch_node(nid)
+
+    def set_equations(self, nid: int, eqn: list[str]) -> None:
+
+        self._system_eqn = None
+
+        if eqn:
+            self._eqn[nid] = list(eqn)
+        else:
+            self._eqn.pop(nid, None)
+            self._eqn_rows.pop(nid, None)
+
+        # Equations replace the node's balance rows:
+        self._sync_rows(nid)
+        self.version += 1
+        self.structure += 1
+
+    def remove_node(self, nid: int) -> None:
+
+        for hid in list(self._node_handles.get(nid, ())):
+            self.remove_handle(hid)
+
+        self._sync_rows(nid, removed=True)
+        self._set_capacity_row(nid, None)
+        self._par.pop(nid, None)
+        self._eqn.pop(nid, None)
+        if self._eqn_rows.pop(nid, None) is not None:
+            self._system_eqn = None
+        self._node_handles.pop(nid, None)
+        self._node_rows.pop(nid, None)
+        self._dirty_nodes.discard(nid)
+        self._dirty_eqn.discard(nid)
+        self.version += 1
+        self.structure += 1
+
+    def set_parameter(self, nid: int, name: str, value: Any) -> None:
+
+        if value is None:
+            self._par[nid].pop(name, None)
+        else:
+            self._par[nid][name] = value
+
+        if name == "capacity":
+            self._set_capacity_row(nid, broadcast(value, self.epochs))
+
+        self._touch_node(nid)
+
+    def add_handle(self, hid: int, nid: int, role: int, stream: str) -> None:
+
+        self._handles[hid] = (nid, role, stream)
+        self._node_handles[nid].add(hid)
+        self._handle_edges[hid] = set()
+        self._sync_rows(nid)
+        self.version += 1
+
+    def remove_handle(self, hid: int) -> None:
+
+        for key in list(self._handle_edges.get(hid, ())):
+            self.remove_edge(*key)
+
+        nid = self._handles.pop(hid)[0]
+        self._node_handles[nid].discard(hid)
+        self._handle_edges.pop(hid, None)
+        self._sync_rows(nid)
+        self.version += 1
+
+    def set_stream(self, hid: int, stream: str) -> None:
+
+        nid, role, _ = self._handles[hid]
+        self._handles[hid] = (nid, role, stream)
+        self._sync_rows(nid)
+
+        for origin, target in self._handle_edges[hid]:
+            self._mark_edge_rows(origin, target)
+        self.version += 1
+
+    def add_edge(self, origin: int, target: int) -> None:
+
+        key = (origin, target)
+        if key in self._col_of:
+            return
+
+        col = len(self._col_key)
+        self._col_of[key] = col
+        self._col_key.append(key)
+        self._handle_edges[origin].add(key)
+        self._handle_edges[target].add(key)
+
+        self._upper = _reserve(self._upper, col + 1, 0.0)
+        self._cost = _reserve(self._cost, col + 1, 0.0)
+        self._upper[col] = np.inf
+        self._cost[col] = self._edge_cost(origin)
+
+        self._mark_edge_rows(origin, target)
+        self.version += 1
+        self.structure += 1
+
+    def remove_edge(self, origin: int, target: int) -> None:
+
+        key = (origin, target)
+        col = self._col_of.pop(key, None)
+        if col is None:
+            return
+
+        self._col_key[col] = None
+        self._handle_edges[origin].discard(key)
+        self._handle_edges[target].discard(key)
+
+        # Fix the dead column at zero and refresh the rows that referenced it:
+        self._upper[col] = 0.0
+        self._cost[col] = 0.0
+        self._mark_edge_rows(origin, target)
+        self.version += 1
+        self.structure += 1
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Internal bookkeeping
+
+    # Mark a node's right-hand sides and outgoing costs for refreshing:
+    def _touch_node(self, nid: int) -> None:
+        self._dirty_nodes.add(nid)
+        if nid in self._eqn:
+            self._dirty_eqn.add(nid)
+        self.version += 1
+
+    # Cost of an edge leaving the given handle:
+    def _edge_cost(self, origin: int) -> np.ndarray:
+        cost = broadcast(self._par[self._handles[origin][0]].get("cost"), self.epochs)
+        return cost if cost is not None else np.ones(self.epochs)
+
+    # Mark the rows that an edge contributes to:
+    def _mark_edge_rows(self, origin: int, target: int) -> None:
+
+        # Rows are keyed on the edge's stream, which is the stream of its origin handle:
+        stream = self._handles[origin][2]
+        for hid in (origin, target):
+            nid = self._handles[hid][0]
+            if (row := self._row_of.get((nid, stream))) is not None:
+                self._dirty_rows.add(row)
+            if nid in self._eqn:
+                self._dirty_eqn.add(nid)
+
+        if (cap := self._cap_of.get(self._handles[origin][0])) is not None:
+            self._dirty_caps.add(cap)
+
+    # Bring a node's set of balance rows in line with its handles:
+    def _sync_rows(self, nid: int, removed: bool = False) -> None:
+
+        handles = [self._handles[hid] for hid in self._node_handles.get(nid, ())]
+        balanced = not removed and nid not in self._eqn and any(role == ROLE_INP for _, role, _ in handles)
+        wanted = {(nid, stream) for _, _, stream in handles} if balanced else set()
+        current = self._node_rows.setdefault(nid, set())
+
+        for key in current - wanted:
+            row = self._row_of.pop(key)
+            self._row_key[row] = None
+            self._dirty_rows.add(row)
+
+        for key in wanted - current:
+            self._row_of[key] = len(self._row_key)
+            self._row_key.append(key)
+            self._streams.setdefault(key[1], len(self._streams))
+
+        self._node_rows[nid] = wanted
+
+        for key in wanted:
+            self._dirty_rows.add(self._row_of[key])
+
+        if wanted != current:
+            self.structure += 1
+
+        if not removed:
+            self._touch_node(nid)
+
+    # Add, update or remove a node's capacity row:
+    def _set_capacity_row(self, nid: int, capacity: np.ndarray | None) -> None:
+
+        cap = self._cap_of.get(nid)
+        if capacity is None:
+            if cap is not None:
+                del self._cap_of[nid]
+                self._cap_key[cap] = None
+                self._dirty_caps.add(cap)
+                self.structure += 1
+            return
+
+        if cap is None:
+            cap = self._cap_of[nid] = len(self._cap_key)
+            self._cap_key.append(nid)
+            self.structure += 1
+
+        self._dirty_caps.add(cap)
+
+    # Entries of an equality row:
+    def _row_entries(self, row: int) -> tuple[list[int], list[float]]:
+
+        key = self._row_key[row]
+        if key is None:
+            return [], []
+
+        nid, stream = key
+        cols, vals = [], []
+        for hid in self._node_handles[nid]:
+            for edge in self._handle_edges[hid]:
+                if self._handles[edge[0]][2] != stream:
+                    continue
+                cols.append(self._col_of[edge])
+                vals.append(1.0 if hid == edge[1] else -1.0)
+
+        return cols, vals
+
+    # Entries of a capacity row:
+    def _cap_entries(self, cap: int) -> list[int]:
+
+        nid = self._cap_key[cap]
+        if nid is None:
+            return []
+
+        return [
+            self._col_of[edge]
+            for hid in self._node_handles[nid]
+            if self._handles[hid][1] == ROLE_OUT
+            for edge in self._handle_edges[hid]
+            if edge[0] == hid
+        ]
+
+    # Columns of the flows entering and leaving a node, keyed like the variables of its equations:
+    def _incident(self, nid: int) -> dict[tuple[int, str], list[int]]:
+
+        incident: dict[tuple[int, str], list[int]] = {}
+        for hid in self._node_handles[nid]:
+            role = self._handles[hid][1]
+            for edge in self._handle_edges[hid]:
+                if edge[role == ROLE_INP] == hid:
+                    key = (role, self._handles[edge[0]][2])
+                    incident.setdefault(key, []).append(self._col_of[edge])
+
+        return incident
+
+    # Replace the given rows of a single-epoch matrix, growing it to `shape` first:
+    @staticmethod
+    def _patch(matrix, shape, rows, entries) -> sparse.csr_matrix:
+
+        matrix = sparse.csr_matrix(matrix)
+        if matrix.shape != shape:
+            matrix.resize(shape)
+        if not rows:
+            return matrix
+
+        counts = np.array([len(cols) for cols, _ in entries], dtype=np.int64)
+        cols = np.fromiter((c for cols, _ in entries for c in cols), dtype=np.int64, count=int(counts.sum()))
+        vals = np.fromiter((v for _, vals in entries for v in vals), dtype=np.float64, count=int(counts.sum()))
+        return _splice(matrix, np.asarray(rows, dtype=np.int64), counts, cols, vals)
+
+    # Apply pending patches:
+    def _flush(self) -> None:
+
+        rows, cols, caps = len(self._row_key), len(self._col_key), len(self._cap_key)
+
+        # Constraint rows:
+        dirty = sorted(self._dirty_rows)
+        self._a_eq = self._patch(self._a_eq, (rows, cols), dirty, [self._row_entries(r) for r in dirty])
+
+        dirty_caps = sorted(self._dirty_caps)
+        self._a_ub = self._patch(
+            self._a_ub,
+            (caps, cols),
+            dirty_caps,
+            [(c := self._cap_entries(cap), [1.0] * len(c)) for cap in dirty_caps],
+        )
+
+        self._expand_rows.update(dirty)
+        self._expand_caps.update(dirty_caps)
+
+        # Right-hand sides (new rows start at zero, new capacity rows unbounded):
+        self._b_eq = _reserve(self._b_eq, rows, 0.0)
+        self._b_ub = _reserve(self._b_ub, caps, np.inf)
+        self._cost = _reserve(self._cost, cols, 0.0)
+        self._upper = _reserve(self._upper, cols, 0.0)
+
+        # Dead rows are empty and trivially satisfied:
+        for row in dirty:
+            if self._row_key[row] is None:
+                self._b_eq[row] = 0.0
+
+        # Right-hand sides of every live row of a touched node:
+        refresh = self._dirty_nodes | {self._row_key[r][0] for r in dirty if self._row_key[r]}
+        for nid in refresh:
+            handles = [self._handles[hid] for hid in self._node_handles.get(nid, ())]
+            sink = not any(role == ROLE_OUT for _, role, _ in handles)
+            demand = broadcast(self._par[nid].get("demand"), self.epochs)
+
+            for key in self._node_rows.get(nid, ()):
+                self._b_eq[self._row_of[key]] = demand if sink and demand is not None else 0.0
+
+        # Costs of the edges leaving a touched node:
+        for nid in self._dirty_nodes:
+            for hid in self._node_handles.get(nid, ()):
+                for edge in self._handle_edges[hid]:
+                    if edge[0] == hid:
+                        self._cost[self._col_of[edge]] = self._edge_cost(hid)
+
+        # Capacity bounds:
+        for cap in dirty_caps:
+            self._b_ub[cap] = np.inf
+        for nid in set(self._cap_of) & (self._dirty_nodes | {self._cap_key[c] for c in dirty_caps}):
+            capacity = broadcast(self._par[nid].get("capacity"), self.epochs)
+            self._b_ub[self._cap_of[nid]] = capacity if capacity is not None else np.inf
+
+        # Equation rows:
+        for nid in self._dirty_eqn & self._eqn.keys():
+            self._eqn_rows[nid] = linear_rows(self._eqn[nid], self._par[nid], self.epochs, self._incident(nid))
+            self._system_eqn = None
+
+        self._dirty_rows.clear()
+        self._dirty_caps.clear()
+        self._dirty_nodes.clear()
+        self._dirty_eqn.clear()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Assembly and solving
+
+    def block(self) -> BalanceBlock:
+        """
+        Patch the single-epoch block and return it. Columns are slots (see `column_keys`).
+        """
+
+        self._flush()
+        rows, cols, caps = len(self._row_key), len(self._col_key), len(self._cap_key)
+
+        # Stack the equation rows of all nodes:
+        row, col, val, b, node, offset = [], [], [], [], [], 0
+        for nid in self._eqn:
+            entries = self._eqn_rows[nid]
+            row.append(entries[0] + offset)
+            col.append(entries[1])
+            val.append(entries[2])
+            b.append(entries[3])
+            node.append(np.full(len(entries[3]), nid, dtype=np.int64))
+            offset += len(entries[3])
+
+        stack = lambda parts, shape: np.concatenate(parts) if parts else np.zeros(shape)
+        return BalanceBlock(
+            epochs=self.epochs,
+            edges=np.arange(cols),
+            a_eq=self._a_eq,
+            b_eq=self._b_eq[:rows].copy(),
+            a_ub=self._a_ub,
+            b_ub=self._b_ub[:caps].copy(),
+            cost=self._cost[:cols].copy(),
+            row_node=np.asarray([k[0] if k else -1 for k in self._row_key], dtype=np.int64),
+            row_stream=np.asarray(
+                [self._streams[k[1]] if k else -1 for k in self._row_key], dtype=np.int32
+            ),
+            cap_node=np.asarray([k if k is not None else -1 for k in self._cap_key], dtype=np.int64),
+            upper=self._upper[:cols].copy(),
+            eqn_row=stack(row, 0).astype(np.int64),
+            eqn_col=stack(col, 0).astype(np.int64),
+            eqn_val=stack(val, (0, self.epochs)),
+            eqn_b=stack(b, (0, self.epochs)),
+            eqn_node=stack(node, 0).astype(np.int64),
+        )
+
+    def assemble(self) -> BalanceSystem:
+        """
+        Patch the problem and expand it over all epochs.
+
+        Note:
+            - Columns, balance rows and capacity rows are laid out by slot capacity: column `epoch * capacity + slot`
+              (see `column_keys`). Padding columns are fixed at zero and padding rows are empty.
+            - Only the rows patched since the previous call are re-expanded; equation rows are re-expanded when any
+              node's equations changed.
+        """
+
+        self._flush()
+        epochs = self.epochs
+        shift = np.arange(epochs, dtype=np.int64)
+        layout = (len(self._b_eq), len(self._cost), len(self._b_ub))
+        row_cap, col_cap, cap_cap = layout
+
+        # Whole matrices after a capacity grew (or on first use), dirty rows otherwise:
+        def expand_rows(system, matrix, dirty, height):
+
+            if system is None or self._layout != layout:
+                padded = matrix.copy()
+                padded.resize((height, col_cap))
+                return sparse.kron(sparse.identity(epochs, format="csr"), padded, format="csr")
+
+            if not dirty:
+                return system
+
+            rows = np.array(sorted(dirty), dtype=np.int64)
+            part = matrix[rows]
+            counts = np.diff(part.indptr)
+            return _splice(
+                system,
+                (shift[:, None] * height + rows).ravel(),
+                np.tile(counts, epochs),
+                (shift[:, None] * col_cap + part.indices).ravel(),
+                np.tile(part.data, epochs),
+            )
+
+        self._system_eq = expand_rows(self._system_eq, self._a_eq, self._expand_rows, row_cap)
+        self._system_ub = expand_rows(self._system_ub, self._a_ub, self._expand_caps, cap_cap)
+        self._expand_rows.clear()
+        self._expand_caps.clear()
+
+        # Equation rows, with per-epoch coefficients:
+        if self._system_eqn is None or self._layout != layout:
+            block = self.block()
+            count = len(block.eqn_b)
+            matrix = sparse.csr_matrix(
+                (
+                    block.eqn_val.T.ravel(),
+                    (
+                        (shift[:, None] * count + block.eqn_row).ravel(),
+                        (shift[:, None] * col_cap + block.eqn_col).ravel(),
+                    ),
+                ),
+                shape=(count * epochs, col_cap * epochs),
+            )
+            self._system_eqn = (matrix, block.eqn_b.T.ravel())
+
+        self._layout = layout
+        eqn, eqn_b = self._system_eqn
+        a_eq = sparse.vstack([self._system_eq, eqn], format="csr") if eqn.shape[0] else self._system_eq
+
+        return BalanceSystem(
+            epochs=epochs,
+            edges=np.arange(col_cap),
+            a_eq=a_eq,
+            b_eq=np.concatenate([self._b_eq.T.ravel(), eqn_b]),
+            a_ub=self._system_ub,
+            b_ub=self._b_ub.T.ravel(),
+            cost=self._cost.T.ravel(),
+            upper=np.tile(self._upper, epochs),
+        )
+
+    def solve(self) -> SolveResult:
+        """
+        Patch, assemble and solve. The flows of the result are indexed by column slot (see `column_keys`).
+
+        Note:
+            - If only parameters changed since the previous solve, the previous basis is still a valid (and usually
+              nearly optimal) starting point and is passed to the solver.
+            - After structural edits the problem is solved cold: an old basis bypasses presolve and can be far slower.
+            - Warm starts need the `highspy` bindings (see core.solver.WARM_START); without them, every solve is cold.
+        """
+
+        system = self.assemble()
+        warm = self._basis if WARM_START and self._basis_structure == self.structure else None
+        result = solve_system(system, basis=warm, keep_basis=WARM_START)
+        result.flows = result.flows[: len(self._col_key)]
+
+        self._basis = result.basis
+        self._basis_structure = self.structure
+        return result
+
+    def compact(self) -> None:
+        """
+        Drop dead row, column and capacity slots. Discards the warm-start basis.
+        """
+
+        self._flush()
+        live_rows = [r for r, key in enumerate(self._row_key) if key is not None]
+        live_cols = [c for c, key in enumerate(self._col_key) if key is not None]
+        live_caps = [c for c, key in enumerate(self._cap_key) if key is not None]
+
+        self._a_eq = self._a_eq[live_rows][:, live_cols].tocsr()
+        self._a_ub = self._a_ub[live_caps][:, live_cols].tocsr()
+        self._system_eq = self._system_ub = self._system_eqn = None
+        self._b_eq, self._b_ub = self._b_eq[live_rows], self._b_ub[live_caps]
+        self._cost, self._upper = self._cost[live_cols], self._upper[live_cols]
+
+        self._row_key = [self._row_key[r] for r in live_rows]
+        self._col_key = [self._col_key[c] for c in live_cols]
+        self._cap_key = [self._cap_key[c] for c in live_caps]
+        self._row_of = {key: slot for slot, key in enumerate(self._row_key)}
+        self._col_of = {key: slot for slot, key in enumerate(self._col_key)}
+        self._cap_of = {key: slot for slot, key in enumerate(self._cap_key)}
+
+        self._dirty_eqn |= self._eqn.keys()  # Equation entries reference the old column slots.
+        self._basis = None
+        self.version += 1
+        self.structure += 1
+
+
+# Exported names
+__all__ = ["IncrementalCompiler"]
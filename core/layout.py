@@ -0,0 +1,186 @@
+# Encoding: utf-8
+# Module name: layout
+# Description: Layered (Sugiyama-style) automatic layout of a GraphModel's node graph
+
+# Imports (standard)
+from __future__ import annotations
+
+# Imports (third party)
+import numpy as np
+from scipy import sparse
+
+# Imports (local)
+from core.graphModel import GraphModel
+from core.sankey import layers
+
+
+# Default layout options:
+LayoutOpts = {
+    "layer-gap": 160.0,  # Horizontal gap between the widest nodes of adjacent layers.
+    "node-gap": 40.0,  # Vertical gap between nodes of a layer.
+    "dummy-gap": 12.0,  # Vertical room reserved for an edge passing through a layer.
+    "node-size": (72.0, 68.0),  # Used when no sizes are given (NodeOpts["frame"]).
+    "sweeps": 6,  # Crossing-reduction passes (each one down and one up).
+    "passes": 8,  # Coordinate-straightening passes.
+}
+
+
+# Split edges that span several layers into chains of unit-length segments:
+def _segments(layer: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :param layer: Layer of every real node.
+    :param lo: Upper-layer end of every (deduplicated, forward) edge.
+    :param hi: Lower-layer end of every edge.
+    :return: (layer of every real and dummy node, segment origins, segment targets)
+    """
+
+    count = len(layer)
+    if not len(lo):
+        return layer, lo, hi
+
+    dummies = np.maximum(layer[hi] - layer[lo] - 1, 0)
+    length = dummies + 2  # Points per chain: both ends and the dummies in between.
+    start = np.cumsum(length) - length
+
+    points = np.empty(int(length.sum()), dtype=np.int64)
+    inner = np.ones(len(points), dtype=bool)
+    inner[start] = inner[start + length - 1] = False
+
+    points[start] = lo
+    points[start + length - 1] = hi
+    points[inner] = count + np.arange(int(dummies.sum()))
+
+    # Dummies take consecutive layers below the chain's upper end:
+    step = np.arange(len(points)) - np.repeat(start, length)
+    dummy_layer = (np.repeat(layer[lo], length) + step)[inner]
+
+    keep = np.ones(len(points) - 1, dtype=bool)
+    keep[(start + length - 1)[:-1]] = False  # No segment from one chain's end to the next chain's start.
+    return np.r_[layer, dummy_layer], points[:-1][keep], points[1:][keep]
+
+
+# Reorder the nodes of every layer by the barycenter of their neighbors:
+def _sweep(position: np.ndarray, neighbors: sparse.csr_matrix, bounds: np.ndarray, layers: range) -> None:
+
+    degree = np.diff(neighbors.indptr)
+    for index in layers:
+        lo, hi = bounds[index], bounds[index + 1]
+        if hi - lo < 2:
+            continue
+
+        block = neighbors[lo:hi]
+        center = np.where(
+            degree[lo:hi] > 0, (block @ position) / np.maximum(degree[lo:hi], 1), position[lo:hi]
+        )
+        order = np.argsort(center, kind="stable")
+        position[lo + order] = np.sort(position[lo:hi])
+
+
+# Compute a layered layout:
+def hierarchical_layout(model: GraphModel, sizes: np.ndarray | None = None, **kwargs) -> np.ndarray:
+    """
+    Lay out the model's nodes in layers from left to right, following edges from output to input handles.
+    :param model: The model.
+    :param sizes: Width and height of every node, shape (num_nodes, 2).
+    :param kwargs: Overrides of LayoutOpts.
+    :return: Node centers, shape (num_nodes, 2).
+
+    Note:
+        - Layers are longest paths over the strong-component condensation, so cycles share a layer and back edges do
+          not stretch the drawing.
+        - Edges that span several layers are routed through dummy nodes so that crossing reduction sees them.
+        - Everything but the loop over layers in a sweep is vectorized; nothing touches Qt, so this can run in a
+          worker thread.
+    """
+
+    opts = {**LayoutOpts, **kwargs}
+    count = model.num_nodes
+    if count == 0:
+        return np.empty((0, 2))
+
+    sizes = np.broadcast_to(np.asarray(opts["node-size"] if sizes is None else sizes, dtype=np.float64), (count, 2))
+    layer = layers(model)
+
+    # Distinct node-to-node edges between different layers, pointing downwards:
+    valid = (model.edge_origin >= 0) & (model.edge_target >= 0)
+    origin = model.handle_node[model.edge_origin[valid]].astype(np.int64)
+    target = model.handle_node[model.edge_target[valid]].astype(np.int64)
+    keep = layer[origin] != layer[target]
+    lo = np.where(layer[origin] < layer[target], origin, target)[keep]
+    hi = np.where(layer[origin] < layer[target], target, origin)[keep]
+    lo, hi = np.unique(np.stack([lo, hi]), axis=1) if len(lo) else (lo, hi)
+
+    full, seg_lo, seg_hi = _segments(layer, lo, hi)
+    total = len(full)
+
+    # Work in layer-major order so that every layer is a contiguous slice:
+    rank = np.empty(total, dtype=np.int64)
+    grouped = np.argsort(full, kind="stable")
+    rank[grouped] = np.arange(total)
+    depth = int(full.max()) + 1
+    bounds = np.searchsorted(full[grouped], np.arange(depth + 1))
+
+    ones = np.ones(len(seg_lo))
+    upper = sparse.csr_matrix((ones, (rank[seg_hi], rank[seg_lo])), shape=(total, total))  # Row: node, col: above.
+    lower = upper.T.tocsr()
+
+    # Crossing reduction, alternating downward and upward sweeps:
+    position = np.arange(total, dtype=np.float64)
+    for _ in range(opts["sweeps"]):
+        _sweep(position, upper, bounds, range(1, depth))
+        _sweep(position, lower, bounds, range(depth - 2, -1, -1))
+
+    # Final order: by layer, then by position within it:
+    order = np.argsort(position, kind="stable")  # Positions are a permutation that keeps layers contiguous.
+
+    node_of = np.empty(total, dtype=np.int64)
+    node_of[rank] = np.arange(total)
+    height = np.where(node_of < count, sizes[np.minimum(node_of, count - 1), 1], 0.0)
+    room = np.where(node_of < count, height + opts["node-gap"], opts["dummy-gap"])
+
+    # Minimum distance of every node's center from its layer's first center:
+    stacked = room[order]
+    offset = np.cumsum(stacked) - stacked
+    level = np.repeat(np.arange(depth), np.diff(bounds))
+    first = bounds[level]
+    offset -= offset[first]
+    offset += (height[order] - height[order][first]) / 2
+
+    # Straighten edges: pull centers towards their neighbors, then restore the minimum separation (see _separate):
+    both = (upper + lower)[order][:, order].tocsr()
+    degree = np.diff(both.indptr)
+    center = offset.copy()
+    for _ in range(opts["passes"]):
+        pulled = np.where(degree > 0, (both @ center) / np.maximum(degree, 1), center)
+        center = _separate(pulled, offset, level)
+
+    center -= center.min()
+
+    # Columns are as wide as their widest node:
+    width = np.zeros(depth)
+    np.maximum.at(width, layer, sizes[:, 0])
+    left = np.cumsum(width + opts["layer-gap"]) - (width + opts["layer-gap"])
+
+    result = np.empty((count, 2))
+    real = node_of[order] < count
+    result[node_of[order][real], 1] = center[real]
+    result[:, 0] = left[layer] + width[layer] / 2
+    return result
+
+
+# Project centers onto the closest order-preserving, non-overlapping arrangement (approximately):
+def _separate(center: np.ndarray, offset: np.ndarray, level: np.ndarray) -> np.ndarray:
+    """
+    Within each layer, `center - offset` must be non-decreasing. The average of the upward-pushing (running maximum)
+    and downward-pushing (reverse running minimum) projections satisfies that and keeps the layer centered.
+    """
+
+    free = center - offset
+    shift = (np.abs(free).max() + 1.0) * 4 * level  # Separates the layers for the running extrema.
+    forward = np.maximum.accumulate(free + shift) - shift
+    backward = np.minimum.accumulate((free + shift)[::-1])[::-1] - shift
+    return (forward + backward) / 2 + offset
+
+
+# Exported names
+__all__ = ["LayoutOpts", "hierarchical_layout"]
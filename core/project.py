@@ -0,0 +1,74 @@
+# Encoding: utf-8
+# Module name: project
+# Description: Reading and writing Climact project files (JSON)
+
+# Imports (standard)
+from __future__ import annotations
+import os
+import json
+
+# Imports (local)
+import opts
+
+
+# Project format version:
+PROJECT_FORMAT = 1
+
+
+# Load a project file:
+def load_project(path: str | os.PathLike) -> dict:
+    """
+    Load a project file from disk.
+
+    Layout:
+        {
+            "format": 1,
+            "meta": {"name": ..., "version": ...},
+            "epochs": <int>,
+            "templates": {<key>: {"name", "icon", "inp", "out", "par", "eqn"}},
+            "nodes": [{"attr": {"id", "name", ...}, "template": <key>, "database": {"inp", "out", "par", "eqn"}, "cpos": {"x", "y"}}],
+            "edges": [{"origin": <handle id>, "target": <handle id>, "stream": <label>}]
+        }
+
+    Nodes with a `template` store only their overrides in `par` (and `eqn`, if overridden); see core.templates.
+
+    :param path: Path to the project file.
+    :return: The project dictionary.
+    """
+
+    with open(path, "r", encoding="utf-8") as file:
+        project = json.load(file)
+
+    if not isinstance(project, dict) or "nodes" not in project:
+        raise ValueError(f"Not a Climact project: {path}")
+
+    if int(project.get("format", PROJECT_FORMAT)) > PROJECT_FORMAT:
+        raise ValueError(f"Unsupported project format: {project.get('format')}")
+
+    project.setdefault("edges", [])
+    project.setdefault("templates", {})
+    project.setdefault("epochs", 1)
+    return project
+
+
+# Save a project file:
+def save_project(project: dict, path: str | os.PathLike) -> None:
+    """
+    Write a project dictionary to disk.
+    :param project: The project dictionary (see `load_project` for the layout).
+    :param path: Destination path.
+    """
+
+    project = dict(project)
+    project.setdefault("format", PROJECT_FORMAT)
+    project.setdefault(
+        "meta",
+        {"name": opts.ClimactMeta.app_name, "version": opts.ClimactMeta.app_version},
+    )
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(project, file, indent=2)
+
+
+# Exported names
+__all__ = ["PROJECT_FORMAT", "load_project", "save_project"]
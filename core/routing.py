@@ -0,0 +1,331 @@
+# Encoding: utf-8
+# Module name: routing
+# Description: Orthogonal edge routing around rectangular obstacles, with a cache keyed by obstacle changes
+
+# Imports (standard)
+from __future__ import annotations
+import heapq
+import dataclasses
+from collections import OrderedDict
+
+# Imports (third party)
+import numpy as np
+
+
+# Default routing options:
+RoutingOpts = {
+    "margin": 10.0,  # Clearance around obstacles.
+    "stub": 16.0,  # Straight run out of the origin and into the target (must exceed the margin).
+    "corridor": 160.0,  # How far beyond the endpoints' bounding box obstacles are considered.
+    "bend": 40.0,  # Cost of a bend, in scene units of length.
+    "cache": 8192,  # Maximum number of cached routes.
+    "history": 512,  # Number of obstacle changes remembered to validate routes computed by workers.
+    "bucket": 512.0,  # Cell size of the spatial index of cached route corridors.
+}
+
+# Directions: east, south, west, north (grid steps in (i, j)):
+_STEPS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+
+# Class Obstacles:
+@dataclasses.dataclass(frozen=True)
+class Obstacles:
+    """
+    An immutable snapshot of the obstacle set, safe to hand to a worker thread.
+    """
+
+    version: int
+    rects: np.ndarray  # Shape (n, 4): x0, y0, x1, y1.
+
+
+# Class Route:
+@dataclasses.dataclass(frozen=True)
+class Route:
+    """
+    A routed polyline and the region whose obstacles determined it.
+    """
+
+    points: np.ndarray  # Shape (k, 2), from origin to target.
+    corridor: tuple[float, float, float, float]  # x0, y0, x1, y1 of the searched region.
+    version: int  # Obstacle version the route was computed for.
+
+
+# Rectangles intersecting a box:
+def _intersects(rects: np.ndarray, box: tuple[float, float, float, float]) -> np.ndarray:
+    return (rects[:, 0] < box[2]) & (rects[:, 2] > box[0]) & (rects[:, 1] < box[3]) & (rects[:, 3] > box[1])
+
+
+# Drop the middle point of every collinear triple:
+def simplify(points: np.ndarray) -> np.ndarray:
+
+    if len(points) < 3:
+        return points
+
+    turn = np.cross(points[1:-1] - points[:-2], points[2:] - points[1:-1])
+    repeat = np.all(points[1:] == points[:-1], axis=1)
+    keep = np.r_[True, (turn != 0) & ~repeat[1:], True]
+    return points[keep]
+
+
+# A* over an orthogonal visibility grid:
+def _search(rects: np.ndarray, start: np.ndarray, goal: np.ndarray, box: tuple, bend: float) -> list | None:
+
+    xs = np.unique(np.r_[rects[:, 0], rects[:, 2], start[0], goal[0], box[0], box[2]])
+    ys = np.unique(np.r_[rects[:, 1], rects[:, 3], start[1], goal[1], box[1], box[3]])
+    xs = xs[(xs >= box[0]) & (xs <= box[2])]
+    ys = ys[(ys >= box[1]) & (ys <= box[3])]
+
+    # A grid point or segment is blocked if it lies strictly inside an obstacle. Every obstacle border is a grid line,
+    # so testing a segment's midpoint suffices:
+    def inside(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        return ((values[None, :] > lo[:, None]) & (values[None, :] < hi[:, None])).astype(np.int32)
+
+    in_x, in_y = inside(xs, rects[:, 0], rects[:, 2]), inside(ys, rects[:, 1], rects[:, 3])
+    mid_x = inside((xs[1:] + xs[:-1]) / 2, rects[:, 0], rects[:, 2])
+    mid_y = inside((ys[1:] + ys[:-1]) / 2, rects[:, 1], rects[:, 3])
+
+    node_free = (in_x.T @ in_y) == 0  # (nx, ny)
+    east_free = (mid_x.T @ in_y) == 0  # Segment (i, j) -> (i + 1, j), shape (nx - 1, ny).
+    south_free = (in_x.T @ mid_y) == 0  # Segment (i, j) -> (i, j + 1), shape (nx, ny - 1).
+
+    def free(i: int, j: int, d: int) -> bool:
+        if d == 0:
+            return i + 1 < len(xs) and east_free[i, j]
+        if d == 1:
+            return j + 1 < len(ys) and south_free[i, j]
+        if d == 2:
+            return i > 0 and east_free[i - 1, j]
+        return j > 0 and south_free[i, j - 1]
+
+    si, sj = int(np.searchsorted(xs, start[0])), int(np.searchsorted(ys, start[1]))
+    gi, gj = int(np.searchsorted(xs, goal[0])), int(np.searchsorted(ys, goal[1]))
+    if not (node_free[si, sj] and node_free[gi, gj]):
+        return None
+
+    gx, gy = xs[gi], ys[gj]
+    xs_list, ys_list = xs.tolist(), ys.tolist()
+
+    # States are (i, j, direction); the origin's stub leaves eastwards and the target's stub enters eastwards:
+    best = {(si, sj, 0): 0.0}
+    parent = {}
+    heap = [(abs(gx - start[0]) + abs(gy - start[1]), 0.0, si, sj, 0)]
+
+    while heap:
+        _, cost, i, j, d = heapq.heappop(heap)
+        if cost > best.get((i, j, d), np.inf):
+            continue
+
+        if (i, j) == (gi, gj):
+            path, state = [], (i, j, d)
+            while state is not None:
+                path.append((xs_list[state[0]], ys_list[state[1]]))
+                state = parent.get(state)
+            return path[::-1]
+
+        for nd, (di, dj) in enumerate(_STEPS):
+            if nd == (d + 2) % 4 or not free(i, j, nd):
+                continue
+
+            ni, nj = i + di, j + dj
+            step = abs(xs_list[ni] - xs_list[i]) + abs(ys_list[nj] - ys_list[j])
+            total = cost + step + (bend if nd != d else 0.0)
+            if (ni, nj) == (gi, gj) and nd != 0:
+                total += bend  # Turning into the target's stub.
+
+            if total < best.get((ni, nj, nd), np.inf):
+                best[(ni, nj, nd)] = total
+                parent[(ni, nj, nd)] = (i, j, d)
+                estimate = abs(gx - xs_list[ni]) + abs(gy - ys_list[nj])
+                heapq.heappush(heap, (total + estimate, total, ni, nj, nd))
+
+    return None
+
+
+# Route one edge:
+def route(obstacles: Obstacles, origin: tuple[float, float], target: tuple[float, float], **kwargs) -> Route:
+    """
+    Find an orthogonal path from an output handle (leaving eastwards) to an input handle (entered eastwards) that keeps
+    clear of all obstacles.
+    :param obstacles: Obstacle snapshot.
+    :param origin: Origin point in scene coordinates.
+    :param target: Target point in scene coordinates.
+    :param kwargs: Overrides of RoutingOpts.
+    :return: A Route. If no path exists within the search region, the route is a plain three-segment elbow.
+
+    Note:
+        - Only obstacles within a corridor around the endpoints are considered; the corridor is widened once if the
+          search fails. A cached route stays valid as long as no obstacle inside its corridor changes.
+    """
+
+    opts = {**RoutingOpts, **kwargs}
+    origin, target = np.asarray(origin, dtype=np.float64), np.asarray(target, dtype=np.float64)
+    start = origin + (opts["stub"], 0.0)
+    goal = target - (opts["stub"], 0.0)
+    rects = obstacles.rects + np.array([-1, -1, 1, 1]) * opts["margin"]
+
+    # Obstacles that contain an endpoint's stub (e.g. overlapping nodes) cannot be avoided:
+    blocking = _intersects(rects, (*start, *start)) | _intersects(rects, (*goal, *goal))
+    rects = rects[~blocking] if len(rects) else rects
+
+    lo, hi = np.minimum(start, goal), np.maximum(start, goal)
+    for widen in (1.0, 4.0):
+        pad = opts["corridor"] * widen
+        box = (lo[0] - pad, lo[1] - pad, hi[0] + pad, hi[1] + pad)
+        path = _search(rects[_intersects(rects, box)], start, goal, box, opts["bend"])
+        if path is not None:
+            points = np.array([origin, *path, target])
+            return Route(simplify(points), box, obstacles.version)
+
+    middle = (start[0] + goal[0]) / 2
+    points = np.array([origin, start, (middle, start[1]), (middle, goal[1]), goal, target])
+    return Route(simplify(points), box, obstacles.version)
+
+
+# Route several edges against the same snapshot (one worker job):
+def route_batch(obstacles: Obstacles, requests: list[tuple], **kwargs) -> list[tuple]:
+    """
+    :param requests: (key, origin, target) tuples.
+    :return: (key, Route) tuples.
+    """
+    return [(key, route(obstacles, origin, target, **kwargs)) for key, origin, target in requests]
+
+
+# Class Router:
+class Router:
+    """
+    Obstacle registry and route cache.
+
+    Note:
+        - Cached routes are always valid for the current obstacles: an obstacle change drops the routes whose corridor
+          it touches, found through a bucket grid of corridors, so moving one node only visits the routes near it.
+        - A route computed by a worker for an older version is accepted if none of the obstacle changes since then
+          touched its corridor (see `store`).
+        - Not thread-safe: use it from one thread and pass `snapshot()` to workers.
+    """
+
+    def __init__(self, **kwargs):
+
+        self.opts = {**RoutingOpts, **kwargs}
+        self.version = 0
+        self._rects: dict[int, tuple[float, float, float, float]] = {}
+        self._history: list[tuple[float, float, float, float]] = []  # Changed regions, one per version.
+        self._cache: OrderedDict[tuple, Route] = OrderedDict()
+        self._buckets: dict[tuple[int, int], set[tuple]] = {}  # Cell -> keys of the routes whose corridor overlaps it.
+        self._snapshot: Obstacles | None = None
+
+    # Cache key of an edge:
+    @staticmethod
+    def key(origin: tuple[float, float], target: tuple[float, float]) -> tuple:
+        return round(origin[0], 1), round(origin[1], 1), round(target[0], 1), round(target[1], 1)
+
+    # Cells of the bucket grid overlapped by a box:
+    def _cells(self, box: tuple[float, float, float, float]):
+
+        size = self.opts["bucket"]
+        i0, j0, i1, j1 = (int(np.floor(value / size)) for value in box)
+        return ((i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+
+    # Add a route to, or remove it from, the cache and the bucket grid:
+    def _insert(self, key: tuple, cached: Route) -> None:
+
+        self._discard(key)
+        self._cache[key] = cached
+        for cell in self._cells(cached.corridor):
+            self._buckets.setdefault(cell, set()).add(key)
+
+    def _discard(self, key: tuple) -> None:
+
+        cached = self._cache.pop(key, None)
+        if cached is None:
+            return
+
+        for cell in self._cells(cached.corridor):
+            bucket = self._buckets.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[cell]
+
+    # Add, move or (with rect=None) remove an obstacle:
+    def set_obstacle(self, uid: int, rect: tuple[float, float, float, float] | None) -> list[tuple]:
+        """
+        Update an obstacle.
+        :return: Keys of the cached routes invalidated (and dropped) by the change.
+        """
+
+        old = self._rects.pop(uid, None)
+        if rect is not None:
+            self._rects[uid] = tuple(map(float, rect))
+
+        if old == rect:
+            return []
+
+        # The changed region covers both the old and the new extent, plus the clearance:
+        extent = np.array([r for r in (old, rect) if r is not None])
+        margin = self.opts["margin"]
+        region = (*(extent[:, :2].min(axis=0) - margin), *(extent[:, 2:].max(axis=0) + margin))
+
+        self.version += 1
+        self._history.append(region)
+        if len(self._history) > self.opts["history"]:
+            self._history = self._history[-self.opts["history"]:]
+        self._snapshot = None
+
+        # Routes whose corridor overlaps the region (the grid only narrows the candidates down):
+        x0, y0, x1, y1 = region
+        stale = set()
+        for cell in self._cells(region):
+            for key in self._buckets.get(cell, ()):
+                c = self._cache[key].corridor
+                if c[0] < x1 and c[2] > x0 and c[1] < y1 and c[3] > y0:
+                    stale.add(key)
+
+        for key in stale:
+            self._discard(key)
+
+        return list(stale)
+
+    # Whether any obstacle change since the route's version touched its corridor:
+    def _hits(self, result: Route) -> bool:
+
+        missed = self.version - result.version
+        if missed > len(self._history):
+            return True
+
+        regions = np.array(self._history[len(self._history) - missed:])
+        return bool(_intersects(regions, result.corridor).any())
+
+    # Immutable view of the obstacles for a worker:
+    def snapshot(self) -> Obstacles:
+
+        if self._snapshot is None:
+            rects = np.array(list(self._rects.values()), dtype=np.float64).reshape(-1, 4)
+            self._snapshot = Obstacles(self.version, rects)
+        return self._snapshot
+
+    # Get a valid cached route:
+    def lookup(self, key: tuple) -> Route | None:
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+        return cached
+
+    # Store a computed route:
+    def store(self, key: tuple, result: Route) -> bool:
+        """
+        Cache a route computed by a worker.
+        :return: Whether the route is still valid for the current obstacles.
+        """
+
+        if result.version != self.version and (result.version > self.version or self._hits(result)):
+            return False
+
+        self._insert(key, dataclasses.replace(result, version=self.version))
+        while len(self._cache) > self.opts["cache"]:
+            self._discard(next(iter(self._cache)))
+        return True
+
+
+# Exported names
+__all__ = ["RoutingOpts", "Obstacles", "Route", "Router", "route", "route_batch", "simplify"]
@@ -0,0 +1,251 @@
+# Encoding: utf-8
+# Module name: sankey
+# Description: Aggregation of solved edge flows into a layered Sankey diagram
+
+# Imports (standard)
+from __future__ import annotations
+import dataclasses
+
+# Imports (third party)
+import numpy as np
+from scipy import sparse
+
+# Imports (local)
+from core.graphModel import GraphModel
+from core.topology import analyze
+
+
+# Default layout options:
+SankeyOpts = {
+    "width": 1200.0,  # Total width of the diagram.
+    "height": 800.0,  # Total height of the diagram.
+    "node-width": 14.0,
+    "padding": 12.0,  # Vertical gap between nodes of a layer.
+}
+
+
+# Class SankeyLinks:
+@dataclasses.dataclass
+class SankeyLinks:
+    """
+    Edge flows aggregated by (origin node, target node, stream label).
+    """
+
+    origin: np.ndarray  # Node index.
+    target: np.ndarray  # Node index.
+    stream: np.ndarray  # Index into GraphModel.streams.
+    edge: np.ndarray  # Model indices of the edges with valid endpoints.
+    edge_link: np.ndarray  # Link of each of those edges.
+
+    def __len__(self) -> int:
+        return len(self.origin)
+
+
+# Class SankeyGeometry:
+@dataclasses.dataclass
+class SankeyGeometry:
+    """
+    Positions and sizes of a laid-out diagram. Node arrays are indexed by model node, link arrays by link.
+    """
+
+    node_x: np.ndarray
+    node_y: np.ndarray
+    node_h: np.ndarray
+    link_y0: np.ndarray  # Top of the band where it leaves its origin node.
+    link_y1: np.ndarray  # Top of the band where it enters its target node.
+    link_w: np.ndarray  # Band thickness.
+    value: np.ndarray  # Aggregated flow of each link.
+
+
+# Group edges into links:
+def aggregate(model: GraphModel) -> SankeyLinks:
+    """
+    Fold parallel edges that connect the same pair of nodes with the same stream into one link.
+    """
+
+    valid = np.flatnonzero((model.edge_origin >= 0) & (model.edge_target >= 0))
+    origin = model.handle_node[model.edge_origin[valid]].astype(np.int64)
+    target = model.handle_node[model.edge_target[valid]].astype(np.int64)
+    stream = model.handle_stream[model.edge_origin[valid]].astype(np.int64)
+
+    streams = max(1, len(model.streams))
+    keys = (origin * model.num_nodes + target) * streams + stream
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    return SankeyLinks(
+        origin=origin[first],
+        target=target[first],
+        stream=stream[first],
+        edge=valid,
+        edge_link=inverse.ravel(),
+    )
+
+
+# Assign layers by longest path over the condensation:
+def layers(model: GraphModel) -> np.ndarray:
+    """
+    Layer of every node: the longest path to it in the DAG of strong components, so cycle members share a layer.
+    """
+
+    strong = analyze(model).strong
+    count = int(strong.max(initial=-1)) + 1
+
+    valid = (model.edge_origin >= 0) & (model.edge_target >= 0)
+    origin = strong[model.handle_node[model.edge_origin[valid]]]
+    target = strong[model.handle_node[model.edge_target[valid]]]
+    mask = origin != target
+
+    dag = sparse.csr_matrix(
+        (np.ones(int(mask.sum()), dtype=np.int32), (origin[mask], target[mask])), shape=(count, count)
+    )
+    dag.data[:] = 1  # Collapse parallel edges.
+
+    # Kahn's algorithm, one vectorized step per layer:
+    indegree = np.asarray(dag.sum(axis=0)).ravel()
+    layer = np.zeros(count, dtype=np.int64)
+    frontier = np.flatnonzero(indegree == 0)
+    depth = 0
+
+    while len(frontier):
+        layer[frontier] = depth
+        successors = dag[frontier].indices
+        np.subtract.at(indegree, successors, 1)
+        frontier = np.unique(successors[indegree[successors] == 0])
+        depth += 1
+
+    return layer[strong]
+
+
+# Class SankeyLayout:
+class SankeyLayout:
+    """
+    Layered Sankey layout of a model.
+
+    Note:
+        - The structure (links, layers and the order of nodes within layers) depends only on the graph and is cached
+          per model version.
+        - `update(flows)` recomputes node sizes, positions and band offsets only, which is all vectorized.
+    """
+
+    def __init__(self, model: GraphModel, **kwargs):
+
+        self.model = model
+        self.opts = {**SankeyOpts, **kwargs}
+        self._version = None
+
+    # Rebuild the cached structure if the model changed:
+    def _structure(self) -> None:
+
+        if self._version == self.model.version:
+            return
+
+        model = self.model
+        self.links = aggregate(model)
+        self.layer = layers(model)
+
+        # Order nodes within each layer by the mean rank of their predecessors (one downward sweep):
+        rank = np.zeros(model.num_nodes)
+        order = np.lexsort((np.arange(model.num_nodes), self.layer))
+        rank[order] = np.arange(model.num_nodes)
+
+        incoming = sparse.csr_matrix(
+            (np.ones(len(self.links.origin)), (self.links.target, self.links.origin)),
+            shape=(model.num_nodes, model.num_nodes),
+        )
+        for depth in range(1, int(self.layer.max(initial=0)) + 1):
+            nodes = np.flatnonzero(self.layer == depth)
+            degree = np.asarray(incoming[nodes].sum(axis=1)).ravel()
+            center = np.where(degree > 0, incoming[nodes] @ rank / np.maximum(degree, 1), rank[nodes])
+            rank[nodes[np.argsort(center, kind="stable")]] = np.sort(rank[nodes])
+
+        self.order = np.lexsort((rank, self.layer))
+        self._version = model.version
+
+    # Compute the geometry for a set of flows:
+    def update(self, flows: np.ndarray, epoch: int | None = None) -> SankeyGeometry:
+        """
+        Lay out the diagram for the given flows.
+        :param flows: Edge flows of shape (num_edges, epochs), e.g. `SolveResult.flows`.
+        :param epoch: Epoch to show (default: the sum over all epochs).
+        :return: A SankeyGeometry.
+        """
+
+        self._structure()
+        model, links, opts = self.model, self.links, self.opts
+
+        per_edge = np.nan_to_num(flows.sum(axis=1) if epoch is None else flows[:, epoch])
+        value = np.bincount(links.edge_link, weights=per_edge[links.edge], minlength=len(links))
+
+        # Node size: the larger of total inflow and total outflow:
+        inflow = np.bincount(links.target, weights=value, minlength=model.num_nodes)
+        outflow = np.bincount(links.origin, weights=value, minlength=model.num_nodes)
+        size = np.maximum(inflow, outflow)
+
+        # Scale so that the fullest layer fits the height:
+        depth = int(self.layer.max(initial=0)) + 1
+        totals = np.bincount(self.layer, weights=size, minlength=depth)
+        counts = np.bincount(self.layer, minlength=depth)
+        padding = min(opts["padding"], 0.25 * opts["height"] / max(int(counts.max(initial=1)) - 1, 1))
+        room = opts["height"] - padding * np.maximum(counts - 1, 0)
+        scale = np.min(np.where(totals > 0, room / np.maximum(totals, 1e-12), np.inf), initial=np.inf)
+        scale = scale if np.isfinite(scale) else 0.0
+
+        # Stack the nodes of each layer from the top, in order:
+        height = size * scale
+        stacked = height[self.order] + padding
+        top = np.cumsum(stacked) - stacked
+        start = np.r_[0, np.cumsum(counts)[:-1]]
+        top -= top[start[self.layer[self.order]]]
+
+        node_y = np.empty(model.num_nodes)
+        node_y[self.order] = top
+        span = opts["width"] - opts["node-width"]
+        node_x = self.layer * (span / max(depth - 1, 1))
+
+        # Band offsets: bands leave a node ordered by their target's position, and enter ordered by their origin's:
+        width = value * scale
+        link_y0 = self._offsets(links.origin, node_y[links.target], width, node_y)
+        link_y1 = self._offsets(links.target, node_y[links.origin], width, node_y)
+
+        return SankeyGeometry(node_x, node_y, height, link_y0, link_y1, width, value)
+
+    # Stack bands along the side of their node:
+    @staticmethod
+    def _offsets(node: np.ndarray, other: np.ndarray, width: np.ndarray, node_y: np.ndarray) -> np.ndarray:
+
+        if not len(node):
+            return np.empty(0)
+
+        order = np.lexsort((other, node))
+        cumulative = np.cumsum(width[order]) - width[order]
+        first = np.r_[0, np.flatnonzero(np.diff(node[order])) + 1]
+        groups = np.repeat(first, np.diff(np.r_[first, len(order)]))
+        offsets = np.empty(len(node))
+        offsets[order] = node_y[node[order]] + cumulative - cumulative[groups]
+        return offsets
+
+
+# Flow totals per stream label:
+def stream_totals(model: GraphModel, flows: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Total flow of each stream per epoch.
+    :return: Maps stream label to an array of length `epochs`.
+    """
+
+    valid = np.flatnonzero((model.edge_origin >= 0) & (model.edge_target >= 0))
+    stream = model.handle_stream[model.edge_origin[valid]]
+    totals = np.zeros((len(model.streams), flows.shape[1]))
+    np.add.at(totals, stream, np.nan_to_num(flows[valid]))
+    return {label: totals[index] for index, label in enumerate(model.streams)}
+
+
+# Exported names
+__all__ = [
+    "SankeyOpts",
+    "SankeyLinks",
+    "SankeyGeometry",
+    "SankeyLayout",
+    "aggregate",
+    "layers",
+    "stream_totals",
+]
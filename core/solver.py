@@ -0,0 +1,151 @@
+# Encoding: utf-8
+# Module name: solver
+# Description: Linear flow-balance solver for GraphModel instances
+
+# Imports (standard)
+from __future__ import annotations
+import dataclasses
+
+# Imports (third party)
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+# Imports (optional)
+try:
+    import highspy  # Direct HiGHS bindings, required for warm starts.
+except ImportError:
+    highspy = None
+
+# Whether solves can start from a previous basis (see SolveResult.basis):
+WARM_START = highspy is not None
+
+# Imports (local)
+from core.graphModel import GraphModel
+from core.compiler import BalanceSystem, compile_balance
+
+
+# Class SolveResult:
+@dataclasses.dataclass
+class SolveResult:
+    status: int  # 0 on success (see scipy.optimize.linprog for the other codes).
+    message: str
+    objective: float
+    flows: np.ndarray  # Edge flows, shape (num_edges, epochs).
+    basis: tuple[np.ndarray, np.ndarray] | None = None  # Column and row basis status (HiGHS only).
+
+    @property
+    def success(self) -> bool:
+        return self.status == 0
+
+
+# Solve with the HiGHS bindings, optionally starting from a previous basis:
+def _solve_highs(system: BalanceSystem, basis: tuple | None, keep_basis: bool) -> tuple:
+
+    matrix = sparse.vstack([system.a_eq, system.a_ub], format="csr")
+    inf = highspy.kHighsInf
+
+    lp = highspy.HighsLp()
+    lp.num_col_, lp.num_row_ = matrix.shape[1], matrix.shape[0]
+    lp.col_cost_ = system.cost
+    lp.col_lower_ = np.zeros(matrix.shape[1])
+    lp.col_upper_ = np.where(np.isinf(system.upper), inf, system.upper)
+    lp.row_lower_ = np.concatenate([system.b_eq, np.full(len(system.b_ub), -inf)])
+    lp.row_upper_ = np.concatenate([system.b_eq, np.where(np.isinf(system.b_ub), inf, system.b_ub)])
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    lp.a_matrix_.num_col_, lp.a_matrix_.num_row_ = matrix.shape[1], matrix.shape[0]
+    lp.a_matrix_.start_ = matrix.indptr
+    lp.a_matrix_.index_ = matrix.indices
+    lp.a_matrix_.value_ = matrix.data
+
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.passModel(lp)
+
+    if basis is not None:
+        status = [highspy.HighsBasisStatus(v) for v in range(5)]  # Lookup is much faster than construction.
+        start = highspy.HighsBasis()
+        start.col_status = list(map(status.__getitem__, basis[0].tolist()))
+        start.row_status = list(map(status.__getitem__, basis[1].tolist()))
+        start.valid = True
+        highs.setBasis(start)
+
+    highs.run()
+
+    status = highs.getModelStatus()
+    code = {
+        highspy.HighsModelStatus.kOptimal: 0,
+        highspy.HighsModelStatus.kInfeasible: 2,
+        highspy.HighsModelStatus.kUnbounded: 3,
+    }.get(status, 4)
+
+    x = np.asarray(highs.getSolution().col_value) if code == 0 else None
+    basis = None
+    if keep_basis and (final := highs.getBasis()).valid:
+        basis = (
+            np.asarray(final.col_status, dtype=np.int8),
+            np.asarray(final.row_status, dtype=np.int8),
+        )
+
+    return code, highs.modelStatusToString(status), highs.getInfo().objective_function_value, x, basis
+
+
+# Solve a compiled system:
+def solve_system(
+    system: BalanceSystem,
+    num_edges: int | None = None,
+    basis: tuple[np.ndarray, np.ndarray] | None = None,
+    keep_basis: bool = False,
+) -> SolveResult:
+    """
+    Solve a compiled BalanceSystem.
+    :param system: The compiled constraints (see core.compiler).
+    :param num_edges: Number of edges in the model, used to shape the flow matrix (default: `len(system.edges)`).
+    :param basis: Starting basis from a previous SolveResult; used only when `highspy` is installed.
+    :param keep_basis: Whether to return the final basis for a later warm start.
+    :return: A SolveResult.
+    """
+
+    rows = num_edges if num_edges is not None else len(system.edges)
+    flows = np.zeros((rows, system.epochs))
+    if system.num_vars == 0:
+        return SolveResult(0, "Empty model", 0.0, flows)
+
+    if highspy is not None:
+        status, message, objective, x, basis = _solve_highs(system, basis, keep_basis)
+
+    else:
+        has_eq, has_ub = system.a_eq.shape[0] > 0, system.a_ub.shape[0] > 0
+        result = linprog(
+            system.cost,
+            A_ub=system.a_ub if has_ub else None,
+            b_ub=system.b_ub if has_ub else None,
+            A_eq=system.a_eq if has_eq else None,
+            b_eq=system.b_eq if has_eq else None,
+            bounds=np.column_stack([np.zeros(system.num_vars), system.upper]),
+            method="highs",
+        )
+        status, message, x, basis = int(result.status), str(result.message), result.x, None
+        objective = result.fun if result.fun is not None else float("nan")
+
+    if x is not None:
+        flows[system.edges] = x.reshape(system.epochs, len(system.edges)).T
+    else:
+        flows[:] = np.nan
+
+    return SolveResult(status, message, float(objective), flows, basis)
+
+
+# Assemble and solve the flow-balance problem:
+def solve(model: GraphModel) -> SolveResult:
+    """
+    Solve for edge flows over all epochs (see `core.compiler.compile_balance` for the formulation).
+    :param model: The model to solve.
+    :return: A SolveResult.
+    """
+
+    return solve_system(compile_balance(model), model.num_edges)
+
+
+# Exported names
+__all__ = ["WARM_START", "SolveResult", "solve", "solve_system"]
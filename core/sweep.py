@@ -0,0 +1,329 @@
+# Encoding: utf-8
+# Module name: sweep
+# Description: Parallel, resumable parameter sweeps over a base GraphModel
+
+# Imports (standard)
+from __future__ import annotations
+import os
+import json
+import glob
+import pickle
+import hashlib
+import logging
+import itertools
+import dataclasses
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable
+
+# Imports (third party)
+import numpy as np
+
+# Imports (local)
+from core.graphModel import GraphModel
+
+logger = logging.getLogger(__name__)
+
+# A swept parameter is addressed by (node id, parameter name):
+ParameterKey = tuple[int, str]
+
+# Default sweep options:
+SweepOpts = {
+    "workers": max(1, (os.cpu_count() or 2) - 1),
+    "chunk": 64,  # Scenarios per result part written to disk.
+    "in-flight": 4,  # Submitted-but-unfinished scenarios per worker.
+    "failed-status": -1,  # Status recorded for scenarios whose worker raised.
+}
+
+
+# Full-factorial grid:
+def parameter_grid(axes: dict[ParameterKey, Iterable[float]]) -> list[dict[ParameterKey, float]]:
+    """
+    Cartesian product of parameter values.
+    :param axes: Values to take for each (node id, parameter name).
+    :return: One override dictionary per scenario.
+    """
+
+    keys = list(axes)
+    return [
+        dict(zip(keys, values))
+        for values in itertools.product(*(list(axes[key]) for key in keys))
+    ]
+
+
+# Latin-hypercube samples:
+def latin_hypercube(
+    bounds: dict[ParameterKey, tuple[float, float]], samples: int, seed: int | None = None
+) -> list[dict[ParameterKey, float]]:
+    """
+    Latin-hypercube samples within the given bounds (one stratum per sample on every axis).
+    :param bounds: Lower and upper bound for each (node id, parameter name).
+    :param samples: Number of scenarios.
+    :param seed: Seed for reproducible designs.
+    :return: One override dictionary per scenario.
+    """
+
+    rng = np.random.default_rng(seed)
+    keys = list(bounds)
+    lower = np.array([bounds[key][0] for key in keys], dtype=np.float64)
+    upper = np.array([bounds[key][1] for key in keys], dtype=np.float64)
+
+    # Jitter within each stratum, then shuffle strata independently per axis:
+    unit = (np.arange(samples)[:, None] + rng.random((samples, len(keys)))) / samples
+    unit = np.take_along_axis(unit, rng.random((samples, len(keys))).argsort(axis=0), axis=0)
+    values = lower + unit * (upper - lower)
+
+    return [dict(zip(keys, row)) for row in values.tolist()]
+
+
+# Class ResultStore:
+class ResultStore:
+    """
+    Columnar, append-only store of sweep results.
+
+    Note:
+        - Each flush writes one `part-NNNNN.npz` with one array per column, renamed into place atomically.
+        - A scenario is complete once it appears in a part, which makes interrupted sweeps resumable.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    # Paths of all parts, in write order:
+    def _parts(self) -> list[str]:
+        return sorted(glob.glob(os.path.join(self.path, "part-*.npz")))
+
+    # Check (or record) the sweep definition this store belongs to:
+    def bind(self, digest: str) -> None:
+
+        manifest = os.path.join(self.path, "sweep.json")
+        if os.path.exists(manifest):
+            with open(manifest, "r") as file:
+                if json.load(file).get("digest") != digest:
+                    raise ValueError(f"{self.path} holds results of a different sweep")
+            return
+
+        with open(manifest, "w") as file:
+            json.dump({"digest": digest}, file)
+
+    # Indices of scenarios that already have results:
+    def completed(self) -> set[int]:
+
+        done: set[int] = set()
+        for part in self._parts():
+            with np.load(part) as data:
+                done.update(data["scenario"].tolist())
+        return done
+
+    # Write a batch of records as a new part:
+    def append(self, columns: dict[str, np.ndarray]) -> None:
+
+        index = len(self._parts())
+        final = os.path.join(self.path, f"part-{index:05d}.npz")
+        temp = final + ".tmp"
+
+        with open(temp, "wb") as file:
+            np.savez(file, **columns)
+        os.replace(temp, final)
+
+    # Concatenate all parts:
+    def load(self) -> dict[str, np.ndarray]:
+
+        columns: dict[str, list[np.ndarray]] = {}
+        for part in self._parts():
+            with np.load(part) as data:
+                for key in data.files:
+                    columns.setdefault(key, []).append(data[key])
+
+        return {key: np.concatenate(value) for key, value in columns.items()}
+
+
+# Worker-process state, populated once per worker by `_init_worker`:
+_BASE_MODEL: GraphModel | None = None
+_NODE_POSITION: dict[int, int] = {}
+
+
+# Worker initializer:
+def _init_worker(block: str, size: int) -> None:
+
+    global _BASE_MODEL, _NODE_POSITION
+
+    memory = shared_memory.SharedMemory(name=block)
+    try:
+        _BASE_MODEL = pickle.loads(memory.buf[:size])
+    finally:
+        memory.close()
+
+    _NODE_POSITION = {int(nid): pos for pos, nid in enumerate(_BASE_MODEL.node_ids.tolist())}
+
+
+# Worker task:
+def _run_scenario(index: int, overrides: dict[ParameterKey, float]) -> tuple:
+
+    from core.solver import solve
+
+    base = _BASE_MODEL
+
+    # Copy only the parameter dictionaries that this scenario overrides:
+    par = list(base.node_par)
+    for (node, name), value in overrides.items():
+        pos = _NODE_POSITION[int(node)]
+        if par[pos] is base.node_par[pos]:
+            par[pos] = dict(par[pos])
+        par[pos][name] = value
+
+    result = solve(dataclasses.replace(base, node_par=par))
+    return index, result.status, result.objective, result.flows.astype(np.float32), ""
+
+
+# Class SweepRunner:
+class SweepRunner:
+    """
+    Runs scenarios of a base model in a process pool and streams their results into a ResultStore.
+
+    Note:
+        - A scenario whose worker raises is stored as failed (status `SweepOpts["failed-status"]`, NaN objective and
+          flows) with the exception in the `error` column; the other scenarios keep running.
+        - A crashed worker process breaks the whole pool and still aborts the run.
+    """
+
+    def __init__(
+        self,
+        model: GraphModel,
+        scenarios: list[dict[ParameterKey, float]],
+        store: ResultStore | str,
+        **kwargs,
+    ):
+        self.model = model
+        self.scenarios = scenarios
+        self.store = store if isinstance(store, ResultStore) else ResultStore(store)
+
+        self._workers = kwargs.get("workers", SweepOpts["workers"])
+        self._chunk = kwargs.get("chunk", SweepOpts["chunk"])
+        self._flows = kwargs.get("keep_flows", True)
+        self._callback: Callable[[int, int], Any] | None = kwargs.get("progress", None)
+
+        self._keys = sorted({key for scenario in scenarios for key in scenario})
+
+    # Fingerprint of the model and scenario design:
+    def digest(self, payload: bytes) -> str:
+
+        design = json.dumps(
+            [[[str(k) for k in key], [s.get(key) for s in self.scenarios]] for key in self._keys]
+        )
+        return hashlib.sha1(payload + design.encode()).hexdigest()
+
+    # Convert buffered results into columns:
+    def _columns(self, buffer: list[tuple]) -> dict[str, np.ndarray]:
+
+        index = np.array([row[0] for row in buffer], dtype=np.int64)
+        columns = {
+            "scenario": index,
+            "status": np.array([row[1] for row in buffer], dtype=np.int8),
+            "objective": np.array([row[2] for row in buffer], dtype=np.float64),
+            "error": np.array([row[4] for row in buffer], dtype=str),
+        }
+
+        for key in self._keys:
+            columns[f"par:{key[0]}:{key[1]}"] = np.array(
+                [self.scenarios[i].get(key, np.nan) for i in index.tolist()],
+                dtype=np.float64,
+            )
+
+        if self._flows:
+            columns["flows"] = np.stack([row[3] for row in buffer])
+
+        return columns
+
+    # Result row of a scenario whose worker raised:
+    def _failed(self, index: int, error: BaseException) -> tuple:
+
+        logger.error(f"Sweep: scenario {index} failed: {error}")
+        flows = np.full((len(self.model.edge_origin), self.model.epochs), np.nan, dtype=np.float32)
+        return index, SweepOpts["failed-status"], np.nan, flows, f"{type(error).__name__}: {error}"
+
+    # Run all pending scenarios:
+    def run(self) -> dict[str, np.ndarray]:
+        """
+        Run every scenario that the store does not hold yet; safe to call again after an interruption.
+        :return: All results in the store, as columns.
+        """
+
+        payload = pickle.dumps(self.model, protocol=pickle.HIGHEST_PROTOCOL)
+        self.store.bind(self.digest(payload))
+
+        done = self.store.completed()
+        pending = [i for i in range(len(self.scenarios)) if i not in done]
+        if not pending:
+            return self.store.load()
+
+        logger.info(f"Sweep: {len(done)} scenarios done, {len(pending)} pending")
+
+        # Publish the base model once; workers unpickle it in their initializer:
+        memory = shared_memory.SharedMemory(create=True, size=len(payload))
+        memory.buf[: len(payload)] = payload
+
+        buffer: list[tuple] = []
+        finished = len(done)
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(memory.name, len(payload)),
+            ) as executor:
+
+                queue = iter(pending)
+                limit = self._workers * SweepOpts["in-flight"]
+                futures: dict[Future, int] = {}
+
+                while True:
+
+                    # Keep a bounded number of scenarios in flight:
+                    for index in itertools.islice(queue, limit - len(futures)):
+                        futures[executor.submit(_run_scenario, index, self.scenarios[index])] = index
+
+                    if not futures:
+                        break
+
+                    ready, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in ready:
+                        index = futures.pop(future)
+                        try:
+                            buffer.append(future.result())
+                        except BrokenProcessPool:
+                            raise
+                        except Exception as error:
+                            buffer.append(self._failed(index, error))
+
+                    finished += len(ready)
+                    if self._callback:
+                        self._callback(finished, len(self.scenarios))
+
+                    if len(buffer) >= self._chunk:
+                        self.store.append(self._columns(buffer))
+                        buffer.clear()
+
+        finally:
+            # Persist whatever finished, including on interruption:
+            if buffer:
+                self.store.append(self._columns(buffer))
+
+            memory.close()
+            memory.unlink()
+
+        return self.store.load()
+
+
+# Exported names
+__all__ = [
+    "SweepOpts",
+    "parameter_grid",
+    "latin_hypercube",
+    "ResultStore",
+    "SweepRunner",
+]
@@ -0,0 +1,311 @@
+# Encoding: utf-8
+# Module name: templates
+# Description: Shared node definitions (templates) and per-node overrides with flyweight storage
+
+# Imports (standard)
+from __future__ import annotations
+import copy
+import json
+import weakref
+import dataclasses
+from collections import ChainMap
+from typing import Any, Callable, Iterator
+
+
+# Class NodeTemplate:
+@dataclasses.dataclass(eq=False)
+class NodeTemplate:
+    """
+    A shared definition of a node's handles, parameters and equations.
+
+    Note:
+        - `par` is mutated in place by `TemplateLibrary.update`, so every instance's parameter view stays current
+          without being touched.
+        - `eqn` is a tuple, so instances can share it without copying and without being able to change it.
+    """
+
+    key: str
+    name: str = "Process"
+    icon: str | None = None
+    inp: list[dict] = dataclasses.field(default_factory=list)  # Handle definitions, e.g. {"flow": "Coal"}.
+    out: list[dict] = dataclasses.field(default_factory=list)
+    par: dict[str, Any] = dataclasses.field(default_factory=dict)
+    eqn: tuple[str, ...] = ()
+    revision: int = 0  # Incremented on every update.
+
+    def __post_init__(self):
+        self.eqn = tuple(self.eqn)
+
+    def to_dict(self) -> dict:
+        data = dataclasses.asdict(self)
+        data.pop("revision")
+        data["eqn"] = list(self.eqn)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NodeTemplate":
+        fields = {field.name for field in dataclasses.fields(cls)} - {"revision"}
+        return cls(**{key: value for key, value in data.items() if key in fields})
+
+
+# Class TemplateInstance:
+class TemplateInstance:
+    """
+    The per-node (extrinsic) state of a templated node: a reference to the template and the node's overrides.
+
+    Note:
+        - `par` is a ChainMap over (overrides, template parameters): reads fall through to the template, writes and
+          deletions only touch the overrides. A node without overrides stores two empty containers.
+        - `owner` optionally refers (weakly) to the canvas item that displays the instance.
+    """
+
+    __slots__ = ("template", "overrides", "par", "_owner", "__weakref__")
+
+    def __init__(self, template: NodeTemplate, overrides: dict | None = None):
+
+        overrides = dict(overrides or {})
+        self.template = template
+        self.par = ChainMap(dict(overrides.pop("par", {})), template.par)
+        self.overrides = overrides  # Overridden fields other than parameters, e.g. "name" or "eqn".
+        if "eqn" in overrides:
+            overrides["eqn"] = tuple(overrides["eqn"])
+        self._owner = None
+
+    @property
+    def key(self) -> str:
+        return self.template.key
+
+    @property
+    def owner(self) -> Any:
+        return self._owner() if self._owner is not None else None
+
+    @owner.setter
+    def owner(self, value: Any) -> None:
+        self._owner = weakref.ref(value) if value is not None else None
+
+    # Resolved fields (override if present, else the template's value):
+    def get(self, field: str) -> Any:
+        return self.overrides.get(field, getattr(self.template, field))
+
+    @property
+    def name(self) -> str:
+        return self.get("name")
+
+    @property
+    def eqn(self) -> tuple[str, ...]:
+        return self.get("eqn")
+
+    # Set or reset an override:
+    def override(self, field: str, value: Any) -> None:
+        """
+        Override a template field on this instance only. Pass `None` to revert to the template's value.
+        """
+
+        if value is None:
+            self.overrides.pop(field, None)
+        else:
+            self.overrides[field] = tuple(value) if field == "eqn" else value
+
+    # Overrides only, in serializable form:
+    def diff(self) -> dict:
+        data = dict(self.overrides)
+        if self.par.maps[0]:
+            data["par"] = dict(self.par.maps[0])
+        return data
+
+
+# Class TemplateLibrary:
+class TemplateLibrary:
+    """
+    A registry of node templates and their live instances.
+
+    Note:
+        - Instances are tracked weakly; deleting a node drops its instance automatically.
+        - `update` applies an edit to the shared template and then notifies every subscriber once with the full list
+          of affected instances, so canvases can refresh all of them in a single pass.
+    """
+
+    _instance: "TemplateLibrary | None" = None  # Application-wide library.
+
+    def __init__(self):
+        self._templates: dict[str, NodeTemplate] = {}
+        self._instances: dict[str, weakref.WeakSet] = {}
+        self._subscribers: list[weakref.ref] = []
+
+    @classmethod
+    def instance(cls) -> "TemplateLibrary":
+        """
+        Get the application-wide library.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._templates
+
+    def __iter__(self) -> Iterator[NodeTemplate]:
+        return iter(self._templates.values())
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def __getitem__(self, key: str) -> NodeTemplate:
+        return self._templates[key]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Templates
+
+    def add(self, template: NodeTemplate) -> NodeTemplate:
+        """
+        Register a template. An existing template with the same key is updated in place, keeping its instances.
+        """
+
+        if template.key in self._templates:
+            self.update(template.key, **template.to_dict())
+            return self._templates[template.key]
+
+        self._templates[template.key] = template
+        self._instances[template.key] = weakref.WeakSet()
+        return template
+
+    def remove(self, key: str) -> None:
+        """
+        Remove a template. Its live instances are detached: each receives a private copy of the template.
+        """
+
+        template = self._templates.pop(key)
+        for instance in list(self._instances.pop(key, ())):
+            instance.template = dataclasses.replace(template, par=dict(template.par))
+            instance.par.maps[1] = instance.template.par
+
+    def update(self, key: str, **changes) -> list[TemplateInstance]:
+        """
+        Edit a template and propagate the change to all of its instances in one batch.
+        :param key: The template's key.
+        :param changes: New values of template fields (name, icon, inp, out, par, eqn).
+        :return: The affected instances.
+        """
+
+        template = self._templates[key]
+        changed = set()
+
+        for field, value in changes.items():
+            value = tuple(value) if field == "eqn" else value
+            if field in ("key", "revision") or getattr(template, field) == value:
+                continue
+
+            if field == "par":
+                template.par.clear()  # In place: every instance's ChainMap refers to this dict.
+                template.par.update(value)
+            else:
+                setattr(template, field, value)
+            changed.add(field)
+
+        if not changed:
+            return []
+
+        template.revision += 1
+        instances = list(self._instances[key])
+        self._notify(template, instances, changed)
+        return instances
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Instances
+
+    def instantiate(self, key: str, overrides: dict | None = None) -> TemplateInstance:
+        """
+        Create a new instance of a template.
+        :param key: The template's key.
+        :param overrides: Initial overrides, e.g. {"name": "Plant 2", "par": {"efficiency": 0.4}}.
+        """
+
+        instance = TemplateInstance(self._templates[key], overrides)
+        self._instances[key].add(instance)
+        return instance
+
+    def copy(self, instance: TemplateInstance) -> TemplateInstance:
+        """
+        Create a new instance with the same template and overrides as `instance`.
+        """
+
+        overrides = copy.deepcopy(instance.diff())
+        if self._templates.get(instance.key) is instance.template:
+            return self.instantiate(instance.key, overrides)
+
+        return TemplateInstance(instance.template, overrides)  # Detached by `remove`.
+
+    def instances(self, key: str) -> list[TemplateInstance]:
+        return list(self._instances.get(key, ()))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Notifications
+
+    def subscribe(self, callback: Callable[[NodeTemplate, list[TemplateInstance], set[str]], None]) -> None:
+        """
+        Call `callback(template, instances, changed fields)` after every template update. Bound methods are held
+        weakly, so subscribing does not keep their object alive.
+        """
+
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda: callback)
+        self._subscribers.append(ref)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        self._subscribers = [ref for ref in self._subscribers if ref() not in (None, callback)]
+
+    def _notify(self, template: NodeTemplate, instances: list[TemplateInstance], changed: set[str]) -> None:
+
+        alive = []
+        for ref in self._subscribers:
+            if (callback := ref()) is not None:
+                alive.append(ref)
+                callback(template, instances, changed)
+
+        self._subscribers = alive
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Serialization
+
+    def to_dict(self) -> dict:
+        return {key: template.to_dict() for key, template in self._templates.items()}
+
+    def load_dict(self, data: dict) -> None:
+        for key, definition in data.items():
+            self.add(NodeTemplate.from_dict({**definition, "key": key}))
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def load(self, path: str) -> None:
+        with open(path, "r", encoding="utf-8") as file:
+            self.load_dict(json.load(file))
+
+
+# Resolve a project node against its template:
+def resolve_node(node: dict, templates: dict) -> tuple[str, Any, tuple[str, ...]]:
+    """
+    Return the effective (name, parameters, equations) of a project node (see core.project for the layout).
+    Parameters of templated nodes are returned as a ChainMap over the shared template dictionary; equations are
+    returned as a tuple, which is shared with the template if it already holds one. Neither argument is modified.
+    """
+
+    attr, database = node.get("attr", {}), node.get("database", {})
+    template = templates.get(node.get("template")) if node.get("template") else None
+    if template is None:
+        return (
+            str(attr.get("name", "Process")),
+            dict(database.get("par", {})),
+            tuple(database.get("eqn", ())),
+        )
+
+    eqn = database.get("eqn") or template.get("eqn", ())
+    return (
+        str(attr.get("name", template.get("name", "Process"))),
+        ChainMap(dict(database.get("par", {})), template.get("par", {})),
+        eqn if isinstance(eqn, tuple) else tuple(eqn),
+    )
+
+
+# Exported names
+__all__ = ["NodeTemplate", "TemplateInstance", "TemplateLibrary", "resolve_node"]
@@ -0,0 +1,136 @@
+# Encoding: utf-8
+# Module name: topology
+# Description: Strongly and weakly connected components and reachability of a GraphModel's node graph
+
+# Imports (standard)
+from __future__ import annotations
+import dataclasses
+
+# Imports (third party)
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+# Imports (local)
+from core.graphModel import GraphModel, ROLE_INP, ROLE_OUT
+
+
+# Class Topology:
+@dataclasses.dataclass
+class Topology:
+    """
+    Graph-level structure of a model, indexed by node.
+
+    Note:
+        - Strong components use SciPy's iterative (Pearce) variant of Tarjan's algorithm, so graph size is not limited
+          by Python's recursion limit.
+        - A result is valid for the model version it was computed for (see `analyze`).
+    """
+
+    version: int
+    strong: np.ndarray  # Strong component label of each node.
+    weak: np.ndarray  # Weak (undirected) component label of each node.
+    cyclic: np.ndarray  # Whether each node lies on a directed cycle.
+    reachable: np.ndarray  # Whether each node can be reached from a source (a node without inputs).
+    coreachable: np.ndarray  # Whether each node can reach a sink (a node without outputs).
+
+    # Nodes of each strong component that contains a cycle:
+    def cycles(self) -> list[np.ndarray]:
+        labels = np.unique(self.strong[self.cyclic])
+        order = np.argsort(self.strong, kind="stable")
+        bounds = np.searchsorted(self.strong[order], np.stack([labels, labels + 1]))
+        return [order[lo:hi] for lo, hi in bounds.T]
+
+    # Nodes of each weak component, largest first:
+    def islands(self) -> list[np.ndarray]:
+        order = np.argsort(self.weak, kind="stable")
+        splits = np.flatnonzero(np.diff(self.weak[order])) + 1
+        return sorted(np.split(order, splits), key=len, reverse=True) if len(order) else []
+
+
+# Node-to-node adjacency of the valid edges:
+def adjacency(model: GraphModel) -> sparse.csr_matrix:
+    """
+    Return the (nodes x nodes) adjacency matrix with an entry for every edge from its origin node to its target node.
+    """
+
+    valid = (model.edge_origin >= 0) & (model.edge_target >= 0)
+    origin = model.handle_node[model.edge_origin[valid]]
+    target = model.handle_node[model.edge_target[valid]]
+
+    return sparse.csr_matrix(
+        (np.ones(len(origin), dtype=np.int8), (origin, target)),
+        shape=(model.num_nodes, model.num_nodes),
+    )
+
+
+# Nodes reachable from any of the given nodes:
+def reachable_from(graph: sparse.csr_matrix, sources: np.ndarray) -> np.ndarray:
+    """
+    Breadth-first search from a set of nodes, via a virtual root connected to all of them.
+    :return: A boolean mask over the graph's nodes (sources included).
+    """
+
+    count = graph.shape[0]
+    root = sparse.csr_matrix(
+        (np.ones(len(sources), dtype=graph.dtype), (np.zeros(len(sources), dtype=np.int64), sources)),
+        shape=(1, count + 1),
+    )
+    augmented = sparse.vstack(
+        [sparse.hstack([graph, sparse.csr_matrix((count, 1), dtype=graph.dtype)]), root], format="csr"
+    )
+
+    order = csgraph.breadth_first_order(augmented, count, directed=True, return_predecessors=False)
+    mask = np.zeros(count + 1, dtype=bool)
+    mask[order] = True
+    return mask[:count]
+
+
+# Analyze a model (cached per model version):
+def analyze(model: GraphModel) -> Topology:
+    """
+    Compute the strong and weak components and source/sink reachability of the model's node graph.
+    Results are cached on the model and recomputed only after `model.touch()`.
+    :param model: The model.
+    :return: A Topology.
+    """
+
+    cached = model.cache.get("topology")
+    if cached is not None and cached.version == model.version:
+        return cached
+
+    graph = adjacency(model)
+    if model.num_nodes == 0:
+        empty = np.empty(0, dtype=np.int32)
+        mask = np.empty(0, dtype=bool)
+        model.cache["topology"] = Topology(model.version, empty, empty, mask, mask, mask)
+        return model.cache["topology"]
+
+    _, strong = csgraph.connected_components(graph, directed=True, connection="strong")
+    _, weak = csgraph.connected_components(graph, directed=True, connection="weak")
+
+    # A node is on a cycle if its strong component has more than one node, or if it has a self-loop:
+    sizes = np.bincount(strong, minlength=strong.max(initial=-1) + 1)
+    cyclic = (sizes[strong] > 1) | (graph.diagonal() > 0)
+
+    # Sources have no input handles, sinks have no output handles:
+    has_inp = np.zeros(model.num_nodes, dtype=bool)
+    has_out = np.zeros(model.num_nodes, dtype=bool)
+    has_inp[model.handle_node[model.handle_role == ROLE_INP]] = True
+    has_out[model.handle_node[model.handle_role == ROLE_OUT]] = True
+
+    result = Topology(
+        version=model.version,
+        strong=strong,
+        weak=weak,
+        cyclic=cyclic,
+        reachable=reachable_from(graph, np.flatnonzero(~has_inp)),
+        coreachable=reachable_from(graph.T.tocsr(), np.flatnonzero(~has_out)),
+    )
+
+    model.cache["topology"] = result
+    return result
+
+
+# Exported names
+__all__ = ["Topology", "adjacency", "reachable_from", "analyze"]
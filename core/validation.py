@@ -0,0 +1,176 @@
+# Encoding: utf-8
+# Module name: validation
+# Description: Structural checks run on a GraphModel before it is solved
+
+# Imports (standard)
+from __future__ import annotations
+import dataclasses
+
+# Imports (third party)
+import numpy as np
+
+# Imports (local)
+from core.graphModel import GraphModel, broadcast, ROLE_INP, ROLE_OUT
+from core.equations import EquationError, compile_equation
+from core.topology import analyze
+
+
+# Class Issue:
+@dataclasses.dataclass(frozen=True)
+class Issue:
+    severity: str  # "error" or "warning"
+    code: str
+    message: str
+    ids: tuple[int, ...] = ()  # Node or handle ids the issue refers to.
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+
+# Validate a model:
+def validate(model: GraphModel) -> list[Issue]:
+    """
+    Run structural checks on the model.
+    :param model: The model to check.
+    :return: A list of issues; the model is solvable if none of them is an error.
+    """
+
+    issues: list[Issue] = []
+
+    # Duplicate ids:
+    for label, ids in (("node", model.node_ids), ("handle", model.handle_ids)):
+        unique, counts = np.unique(ids, return_counts=True)
+        for value in unique[counts > 1].tolist():
+            issues.append(
+                Issue("error", f"duplicate-{label}", f"Duplicate {label} id {value}", (value,))
+            )
+
+    # Edges referencing unknown handles:
+    missing = np.flatnonzero((model.edge_origin < 0) | (model.edge_target < 0))
+    for edge in missing.tolist():
+        issues.append(Issue("error", "unknown-handle", f"Edge {edge} references an unknown handle"))
+
+    valid = np.flatnonzero((model.edge_origin >= 0) & (model.edge_target >= 0))
+    origin = model.edge_origin[valid]
+    target = model.edge_target[valid]
+
+    # Edges must run from an OUT handle to an INP handle:
+    for index in np.flatnonzero(
+        (model.handle_role[origin] != ROLE_OUT) | (model.handle_role[target] != ROLE_INP)
+    ).tolist():
+        issues.append(
+            Issue(
+                "error",
+                "bad-direction",
+                f"Edge {int(valid[index])} does not run from an output to an input",
+                (int(model.handle_ids[origin[index]]), int(model.handle_ids[target[index]])),
+            )
+        )
+
+    # Both ends of an edge must carry the same stream:
+    for index in np.flatnonzero(
+        model.handle_stream[origin] != model.handle_stream[target]
+    ).tolist():
+        issues.append(
+            Issue(
+                "error",
+                "stream-mismatch",
+                f"Edge {int(valid[index])} connects "
+                f"{model.streams[model.handle_stream[origin[index]]]} to "
+                f"{model.streams[model.handle_stream[target[index]]]}",
+                (int(model.handle_ids[origin[index]]), int(model.handle_ids[target[index]])),
+            )
+        )
+
+    # Handles without an edge:
+    used = np.zeros(model.num_handles, dtype=bool)
+    used[origin] = True
+    used[target] = True
+    for index in np.flatnonzero(~used).tolist():
+        issues.append(
+            Issue(
+                "warning",
+                "dangling-handle",
+                f"Handle {model.streams[model.handle_stream[index]]} on "
+                f"{model.node_names[model.handle_node[index]]} is not connected",
+                (int(model.handle_ids[index]),),
+            )
+        )
+
+    # Equations must compile, be linear and reference existing parameters:
+    for node, eqns in enumerate(model.node_eqn):
+        for text in eqns:
+            try:
+                equation = compile_equation(text)
+            except EquationError as error:
+                issues.append(Issue("error", "bad-equation", str(error), (int(model.node_ids[node]),)))
+                continue
+
+            if not equation.linear:
+                message = f"Equation on {model.node_names[node]} is not linear in its flows: {text}"
+                issues.append(Issue("error", "nonlinear-equation", message, (int(model.node_ids[node]),)))
+
+            for name in equation.parameters:
+                if broadcast(model.node_par[node].get(name), model.epochs) is None:
+                    message = f"Equation on {model.node_names[node]} references missing parameter '{name}'"
+                    issues.append(Issue("error", "missing-parameter", message, (int(model.node_ids[node]),)))
+
+    issues.extend(structure(model))
+    return issues
+
+
+# Graph-level checks:
+def structure(model: GraphModel) -> list[Issue]:
+    """
+    Report cycles without storage, disconnected islands and nodes that cannot carry flow (see core.topology).
+    :param model: The model to check.
+    :return: A list of warnings.
+    """
+
+    issues: list[Issue] = []
+    topology = analyze(model)
+    ids = model.node_ids
+
+    # Flow can circulate in a cycle only if some node on it can store:
+    storage = np.array([par.get("storage") is not None for par in model.node_par], dtype=bool)
+    for nodes in topology.cycles():
+        if not storage[nodes].any():
+            names = ", ".join(model.node_names[node] for node in nodes[:5].tolist())
+            issues.append(
+                Issue(
+                    "warning",
+                    "cycle-without-storage",
+                    f"Cycle without storage through {len(nodes)} node(s): {names}",
+                    tuple(ids[nodes].tolist()),
+                )
+            )
+
+    # Every island but the largest:
+    for nodes in topology.islands()[1:]:
+        names = ", ".join(model.node_names[node] for node in nodes[:5].tolist())
+        issues.append(
+            Issue(
+                "warning",
+                "island",
+                f"Island of {len(nodes)} node(s) disconnected from the rest of the graph: {names}",
+                tuple(ids[nodes].tolist()),
+            )
+        )
+
+    # Nodes without a path from a source or to a sink can only carry zero flow:
+    for mask, code, text in (
+        (~topology.reachable, "unreachable", "not reachable from any source"),
+        (~topology.coreachable, "dead-end", "without a path to any sink"),
+    ):
+        nodes = np.flatnonzero(mask)
+        if len(nodes):
+            names = ", ".join(model.node_names[node] for node in nodes[:5].tolist())
+            issues.append(
+                Issue("warning", code, f"{len(nodes)} node(s) {text}: {names}", tuple(ids[nodes].tolist()))
+            )
+
+    return issues
+
+
+# Exported names
+__all__ = ["Issue", "validate", "structure"]
@@ -0,0 +1,123 @@
+# Encoding: utf-8
+# Module name: messages
+# Description: Typed payloads of the EventBus's topics
+
+# Imports (standard)
+from __future__ import annotations
+import dataclasses
+from typing import Any, ClassVar
+
+
+# Class Message:
+@dataclasses.dataclass(slots=True)
+class Message:
+    """
+    Base class of typed EventBus payloads; `topic` names the subscribers' channel.
+    """
+
+    topic: ClassVar[str] = ""
+
+    # Coalescing key (see EventBus.coalesce): messages of a coalesced topic with equal keys replace each other.
+    def key(self) -> Any:
+        return None
+
+    # Shallow dict of the fields (for the untyped `instruction` signal):
+    def fields(self) -> dict:
+        return {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
+
+
+@dataclasses.dataclass(slots=True)
+class OpenInTab(Message):
+    topic: ClassVar[str] = "open_in_tab"
+
+    widget: Any = None
+    label: str | None = None
+    icon: Any = None
+
+
+@dataclasses.dataclass(slots=True)
+class ItemFocused(Message):
+    topic: ClassVar[str] = "item_focused"
+
+    item: Any = None
+
+
+@dataclasses.dataclass(slots=True)
+class ItemUpdated(Message):
+    topic: ClassVar[str] = "item_updated"
+
+    item: Any = None
+
+    def key(self) -> Any:
+        return id(self.item)
+
+
+@dataclasses.dataclass(slots=True)
+class GeometryProgress(Message):
+    topic: ClassVar[str] = "geometry_progress"
+
+    path: str = ""
+    level: int = 0
+    levels: int = 0
+    remaining: int = 0
+    points: int = 0
+
+    def key(self) -> Any:
+        return self.path
+
+
+@dataclasses.dataclass(slots=True)
+class GeometryFailed(Message):
+    topic: ClassVar[str] = "geometry_failed"
+
+    error: str = ""
+
+
+@dataclasses.dataclass(slots=True)
+class TaskProgress(Message):
+    """
+    Progress of a background task (solver run, sweep, geometry loading, ...), identified by `task`.
+    """
+
+    topic: ClassVar[str] = "task_progress"
+
+    task: str = ""
+    done: int = 0
+    total: int = 0
+
+    def key(self) -> Any:
+        return self.task
+
+
+@dataclasses.dataclass(slots=True)
+class TaskFinished(Message):
+    """
+    Result of a background task; large arrays travel as SharedArray handles (see events/processBridge.py).
+    """
+
+    topic: ClassVar[str] = "task_finished"
+
+    task: str = ""
+    result: Any = None
+    error: str | None = None
+
+
+# Payload type of each known topic:
+TOPICS: dict[str, type[Message]] = {
+    cls.topic: cls
+    for cls in (OpenInTab, ItemFocused, ItemUpdated, GeometryProgress, GeometryFailed, TaskProgress, TaskFinished)
+}
+
+
+# Exported names
+__all__ = [
+    "Message",
+    "OpenInTab",
+    "ItemFocused",
+    "ItemUpdated",
+    "GeometryProgress",
+    "GeometryFailed",
+    "TaskProgress",
+    "TaskFinished",
+    "TOPICS",
+]
@@ -0,0 +1,235 @@
+# Encoding: utf-8
+# Module name: processBridge
+# Description: Lets worker processes publish EventBus messages, passing large arrays through shared memory
+
+# Imports (standard)
+from __future__ import annotations
+import logging
+import threading
+import dataclasses
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Any
+
+# Imports (third party)
+import numpy as np
+from PySide6 import QtCore
+
+# Imports (local)
+from events.messages import Message
+from events.widgetEvents import EventBus
+
+# Default options:
+ProcessBridgeOpts = {
+    "context": "spawn",  # Multiprocessing start method of the workers that use the bridge.
+    "inline": 64 * 2**10,  # Arrays larger than this (bytes) are published through shared memory.
+}
+
+# Shared-memory blocks published by workers and not read yet (GUI process), unlinked by ProcessBridge.close:
+_UNCLAIMED: set[str] = set()
+_UNCLAIMED_LOCK = threading.Lock()
+
+
+# Class SharedArray:
+@dataclasses.dataclass(slots=True)
+class SharedArray:
+    """
+    Picklable handle of a numpy array in a shared-memory block.
+
+    Note:
+        - The publishing process creates the block and closes its mapping; the receiver owns it and must `read` it,
+          which copies the array out and unlinks the block (as core/geometry.py does for map levels).
+    """
+
+    block: str
+    shape: tuple
+    dtype: str
+
+    # Copy an array into a new block (publishing process):
+    @classmethod
+    def create(cls, array: np.ndarray) -> SharedArray:
+
+        array = np.ascontiguousarray(array)
+        memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        try:
+            view = np.ndarray(array.shape, array.dtype, memory.buf)
+            view[...] = array
+            del view  # Release the exported buffer before closing.
+        finally:
+            memory.close()
+
+        return cls(memory.name, array.shape, array.dtype.str)
+
+    # Copy the array out and release the block (receiving process):
+    def read(self) -> np.ndarray:
+
+        memory = shared_memory.SharedMemory(name=self.block)
+        try:
+            array = np.ndarray(self.shape, np.dtype(self.dtype), memory.buf).copy()
+        finally:
+            memory.close()
+            memory.unlink()
+
+        with _UNCLAIMED_LOCK:
+            _UNCLAIMED.discard(self.block)
+
+        return array
+
+
+# Replace large arrays by SharedArray handles (top-level fields, and values of dict, list or tuple fields):
+def _share(value: Any, limit: int) -> Any:
+
+    if isinstance(value, np.ndarray) and value.nbytes > limit:
+        return SharedArray.create(value)
+    if isinstance(value, dict):
+        return {key: _share(item, limit) if isinstance(item, np.ndarray) else item for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_share(item, limit) if isinstance(item, np.ndarray) else item for item in value)
+    return value
+
+
+# The SharedArray handles of a message, at the depth `_share` produces them:
+def _handles(message: Message) -> list[SharedArray]:
+
+    found = []
+    for value in message.fields().values():
+        items = value.values() if isinstance(value, dict) else value if isinstance(value, (list, tuple)) else (value,)
+        found.extend(item for item in items if isinstance(item, SharedArray))
+
+    return found
+
+
+# Class Outlet:
+class Outlet:
+    """
+    The worker-side end of a ProcessBridge.
+
+    Note:
+        - An outlet wraps a multiprocessing queue, so it can only reach a worker when the process is started: pass it
+          to `multiprocessing.Process` or as `initargs` of a pool's initializer (see `install`), not to `submit`.
+        - Messages are pickled; numpy arrays larger than `inline` bytes are first moved to shared memory, so only
+          their SharedArray handle crosses the queue.
+    """
+
+    def __init__(self, queue, inline: int):
+        self._queue = queue
+        self._inline = inline
+
+    def publish(self, message: Message) -> None:
+
+        if self._inline is not None:
+            for field in dataclasses.fields(message):
+                value = getattr(message, field.name)
+                if isinstance(value, (np.ndarray, dict, list, tuple)):
+                    setattr(message, field.name, _share(value, self._inline))
+
+        self._queue.put(message)
+
+    def share(self, array: np.ndarray) -> SharedArray:
+        """
+        Publish an array explicitly, regardless of its size.
+        """
+        return SharedArray.create(array)
+
+
+# Worker-process state, populated by `install`:
+_OUTLET: Outlet | None = None
+
+
+# Worker initializer:
+def install(outlet: Outlet) -> None:
+    """
+    Make `outlet` the target of `publish` in this worker process, e.g.
+    `ProcessPoolExecutor(initializer=install, initargs=(bridge.outlet(),), mp_context=bridge.context)`.
+    """
+
+    global _OUTLET
+    _OUTLET = outlet
+
+
+# Publish from a worker process (no-op if the worker has no outlet):
+def publish(message: Message) -> None:
+
+    if _OUTLET is not None:
+        _OUTLET.publish(message)
+
+
+# Class ProcessBridge:
+class ProcessBridge(QtCore.QObject):
+    """
+    Forwards the messages of worker processes to the EventBus.
+
+    Note:
+        - A reader thread blocks on the queue and hands each message to `EventBus.publish`, whose cross-thread path
+          delivers it on the GUI thread; coalesced topics (e.g. `task_progress`) are coalesced as usual.
+        - Handlers receive SharedArray handles in place of large arrays and call `read` on the ones they need; blocks
+          that are never read are unlinked by `close`.
+    """
+
+    def __init__(self, parent: QtCore.QObject | None = None, **kwargs):
+        super().__init__(parent)
+
+        self._opts = {**ProcessBridgeOpts, **kwargs}
+        self.context = multiprocessing.get_context(self._opts["context"])
+        self._queue = self.context.Queue()
+        self._bus = EventBus.instance()
+
+        self._reader = threading.Thread(target=self._read, name="process-bridge", daemon=True)
+        self._reader.start()
+
+    # The end to hand to worker processes:
+    def outlet(self) -> Outlet:
+        return Outlet(self._queue, self._opts["inline"])
+
+    # Reader thread:
+    def _read(self) -> None:
+
+        while True:
+            try:
+                message = self._queue.get()
+            except (EOFError, OSError):
+                return
+
+            if message is None:
+                return
+
+            handles = _handles(message)
+            if handles:
+                with _UNCLAIMED_LOCK:
+                    _UNCLAIMED.update(handle.block for handle in handles)
+
+            self._bus.publish(message)
+
+    # Stop the reader and release unread shared memory:
+    def close(self) -> None:
+
+        if self._reader.is_alive():
+            self._queue.put(None)
+            self._reader.join()
+
+        self._queue.close()
+
+        with _UNCLAIMED_LOCK:
+            names = list(_UNCLAIMED)
+            _UNCLAIMED.clear()
+
+        for name in names:
+            try:
+                memory = shared_memory.SharedMemory(name=name)
+            except FileNotFoundError:
+                continue
+
+            memory.close()
+            memory.unlink()
+            logging.getLogger(__name__).debug(f"Released unread shared-memory block {name}")
+
+
+# Exported names
+__all__ = [
+    "ProcessBridgeOpts",
+    "ProcessBridge",
+    "Outlet",
+    "SharedArray",
+    "install",
+    "publish",
+]
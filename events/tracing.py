@@ -0,0 +1,181 @@
+# Encoding: utf-8
+# Module name: tracing
+# Description: Opt-in dispatch counts, handler latencies and queue depths of the EventBus
+
+# Imports (standard)
+from __future__ import annotations
+import os
+import csv
+import json
+import collections
+from typing import Any, Callable
+
+# Imports (third party)
+import numpy as np
+
+# Default options:
+TracingOpts = {
+    "capacity": 2**16,  # Handler calls kept in the ring buffer; older ones are overwritten.
+}
+
+
+# Readable name of a subscriber:
+def _name(callback: Callable) -> str:
+
+    owner = getattr(callback, "__self__", None)
+    qualname = getattr(callback, "__qualname__", None) or repr(callback)
+    return qualname if owner is None or "." in qualname else f"{type(owner).__name__}.{qualname}"
+
+
+# Class Tracer:
+class Tracer:
+    """
+    Records the EventBus's deliveries (see EventBus.trace).
+
+    Note:
+        - Every handler call is stored as (topic, handler, posted, start, end, depth) in a fixed-size ring buffer;
+          times are `time.perf_counter_ns` values. `posted` is when the message was published or sent, so
+          `end - posted` includes the time spent queued (coalesced topics, cross-thread posts).
+        - `depth` is the number of messages still queued (coalesced or in the cross-thread inbox) at dispatch.
+        - Dispatch counts per topic are kept separately and are not bounded by the ring buffer.
+    """
+
+    def __init__(self, **kwargs):
+
+        self._capacity = int(kwargs.get("capacity", TracingOpts["capacity"]))
+        self._ring: list[tuple | None] = [None] * self._capacity
+        self._next = 0  # Total number of records written.
+        self._names: dict[Any, str] = {}  # Bound methods are keyed by (id(owner), function), see record().
+        self.counts: collections.Counter[str] = collections.Counter()
+
+    def __len__(self) -> int:
+        return min(self._next, self._capacity)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Recording (called by the EventBus on its thread)
+
+    def dispatched(self, topic: str) -> None:
+        self.counts[topic] += 1
+
+    def record(self, topic: str, callback: Callable, posted: int | None, start: int, end: int, depth: int) -> None:
+
+        # Keying by the bound method itself would keep its owner alive for as long as the tracer:
+        owner = getattr(callback, "__self__", None)
+        key = callback if owner is None else (id(owner), getattr(callback, "__func__", None) or _name(callback))
+
+        name = self._names.get(key)
+        if name is None:
+            name = self._names[key] = _name(callback)
+
+        self._ring[self._next % self._capacity] = (topic, name, start if posted is None else posted, start, end, depth)
+        self._next += 1
+
+    def clear(self) -> None:
+
+        self._ring = [None] * self._capacity
+        self._next = 0
+        self.counts.clear()
+
+    # The buffered records, oldest first:
+    def records(self) -> list[tuple]:
+
+        if self._next <= self._capacity:
+            return self._ring[: self._next]
+
+        split = self._next % self._capacity
+        return self._ring[split:] + self._ring[:split]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Reports
+
+    def summary(self) -> list[dict]:
+        """
+        :return: One entry per (topic, handler), slowest p99 latency first: {"topic", "handler", "calls",
+                 "latency_p50", "latency_p99", "run_p50", "run_p99", "depth_max"}. Latencies (publish to handler
+                 completion) and run times (handler only) are in microseconds, over the buffered records.
+        """
+
+        groups: dict[tuple[str, str], list[tuple]] = {}
+        for record in self.records():
+            groups.setdefault(record[:2], []).append(record)
+
+        entries = []
+        for (topic, handler), rows in groups.items():
+            data = np.array([row[2:] for row in rows], dtype=np.int64)
+            latency = (data[:, 2] - data[:, 0]) / 1e3
+            run = (data[:, 2] - data[:, 1]) / 1e3
+            entries.append(
+                {
+                    "topic": topic,
+                    "handler": handler,
+                    "calls": len(rows),
+                    "latency_p50": float(np.percentile(latency, 50)),
+                    "latency_p99": float(np.percentile(latency, 99)),
+                    "run_p50": float(np.percentile(run, 50)),
+                    "run_p99": float(np.percentile(run, 99)),
+                    "depth_max": int(data[:, 3].max()),
+                }
+            )
+
+        entries.sort(key=lambda entry: entry["latency_p99"], reverse=True)
+        return entries
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Export
+
+    def to_chrome_trace(self, path: str) -> None:
+        """
+        Write the records in the Chrome trace-event format (chrome://tracing, Perfetto): one complete event per handler
+        call, one per queued interval, and a queue-depth counter.
+        """
+
+        pid, events = os.getpid(), []
+        for topic, handler, posted, start, end, depth in self.records():
+            common = {"ph": "X", "pid": pid}
+            if start > posted:
+                queued = {"ts": posted / 1e3, "dur": (start - posted) / 1e3}
+                events.append({**common, **queued, "name": topic, "cat": "queued", "tid": 1})
+
+            events.append(
+                {
+                    **common,
+                    "name": handler,
+                    "cat": topic,
+                    "tid": 0,
+                    "ts": start / 1e3,
+                    "dur": (end - start) / 1e3,
+                    "args": {"latency_us": (end - posted) / 1e3},
+                }
+            )
+            events.append({"name": "queue depth", "ph": "C", "pid": pid, "ts": start / 1e3, "args": {"depth": depth}})
+
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "handlers"}},
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": 1, "args": {"name": "queued"}},
+        ]
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, file)
+
+    def to_csv(self, path: str) -> None:
+        """
+        Write one row per handler call: topic, handler, posted/start/end (ns), latency and run time (us), queue depth.
+        """
+
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["topic", "handler", "posted_ns", "start_ns", "end_ns", "latency_us", "run_us", "depth"])
+            for topic, handler, posted, start, end, depth in self.records():
+                writer.writerow([topic, handler, posted, start, end, (end - posted) / 1e3, (end - start) / 1e3, depth])
+
+    # Export by file extension (.csv, otherwise Chrome trace):
+    def export(self, path: str) -> None:
+
+        if path.lower().endswith(".csv"):
+            self.to_csv(path)
+        else:
+            self.to_chrome_trace(path)
+
+
+# Exported names
+__all__ = ["TracingOpts", "Tracer"]
@@ -4,22 +4,52 @@
 
 # Imports (standard)
 from __future__ import annotations
-from typing import Dict, Any
+import time
+import types
+import weakref
+import threading
+import collections
+from typing import TYPE_CHECKING, Dict, Any, Callable
 
 # Imports (third party)
 from PySide6 import QtCore, QtWidgets
 
+# Imports (local)
+from events.messages import Message, TOPICS
+
+if TYPE_CHECKING:
+    from events.tracing import Tracer
+
+# Default options:
+EventBusOpts = {
+    "coalesce": ("item_updated", "geometry_progress", "task_progress"),  # Topics delivered at most once per key and event-loop tick.
+}
+
 
 # Event handling utilities class
 class EventBus(QtCore.QObject):
     """
     A utility class for handling custom events in the Climact application.
+
+    Note:
+        - Subscribers register per topic (see `subscribe`) and only receive that topic's typed messages
+          (see events/messages.py); `publish` looks the topic up in a dispatch table and calls them directly.
+        - Messages of coalesced topics are queued and delivered on the next event-loop iteration, keeping only the
+          latest message per key (e.g. one `item_updated` per item, however often it changed). Queued messages are
+          delivered before any later message of a topic that is not coalesced, so a task's last `task_progress`
+          still precedes its `task_finished`.
+        - The untyped `instruction` signal is still emitted, as {"command", "payload"}, while it has receivers.
+        - `publish` and `send` may be called from any thread: off the bus's thread, messages go to a lock-free inbox
+          that is drained on the bus's thread (normally the GUI thread), so handlers always run there. Worker
+          processes publish through events/processBridge.py.
     """
 
     _instance: "EventBus | None" = None  # Singleton instance
 
     # Custom signals:
     instruction = QtCore.Signal(dict)
+    _sig_wake = QtCore.Signal()  # Internal, crosses from publishing threads.
+    _INSTRUCTION = QtCore.SIGNAL("instruction(QVariantMap)")  # Signature for `receivers`.
 
     # Singleton pattern implementation
     def __new__(cls) -> "EventBus":
@@ -35,6 +65,19 @@ class EventBus(QtCore.QObject):
         super().__init__()
         self._initialized = True
 
+        self._handlers: Dict[str, list] = {}  # Topic -> references to callbacks.
+        self._coalesced: set[str] = set(EventBusOpts["coalesce"])
+        self._pending: Dict[tuple, Message] = {}  # (topic, key) -> latest queued message.
+        self._scheduled = False
+
+        # Cross-thread delivery (deque appends and pops are atomic):
+        self._owner = threading.get_ident()
+        self._inbox: collections.deque = collections.deque()
+        self._waking = False
+        self._sig_wake.connect(self._drain, QtCore.Qt.ConnectionType.QueuedConnection)
+
+        self._tracer: Tracer | None = None  # See `trace`.
+
     @classmethod
     def instance(cls) -> EventBus:
         """
@@ -44,13 +87,173 @@ class EventBus(QtCore.QObject):
             cls._instance = cls()
         return cls._instance
 
+    # ------------------------------------------------------------------------------------------------------------------
+    # Subscriptions
+
+    def subscribe(self, topic: str, callback: Callable[[Message], None]) -> None:
+        """
+        Call `callback(message)` for every message of `topic`. Bound methods are held weakly, so subscribing does not
+        keep their object alive.
+        """
+
+        ref = weakref.WeakMethod(callback) if isinstance(callback, types.MethodType) else (lambda: callback)
+        self._handlers.setdefault(topic, []).append(ref)
+
+    def unsubscribe(self, topic: str, callback: Callable) -> None:
+
+        refs = [ref for ref in self._handlers.get(topic, []) if ref() not in (None, callback)]
+        if refs:
+            self._handlers[topic] = refs
+        else:
+            self._handlers.pop(topic, None)
+
+    def coalesce(self, topic: str, enabled: bool = True) -> None:
+        """
+        Deliver `topic` at most once per key (see Message.key) and event-loop tick.
+        """
+
+        if enabled:
+            self._coalesced.add(topic)
+        else:
+            self._coalesced.discard(topic)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Delivery
+
+    def publish(self, message: Message) -> None:
+        """
+        Deliver a typed message to the subscribers of its topic.
+        """
+
+        posted = None if self._tracer is None else time.perf_counter_ns()
+        if threading.get_ident() != self._owner:
+            self._post(posted, message)
+        else:
+            self._publish(message, posted)
+
     def send(self, command: str, payload: Any = None) -> None:
         """
         Emit a custom event with an optional payload.
+
+        Note:
+            - Kept for untyped callers: payloads of known topics are converted to their message type and published,
+              other payloads are delivered to the topic's subscribers as-is.
+        """
+
+        posted = None if self._tracer is None else time.perf_counter_ns()
+        if threading.get_ident() != self._owner:
+            self._post(posted, (command, payload))
+        else:
+            self._send(command, payload, posted)
+
+    def flush(self) -> None:
         """
-        message: Dict[str, Any] = {
-            "command": command,
-            "payload": payload,
-        }  # Wrap in dict for extensibility
+        Deliver the queued messages of coalesced topics, in the order they were first queued.
+        """
+
+        pending, self._pending, self._scheduled = self._pending, {}, False
+        for (topic, _), (message, posted) in pending.items():
+            self._dispatch(topic, message, posted)
+
+    def _publish(self, message: Message, posted: int | None) -> None:
+
+        topic = message.topic
+        if topic not in self._coalesced:
+            if self._pending:
+                self.flush()  # Keep queued messages ahead of this one.
+            self._dispatch(topic, message, posted)
+            return
+
+        # A newer message replaces the queued one with the same key:
+        self._pending[(topic, message.key())] = (message, posted)
+        if not self._scheduled:
+            self._scheduled = True
+            QtCore.QTimer.singleShot(0, self.flush)
+
+    def _send(self, command: str, payload: Any, posted: int | None) -> None:
+
+        cls = TOPICS.get(command)
+        if cls is not None and isinstance(payload, dict):
+            self._publish(cls(**payload), posted)
+        else:
+            if self._pending:
+                self.flush()
+            self._dispatch(command, payload, posted)
+
+    # Queue an item for the bus's thread (any thread):
+    def _post(self, posted: int | None, item: Message | tuple) -> None:
+
+        self._inbox.append((posted, item))
+        if not self._waking:
+            self._waking = True
+            self._sig_wake.emit()
+
+    # Deliver the inbox (bus's thread):
+    def _drain(self) -> None:
+
+        self._waking = False  # Cleared first, so items posted from now on wake the bus again.
+        while self._inbox:
+            posted, item = self._inbox.popleft()
+            if isinstance(item, Message):
+                self._publish(item, posted)
+            else:
+                self._send(*item, posted)
+
+    def _dispatch(self, topic: str, message: Any, posted: int | None = None) -> None:
+
+        tracer = self._tracer
+        if tracer is not None:
+            tracer.dispatched(topic)
+            depth = len(self._pending) + len(self._inbox)
+
+        refs = self._handlers.get(topic)
+        if refs:
+            dead = False
+            for ref in refs:
+                callback = ref()
+                if callback is None:
+                    dead = True
+                    continue
+
+                if tracer is None:
+                    callback(message)
+                else:
+                    start = time.perf_counter_ns()
+                    callback(message)
+                    tracer.record(topic, callback, posted, start, time.perf_counter_ns(), depth)
+
+            if dead:
+                self._handlers[topic] = [ref for ref in refs if ref() is not None]
+
+        # Untyped subscribers (emitting costs a dict per message, so it is skipped when nobody listens):
+        if self.receivers(self._INSTRUCTION):
+            payload = message.fields() if isinstance(message, Message) else message
+            self.instruction.emit({"command": topic, "payload": payload})
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Instrumentation
+
+    def trace(self, enabled: bool = True, **kwargs) -> Tracer | None:
+        """
+        Start or stop recording dispatch counts, handler latencies and queue depths (see events/tracing.py).
+        :param kwargs: Overrides of TracingOpts, used when tracing starts.
+        :return: The tracer: the new one when starting, the finished one when stopping (for `summary`/`export`).
+
+        Note:
+            - While disabled, delivery only pays one `is None` test per message and handler.
+            - Untyped `instruction` receivers are not timed.
+        """
+
+        from events.tracing import Tracer
+
+        tracer = self._tracer
+        if enabled:
+            self._tracer = tracer = tracer or Tracer(**kwargs)
+        else:
+            self._tracer = None
+
+        return tracer
+
 
-        self.instruction.emit(message)
+# Exported names
+__all__ = ["EventBus", "EventBusOpts"]
@@ -8,13 +8,8 @@ import sys
 import logging
 import argparse
 
-# Imports (third-party)
-from PySide6 import QtGui, QtCore, QtWidgets
-
 # Imports (local)
 import opts
-import resources
-from ui.windows.mainWindow import MainWindow
 
 
 # Configure logging
@@ -25,97 +20,102 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# Main application class (subclass of QtWidgets.QApplication)
-class Climact(QtWidgets.QApplication):
-
-    def __init__(self, argv):
-        super().__init__(argv)
-
-        # Application metadata
-        self.setApplicationName(opts.ClimactMeta.app_name)
-        self.setApplicationVersion(opts.ClimactMeta.app_version)
-        self.setOrganizationDomain(opts.ClimactMeta.org_domain)
-        self.setOrganizationName(opts.ClimactMeta.org_name)
-
-        # Parse command-line arguments
-        self._parse_args(argv)
-
-        # Set icon and style
-        self._set_icon()
-        self._set_style()
-
-        # Instantiate the main window
-        self.main_ui = MainWindow()
-        self.main_ui.showMaximized()
-
-    # Parse command-line arguments
-    @staticmethod
-    def _parse_args(argv):
-
-        parser = argparse.ArgumentParser(description="Climact Application")
-        parser.add_argument(
-            "-v", "--version", action="version", version=opts.ClimactMeta.app_version
-        )
-        parser.add_argument(
-            "-a",
-            "--enable-assistant",
-            action="store_true",
-            help="Enable AI assistant",
-            default=True,
-        )
-        parser.add_argument(
-            "-s",
-            "--enable-solver",
-            action="store_true",
-            help="Enable solver module",
-            default=True,
-        )
-
-        flags = parser.parse_args(argv[1:] if len(argv) > 1 else None)
-        if flags.enable_assistant:
-            opts.global_flags |= opts.ClimactFlags.ENABLE_AGENTS
-
-        if flags.enable_solver:
-            opts.global_flags |= opts.ClimactFlags.ENABLE_SOLVER
+# Parse command-line arguments
+def _parse_args(argv):
+
+    parser = argparse.ArgumentParser(description="Climact Application")
+    parser.add_argument(
+        "-v", "--version", action="version", version=opts.ClimactMeta.app_version
+    )
+    parser.add_argument(
+        "-a",
+        "--enable-assistant",
+        action="store_true",
+        help="Enable AI assistant",
+        default=True,
+    )
+    parser.add_argument(
+        "-s",
+        "--enable-solver",
+        action="store_true",
+        help="Enable solver module",
+        default=True,
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run without a GUI: load, validate, solve and export a project",
+        default=False,
+    )
+    parser.add_argument(
+        "-p",
+        "--project",
+        help="Project file to load (required with --headless)",
+        default=None,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Directory for exported results (used with --headless)",
+        default="results",
+    )
+    parser.add_argument(
+        "--sweep",
+        help="Parameter-sweep file to run against the project (used with --headless)",
+        default=None,
+    )
+    parser.add_argument(
+        "--no-solve",
+        action="store_true",
+        help="Validate only, skip the solver (used with --headless)",
+        default=False,
+    )
+    parser.add_argument(
+        "--trace-events",
+        help="Record EventBus latencies and write them on exit (.csv, otherwise a Chrome trace; not with --headless)",
+        default=None,
+    )
+
+    flags = parser.parse_args(argv[1:])
+    if flags.headless and not flags.project:
+        parser.error("--headless requires --project")
+
+    # Headless runs publish no EventBus messages, so a trace would be empty:
+    if flags.headless and flags.trace_events:
+        parser.error("--trace-events is not supported with --headless")
+
+    if flags.enable_assistant:
+        opts.global_flags |= opts.ClimactFlags.ENABLE_AGENTS
+
+    if flags.enable_solver:
+        opts.global_flags |= opts.ClimactFlags.ENABLE_SOLVER
+
+    return flags
+
+
+# Headless entry point (no QApplication, no display or OpenGL required):
+def run_headless(flags) -> int:
+
+    # Imported lazily so that GUI start-up does not pay for NumPy/SciPy:
+    from core.batch import run_batch, run_sweep
+
+    if flags.sweep:
+        return run_sweep(flags.project, flags.sweep, flags.output)
+
+    solve = bool(opts.global_flags & opts.ClimactFlags.ENABLE_SOLVER)
+    return run_batch(flags.project, flags.output, solve=solve and not flags.no_solve)
 
-        return flags
 
-    # Apply custom stylesheet
-    def _set_style(self):
-
-        file = QtCore.QFile(":/assets/theme/dark.qss")
-        if file.open(
-            QtCore.QFile.OpenModeFlag.ReadOnly
-            | QtCore.QFile.OpenModeFlag.Text  # type: ignore
-        ):
-
-            try:
-                qss = QtCore.QTextStream(file)  # Load file as text stream
-                qss = qss.readAll()  # Read file contents
-                self.setStyleSheet(qss)  # Apply stylesheet
-
-            except Exception as exception:
-                logger.error(f"Error applying stylesheet: {exception}")
-
-            file.close()  # Close the file after reading
-
-        else:
-            logger.error(f"Failed to load stylesheet: {file.fileName()}")
-
-    # Set the window icon
-    def _set_icon(self):
-
-        icon = QtGui.QIcon(":/assets/icons/logo-padded.png")
-        if icon.isNull():
-            logger.error(f"Failed to load icon.")
-            return
-
-        self.setWindowIcon(icon)
+def main():
 
+    flags = _parse_args(sys.argv)
+    if flags.headless:
+        sys.exit(run_headless(flags))
 
-def main():
+    # Imported here so that headless runs do not load Qt's GUI libraries (and their X11/OpenGL dependencies):
+    from ui.application import Climact
 
-    app = Climact(sys.argv)
+    app = Climact(sys.argv, flags)
     app.exec()
     sys.exit(0)
 
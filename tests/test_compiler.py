@@ -0,0 +1,92 @@
+# Encoding: utf-8
+# Module name: test_compiler
+# Description: Incidence matrix and balance system of a small graph against hand-computed values
+
+# Imports (standard)
+from __future__ import annotations
+import copy
+
+# Imports (third party)
+import numpy as np
+import pytest
+
+# Imports (local)
+from core.graphModel import GraphModel
+from core.compiler import compile_balance, incidence
+
+
+# Mine -> Yard -> Plant carries Coal; Yard also feeds Gas to a Heater:
+PROJECT = {
+    "epochs": 2,
+    "nodes": [
+        {"attr": {"id": 1, "name": "Mine"}, "database": {"out": [{"id": 11, "flow": "Coal"}], "par": {}}},
+        {
+            "attr": {"id": 2, "name": "Yard"},
+            "database": {
+                "inp": [{"id": 21, "flow": "Coal"}],
+                "out": [{"id": 22, "flow": "Coal"}, {"id": 23, "flow": "Gas"}],
+                "par": {},
+            },
+        },
+        {"attr": {"id": 3, "name": "Plant"}, "database": {"inp": [{"id": 31, "flow": "Coal"}], "par": {"demand": [5, 7]}}},
+        {"attr": {"id": 4, "name": "Heater"}, "database": {"inp": [{"id": 41, "flow": "Gas"}], "par": {"demand": 2}}},
+    ],
+    "edges": [{"origin": 11, "target": 21}, {"origin": 22, "target": 31}, {"origin": 23, "target": 41}],
+}
+
+# Rows by (node, stream), columns by edge (Mine->Yard, Yard->Plant, Yard->Heater); Mine has no input and no rows:
+EXPECTED = {
+    ("Yard", "Coal"): [1, -1, 0],
+    ("Yard", "Gas"): [0, 0, -1],
+    ("Plant", "Coal"): [0, 1, 0],
+    ("Heater", "Gas"): [0, 0, 1],
+}
+
+
+# Incidence rows keyed by (node name, stream name):
+def _by_key(model: GraphModel) -> dict:
+
+    matrix, row_node, row_stream, edges = incidence(model)
+    assert edges.tolist() == [0, 1, 2]
+
+    dense = matrix.toarray()
+    return {
+        (model.node_names[node], model.streams[stream]): dense[row].tolist()
+        for row, (node, stream) in enumerate(zip(row_node.tolist(), row_stream.tolist()))
+    }
+
+
+def test_incidence_matches_hand_computed_matrix():
+
+    assert _by_key(GraphModel.from_dict(PROJECT)) == EXPECTED
+
+
+def test_balance_system_repeats_the_block_per_epoch():
+
+    model = GraphModel.from_dict(PROJECT)
+    system = compile_balance(model)
+    block, row_node, row_stream, _ = incidence(model)
+
+    # Epoch-major columns and rows, one copy of the block per epoch:
+    dense = system.a_eq.toarray()
+    rows, cols = block.shape
+    assert dense.shape == (2 * rows, 2 * cols)
+    assert np.array_equal(dense[:rows, :cols], block.toarray())
+    assert np.array_equal(dense[rows:, cols:], block.toarray())
+    assert not dense[:rows, cols:].any() and not dense[rows:, :cols].any()
+
+    # Sinks absorb their demand, the Yard conserves:
+    names = [model.node_names[node] for node in row_node.tolist()]
+    demand = {"Yard": (0, 0), "Plant": (5, 7), "Heater": (2, 2)}
+    expected = [demand[name][epoch] for epoch in range(2) for name in names]
+    assert system.b_eq.tolist() == expected
+
+
+def test_incidence_rejects_edges_between_different_streams():
+
+    project = copy.deepcopy(PROJECT)
+    project["edges"][2] = {"origin": 22, "target": 41}  # Coal into the Heater's Gas input.
+    project["edges"].append({"origin": 23, "target": 31})  # Gas into the Plant's Coal input.
+
+    with pytest.raises(ValueError, match=r"\[2, 3\]"):
+        incidence(GraphModel.from_dict(project))
@@ -0,0 +1,85 @@
+# Encoding: utf-8
+# Module name: test_equations
+# Description: Syntax whitelist, linear forms and caching of compiled equations
+
+# Imports (third party)
+import numpy as np
+import pytest
+
+# Imports (local)
+from core.graphModel import ROLE_INP, ROLE_OUT
+from core.equations import EquationError, compile_equation
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "out.Power = __import__('os').system('true')",  # Calls outside the function whitelist.
+        "out.Power = eval('1')",
+        "out.Power = inp.Coal.__class__",  # Attribute access other than inp.<Stream> / out.<Stream>.
+        "out.Power = efficiency.real * inp.Coal",
+        "out.Power = (lambda: 1)()",  # Syntax outside the node whitelist.
+        "out.Power = [x for x in inp]",
+        "out.Power = 'text'",  # Non-numeric constants.
+        "out.Power = inp",  # A role without a stream.
+    ],
+)
+def test_rejects_syntax_outside_the_whitelist(text):
+
+    with pytest.raises(EquationError):
+        compile_equation(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "out.Power = inp.Coal * inp.Gas",
+        "out.Power = inp.Coal ** 2",
+        "out.Power = 1 / inp.Coal",
+        "out.Power = max(inp.Coal, 1)",
+    ],
+)
+def test_coefficients_reject_nonlinear_equations(text):
+
+    equation = compile_equation(text)
+    assert not equation.linear
+
+    with pytest.raises(EquationError, match="not linear"):
+        equation.coefficients({}, (2,))
+
+
+def test_coefficients_of_a_linear_equation():
+
+    equation = compile_equation("out.Power + 2 = efficiency * inp.Coal")
+    coef, const = equation.coefficients({"efficiency": np.array([0.4, 0.5])}, (2,))
+
+    assert equation.variables == ((ROLE_OUT, "Power"), (ROLE_INP, "Coal"))
+    assert np.allclose(coef, [[1.0, 1.0], [-0.4, -0.5]])
+    assert np.allclose(const, [2.0, 2.0])
+
+
+def test_identical_texts_share_one_compiled_equation():
+
+    text = "out.Heat = 0.25 * inp.Gas"
+    first = compile_equation(text)
+    hits = compile_equation.cache_info().hits
+
+    assert compile_equation(text) is first
+    assert compile_equation.cache_info().hits == hits + 1
+    assert compile_equation("out.Heat = 0.3 * inp.Gas") is not first
+
+
+def test_overflowing_powers_raise_instead_of_hanging():
+
+    equation = compile_equation("out.X = 9**9**9**9 * inp.Y")  # Would be an astronomically large integer.
+
+    with pytest.raises(EquationError):
+        equation.coefficients({}, (1,))
+    with pytest.raises(EquationError):
+        equation.residual({}, {})
+
+
+def test_coefficients_reject_non_finite_values():
+
+    with np.errstate(invalid="ignore"), pytest.raises(EquationError, match="non-finite"):
+        compile_equation("out.X = 1e308 * 10 * inp.Y").coefficients({}, (1,))
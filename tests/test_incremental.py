@@ -0,0 +1,166 @@
+# Encoding: utf-8
+# Module name: test_incremental
+# Description: IncrementalCompiler.assemble() after edits against a full compile of the edited graph
+
+# Imports (standard)
+from __future__ import annotations
+import copy
+from collections import Counter
+
+# Imports (third party)
+import numpy as np
+
+# Imports (local)
+from core.graphModel import GraphModel, ROLE_INP, ROLE_OUT
+from core.compiler import compile_balance
+from core.incremental import IncrementalCompiler
+
+
+PROJECT = {
+    "epochs": 3,
+    "nodes": [
+        {"attr": {"id": 1, "name": "Mine"}, "database": {"out": [{"id": 11, "flow": "Coal"}], "par": {"capacity": 100, "cost": 2}}},
+        {
+            "attr": {"id": 2, "name": "Yard"},
+            "database": {"inp": [{"id": 21, "flow": "Coal"}], "out": [{"id": 22, "flow": "Coal"}], "par": {}},
+        },
+        {"attr": {"id": 3, "name": "Plant"}, "database": {"inp": [{"id": 31, "flow": "Coal"}], "par": {"demand": [10, 20, 30]}}},
+    ],
+    "edges": [{"origin": 11, "target": 21}, {"origin": 22, "target": 31}],
+}
+
+
+# Rows of a system as a multiset of (sorted entries, right-hand side); empty rows with a zero (or infinite) bound and
+# padding columns are dropped, so that slot layouts do not matter:
+def _rows(matrix, b, keys) -> Counter:
+
+    matrix = matrix.tocsr()
+    rows = Counter()
+    for row in range(matrix.shape[0]):
+        lo, hi = matrix.indptr[row], matrix.indptr[row + 1]
+        entries = tuple(
+            sorted((keys[col], round(float(val), 9)) for col, val in zip(matrix.indices[lo:hi], matrix.data[lo:hi]) if val)
+        )
+        if entries or (b[row] != 0 and np.isfinite(b[row])):
+            rows[(entries, round(float(b[row]), 9))] += 1
+    return rows
+
+
+# Canonical form of a BalanceSystem, given the edge key of every column slot (None for removed or padding slots):
+def _canonical(system, slot_keys) -> dict:
+
+    width = len(system.edges)
+    keys = [(epoch, slot_keys[slot] if slot < len(slot_keys) else None) for epoch in range(system.epochs) for slot in range(width)]
+    columns = {key: (cost, upper) for key, cost, upper in zip(keys, system.cost, system.upper) if key[1] is not None}
+
+    # Removed and padding columns must be fixed at zero:
+    dead = [upper for key, upper in zip(keys, system.upper) if key[1] is None]
+    assert not any(dead)
+
+    return {
+        "eq": _rows(system.a_eq, system.b_eq, keys),
+        "ub": _rows(system.a_ub, system.b_ub, keys),
+        "columns": columns,
+    }
+
+
+def _full(project: dict) -> dict:
+
+    model = GraphModel.from_dict(project)
+    system = compile_balance(model)
+    hids = model.handle_ids.tolist()
+    slot_keys = [(hids[model.edge_origin[e]], hids[model.edge_target[e]]) for e in system.edges.tolist()]
+    return _canonical(system, slot_keys)
+
+
+def _incremental(compiler: IncrementalCompiler) -> dict:
+    return _canonical(compiler.assemble(), compiler.column_keys())
+
+
+def test_assemble_matches_full_compile_after_edits():
+
+    project = copy.deepcopy(PROJECT)
+    compiler = IncrementalCompiler.from_model(GraphModel.from_dict(project))
+    assert _incremental(compiler) == _full(project)
+
+    # A second plant, fed from the yard:
+    compiler.add_node(4, {"demand": 5})
+    compiler.add_handle(41, 4, ROLE_INP, "Coal")
+    compiler.add_edge(22, 41)
+    project["nodes"].append(
+        {"attr": {"id": 4, "name": "Plant 2"}, "database": {"inp": [{"id": 41, "flow": "Coal"}], "par": {"demand": 5}}}
+    )
+    project["edges"].append({"origin": 22, "target": 41})
+    compiler.assemble()  # Expands the current layout, so that the following edits are patched into it.
+
+    # Parameter edits:
+    compiler.set_parameter(1, "cost", 3)
+    compiler.set_parameter(2, "capacity", [50, 60, 70])
+    project["nodes"][0]["database"]["par"]["cost"] = 3
+    project["nodes"][1]["database"]["par"]["capacity"] = [50, 60, 70]
+    assert _incremental(compiler) == _full(project)
+
+    # A second mine on a new stream, with a converter (equations replace its balance rows):
+    compiler.add_node(5, {"cost": 1})
+    compiler.add_handle(51, 5, ROLE_OUT, "Gas")
+    compiler.add_handle(23, 2, ROLE_INP, "Gas")
+    compiler.add_edge(51, 23)
+    compiler.set_equations(2, ["out.Coal = inp.Coal + 0.5 * inp.Gas"])
+    project["nodes"].append({"attr": {"id": 5, "name": "Well"}, "database": {"out": [{"id": 51, "flow": "Gas"}], "par": {"cost": 1}}})
+    project["nodes"][1]["database"]["inp"].append({"id": 23, "flow": "Gas"})
+    project["nodes"][1]["database"]["eqn"] = ["out.Coal = inp.Coal + 0.5 * inp.Gas"]
+    project["edges"].append({"origin": 51, "target": 23})
+    assert _incremental(compiler) == _full(project)
+
+    # Removals leave dead slots behind:
+    compiler.remove_edge(22, 31)
+    compiler.remove_node(5)
+    project["edges"] = [edge for edge in project["edges"] if (edge["origin"], edge["target"]) not in {(22, 31), (51, 23)}]
+    project["nodes"] = [node for node in project["nodes"] if node["attr"]["id"] != 5]
+    project["nodes"][1]["database"]["inp"] = [{"id": 21, "flow": "Coal"}]
+    assert _incremental(compiler) == _full(project)
+
+    compiler.compact()
+    assert _incremental(compiler) == _full(project)
+
+
+def test_growth_keeps_layout_between_edits():
+
+    compiler = IncrementalCompiler.from_model(GraphModel.from_dict(copy.deepcopy(PROJECT)))
+    compiler.assemble()
+
+    # Capacities double, so most additions re-expand only the rows they touch:
+    layouts = set()
+    for index in range(64):
+        nid, hid = 100 + index, 1000 + index
+        compiler.add_node(nid, {"demand": 1})
+        compiler.add_handle(hid, nid, ROLE_INP, "Coal")
+        compiler.add_edge(22, hid)
+        system = compiler.assemble()
+        layouts.add(system.a_eq.shape)
+
+    assert len(layouts) <= 8
+    assert compiler.solve().success
+
+
+def test_every_edit_bumps_the_version():
+
+    compiler = IncrementalCompiler.from_model(GraphModel.from_dict(copy.deepcopy(PROJECT)))
+    edits = [
+        lambda: compiler.add_node(4, {"demand": 5}),
+        lambda: compiler.set_parameter(4, "demand", 6),
+        lambda: compiler.set_equations(2, ["out.Coal = 0.9 * inp.Coal"]),
+        lambda: compiler.add_handle(41, 4, ROLE_INP, "Coal"),
+        lambda: compiler.set_stream(41, "Gas"),
+        lambda: compiler.set_stream(41, "Coal"),
+        lambda: compiler.add_edge(22, 41),
+        lambda: compiler.remove_edge(22, 41),
+        lambda: compiler.remove_handle(41),
+        lambda: compiler.remove_node(4),
+        lambda: compiler.compact(),
+    ]
+
+    for edit in edits:
+        version = compiler.version
+        edit()
+        assert compiler.version > version
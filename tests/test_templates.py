@@ -0,0 +1,51 @@
+# Encoding: utf-8
+# Module name: test_templates
+# Description: Sharing of template equations between instances and project nodes
+
+# Imports (standard)
+from __future__ import annotations
+import copy
+
+# Imports (local)
+from core.graphModel import GraphModel
+from core.templates import NodeTemplate, TemplateLibrary, resolve_node
+
+
+TEMPLATES = {"plant": {"name": "Plant", "inp": [{"flow": "Coal"}], "out": [{"flow": "Power"}]}}
+
+
+def test_resolve_node_leaves_the_template_untouched():
+
+    templates = copy.deepcopy(TEMPLATES)
+    name, par, eqn = resolve_node({"attr": {"id": 1}, "template": "plant", "database": {"par": {"a": 1}}}, templates)
+
+    assert templates == TEMPLATES
+    assert (name, dict(par), eqn) == ("Plant", {"a": 1}, ())
+
+
+def test_model_instances_share_one_equation_tuple():
+
+    project = {
+        "templates": {"plant": {**TEMPLATES["plant"], "eqn": ["out.Power = 0.4 * inp.Coal"]}},
+        "nodes": [{"attr": {"id": uid}, "template": "plant", "database": {}} for uid in (1, 2)],
+    }
+    before = copy.deepcopy(project)
+    model = GraphModel.from_dict(project)
+
+    assert model.node_eqn[0] == ("out.Power = 0.4 * inp.Coal",)
+    assert model.node_eqn[0] is model.node_eqn[1]
+    assert project == before
+
+
+def test_instances_cannot_edit_the_template_equations():
+
+    library = TemplateLibrary()
+    library.add(NodeTemplate("plant", eqn=["out.Power = inp.Coal"]))
+    first, second = library.instantiate("plant"), library.instantiate("plant")
+
+    assert isinstance(first.eqn, tuple) and first.eqn is second.eqn
+
+    first.override("eqn", ["out.Power = 0.5 * inp.Coal"])
+    assert second.eqn == ("out.Power = inp.Coal",)
+    assert library.update("plant", eqn=["out.Power = inp.Coal"]) == []  # Unchanged, whatever the sequence type.
+    assert library["plant"].to_dict()["eqn"] == ["out.Power = inp.Coal"]
@@ -0,0 +1,99 @@
+# Encoding: utf-8
+# Module name: application
+# Description: The GUI application (imported by main.py only when a GUI is started)
+
+# Imports (standard)
+import logging
+
+# Imports (third-party)
+from PySide6 import QtGui, QtCore, QtWidgets
+
+# Imports (local)
+import opts
+
+logger = logging.getLogger(__name__)
+
+
+# Main application class (subclass of QtWidgets.QApplication)
+class Climact(QtWidgets.QApplication):
+
+    def __init__(self, argv, flags):
+        super().__init__(argv)
+
+        # Application metadata
+        self.setApplicationName(opts.ClimactMeta.app_name)
+        self.setApplicationVersion(opts.ClimactMeta.app_version)
+        self.setOrganizationDomain(opts.ClimactMeta.org_domain)
+        self.setOrganizationName(opts.ClimactMeta.org_name)
+
+        # Command-line arguments (parsed by main.py):
+        if flags.trace_events:
+            self._start_tracing(flags.trace_events)
+
+        # Register compiled resources (icons, stylesheets) before they are used:
+        import resources
+        from ui.windows.mainWindow import MainWindow
+
+        # Set icon and style
+        self._set_icon()
+        self._set_style()
+
+        # Instantiate the main window
+        self.main_ui = MainWindow()
+        self.main_ui.showMaximized()
+
+    # Record EventBus activity until the application quits:
+    def _start_tracing(self, path: str):
+
+        from events.widgetEvents import EventBus
+
+        bus = EventBus.instance()
+        bus.trace()
+
+        def export():
+            tracer = bus.trace(False)
+            tracer.export(path)
+            for entry in tracer.summary()[:10]:
+                logger.info(
+                    f"{entry['topic']} -> {entry['handler']}: {entry['calls']} calls, "
+                    f"p50 {entry['latency_p50']:.0f} us, p99 {entry['latency_p99']:.0f} us"
+                )
+            logger.info(f"EventBus trace written to {path}")
+
+        self.aboutToQuit.connect(export)
+
+    # Apply custom stylesheet
+    def _set_style(self):
+
+        file = QtCore.QFile(":/assets/theme/dark.qss")
+        if file.open(
+            QtCore.QFile.OpenModeFlag.ReadOnly
+            | QtCore.QFile.OpenModeFlag.Text  # type: ignore
+        ):
+
+            try:
+                qss = QtCore.QTextStream(file)  # Load file as text stream
+                qss = qss.readAll()  # Read file contents
+                self.setStyleSheet(qss)  # Apply stylesheet
+
+            except Exception as exception:
+                logger.error(f"Error applying stylesheet: {exception}")
+
+            file.close()  # Close the file after reading
+
+        else:
+            logger.error(f"Failed to load stylesheet: {file.fileName()}")
+
+    # Set the window icon
+    def _set_icon(self):
+
+        icon = QtGui.QIcon(":/assets/icons/logo-padded.png")
+        if icon.isNull():
+            logger.error(f"Failed to load icon.")
+            return
+
+        self.setWindowIcon(icon)
+
+
+# Exported names
+__all__ = ["Climact"]
@@ -1,5 +1,5 @@
 from .widgetLayouts import HLayout, GLayout, VLayout
-from .label import Label
+from .label import Label, StaticLabel
 from .tabbedWidget import TabbedWidget
 from .graphicsView import GraphicsView
 from .graphicsView import GraphicsScene
@@ -9,6 +9,7 @@ __all__ = [
     "GLayout",
     "VLayout",
     "Label",
+    "StaticLabel",
     "TabbedWidget",
     "GraphicsView",
     "GraphicsScene"
@@ -12,6 +12,7 @@ import dataclasses
 from PySide6 import QtGui, QtCore, QtWidgets, QtOpenGLWidgets
 
 from ui.graph.graphicsScene import GraphicsScene
+from ui.graph.paintProfiler import PaintProfiler, PaintOverlay
 
 
 # Dataclass
@@ -80,6 +81,42 @@ class GraphicsView(QtWidgets.QGraphicsView):
         self._openGL_viewport.setFormat(self._format)
         self.setViewport(self._openGL_viewport)
 
+        # Paint profiling (see set_profiling):
+        self._profiler: PaintProfiler | None = None
+        self._overlay: PaintOverlay | None = None
+
+    # Show or hide the paint profiler overlay:
+    def set_profiling(self, enabled: bool) -> None:
+
+        if enabled and self._profiler is None:
+            self._profiler = PaintProfiler()
+            self._overlay = PaintOverlay(self._profiler, self)
+            self._overlay.show()
+
+        elif not enabled and self._profiler is not None:
+            self._overlay.deleteLater()
+            self._profiler = self._overlay = None
+
+        self.viewport().update()
+
+    @property
+    def profiling(self) -> bool:
+        return self._profiler is not None
+
+    # Reimplementation of QGraphicsView.paintEvent(), timing frames while profiling:
+    def paintEvent(self, event, /):
+
+        profiler = self._profiler
+        if profiler is None:
+            super().paintEvent(event)
+            return
+
+        profiler.begin_frame()
+        try:
+            super().paintEvent(event)
+        finally:
+            profiler.end_frame(getattr(self.scene(), "index_rebuilds", 0))
+
     # Reimplementation of QGraphicsView.keyPressEvent():
     def keyPressEvent(self, event, /):
 
@@ -1,6 +1,6 @@
 # Encoding: utf-8
 # Module name: string
-# Description: A QGraphicsTextItem subclass with customizable options.
+# Description: A QGraphicsTextItem subclass with customizable options, and a static display mode.
 
 # Imports (standard)
 from __future__ import annotations
@@ -8,6 +8,8 @@ from __future__ import annotations
 
 from PySide6 import QtGui, QtCore, QtWidgets
 
+from ui.graph.paintProfiler import profiled
+
 LabelOpts = {
     "const": False,  # Whether the string is immutable.
     "round": 4,  # Radius for rounded corners.
@@ -69,10 +71,11 @@ class Label(QtWidgets.QGraphicsTextItem):
         self.document().setDefaultTextOption(option)
 
     # Reimplementation of QGraphicsTextItem.paint():
+    @profiled
     def paint(self, painter, option, widget):
 
         # Reset the state-flag to prevent the dashed-line selection style.
-        option.state = QtGui.QStyle.StateFlag.State_None
+        option.state = QtWidgets.QStyle.StateFlag.State_None
 
         # Paint the border and background:
         painter.setPen(QtGui.QPen(self.property("style")["border"], 0.75))
@@ -190,3 +193,166 @@ class Label(QtWidgets.QGraphicsTextItem):
             else QtCore.Qt.TextInteractionFlag.TextEditorInteraction
         )
         self.update()
+
+
+# Class StaticLabel: A label drawn from cached static text, editable through a temporary Label
+class StaticLabel(QtWidgets.QGraphicsObject):
+    """
+    Display mode of `Label` for items that exist in large numbers (e.g. node names).
+
+    Note:
+        - The text is laid out once into a QStaticText, instead of a QTextDocument with its layout and text control.
+        - Editing (a click, or `edit()`) swaps in a `Label` with the same options as a child; when it loses focus, its
+          text is taken over, `sig_text_changed` is emitted and the editor is deleted.
+        - Geometry and appearance match `Label`'s, including the document's margin.
+    """
+
+    # Signals:
+    sig_text_changed = QtCore.Signal(str, name="StaticLabel.sig_text_changed")
+
+    # Margin of a QTextDocument (QTextDocument.documentMargin), kept so that the editor does not shift the text:
+    _MARGIN = 4.0
+
+    # Initializer:
+    def __init__(
+        self, label: str, parent: QtWidgets.QGraphicsItem | None = None, **kwargs
+    ):
+
+        # Initialize base-class:
+        super().__init__(parent)
+
+        # Retrieve keywords (kept as plain attributes, cheaper than dynamic properties):
+        self._opts = {
+            "const": kwargs.get("const", LabelOpts["const"]),
+            "round": kwargs.get("round", LabelOpts["round"]),
+            "style": kwargs.get("style", LabelOpts["style"]),
+            "color": kwargs.get("color", LabelOpts["label"]["color"]),
+            "width": kwargs.get("width", LabelOpts["label"]["width"]),
+            "align": kwargs.get("align", LabelOpts["label"]["align"]),
+            "font": kwargs.get("font", LabelOpts["label"]["font"]),
+        }
+
+        self._editor: Label | None = None
+        self._static = QtGui.QStaticText()
+        self._rect = QtCore.QRectF()
+        self.setPlainText(label)
+
+        if not self._opts["const"]:
+            self.setCursor(QtCore.Qt.CursorShape.IBeamCursor)
+
+    # Reimplementation of QGraphicsObject.boundingRect():
+    def boundingRect(self) -> QtCore.QRectF:
+        return self._rect
+
+    # Reimplementation of QGraphicsObject.paint():
+    @profiled
+    def paint(self, painter, option, widget=None):
+
+        # The editor paints itself while it is shown:
+        if self._editor is not None:
+            return
+
+        # Paint the border and background:
+        painter.setPen(QtGui.QPen(self._opts["style"]["border"], 0.75))
+        painter.setBrush(self._opts["style"]["background"])
+        painter.drawRoundedRect(self._rect, self._opts["round"], self._opts["round"])
+
+        # Paint the text:
+        painter.setFont(self._opts["font"])
+        painter.setPen(QtGui.QColor(self._opts["color"]))
+        painter.drawStaticText(QtCore.QPointF(self._MARGIN, self._MARGIN), self._static)
+
+    # Text of the label (same API as QGraphicsTextItem):
+    def toPlainText(self) -> str:
+        return self._static.text()
+
+    def setPlainText(self, text: str):
+
+        option = QtGui.QTextOption(self._opts["align"])
+        option.setWrapMode(QtGui.QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+
+        self._static = QtGui.QStaticText(text)
+        self._static.setTextFormat(QtCore.Qt.TextFormat.PlainText)
+        self._static.setTextOption(option)
+        self._static.setTextWidth(self._opts["width"] - 2 * self._MARGIN)
+        self._static.prepare(QtGui.QTransform(), self._opts["font"])
+
+        # The document's height: at least one line, plus its margins:
+        height = max(self._static.size().height(), QtGui.QFontMetricsF(self._opts["font"]).height())
+        self.prepareGeometryChange()
+        self._rect = QtCore.QRectF(0, 0, self._opts["width"], height + 2 * self._MARGIN)
+
+        if self._editor is not None and self._editor.toPlainText() != text:
+            self._editor.setPlainText(text)
+
+        self.update()
+
+    # Edit text:
+    def edit(self):
+
+        # If the label is immutable or already being edited, return immediately:
+        if self._opts["const"] or self._editor is not None:
+            return
+
+        self._editor = Label(
+            self.toPlainText(),
+            parent=self,
+            const=False,
+            round=self._opts["round"],
+            style=self._opts["style"],
+            color=self._opts["color"],
+            width=self._opts["width"],
+            align=self._opts["align"],
+            font=self._opts["font"],
+        )
+        self._editor.sig_text_changed.connect(self.on_editor_closed)
+        self._editor.edit()
+        self.update()
+
+    # Finish editing (the editor's text is taken over, see on_editor_closed):
+    def finish(self):
+
+        if self._editor is not None:
+            self._editor.clearFocus()
+
+    # Called when the editor loses focus:
+    def on_editor_closed(self, text: str):
+
+        editor, self._editor = self._editor, None
+        if editor is None:
+            return
+
+        # Delete the editor once its focus-out event has been handled:
+        editor.hide()
+        editor.deleteLater()
+
+        self.setPlainText(text)
+        self.sig_text_changed.emit(text)
+
+    # Reimplementation of QGraphicsObject.mousePressEvent():
+    def mousePressEvent(self, event):
+
+        # Immutable labels leave the click to their parent (e.g. to drag a node):
+        if self._opts["const"]:
+            event.ignore()
+            return
+
+        self.edit()
+        event.accept()
+
+    @property
+    def const(self):
+        return self._opts["const"]
+
+    @const.setter
+    def const(self, value: bool):
+        """
+        Set the const property of the string.
+        :param value: bool
+        """
+        self._opts["const"] = value
+        if value:
+            self.finish()
+            self.unsetCursor()
+        else:
+            self.setCursor(QtCore.Qt.CursorShape.IBeamCursor)
@@ -0,0 +1,165 @@
+# Encoding: utf-8
+# Module name: sankeyView
+# Description: A QGraphicsView-based Sankey diagram of solved flows
+
+# Imports (standard)
+from __future__ import annotations
+
+# Imports (third party)
+import numpy as np
+from PySide6 import QtGui, QtCore, QtWidgets
+from qtawesome import icon as qta_icon
+
+# Imports (local)
+from core.graphModel import GraphModel
+from core.sankey import SankeyLayout, SankeyGeometry
+from events.messages import OpenInTab
+from events.widgetEvents import EventBus
+
+
+# Default options:
+SankeyViewOpts = {
+    "background": QtGui.QColor(0x232A2E),
+    "node": QtGui.QColor(0xEFEFEF),
+    "font": QtGui.QFont("Trebuchet MS", 8),
+    "alpha": 150,  # Opacity of the bands.
+    "max-labels": 500,  # Node labels are omitted on larger diagrams.
+}
+
+
+# Class SankeyView:
+class SankeyView(QtWidgets.QGraphicsView):
+    """
+    Displays a model's solved flows as a Sankey diagram, one colored band per (origin, target, stream) link.
+
+    Note:
+        - Bands of the same stream share one path item, and all node bars share another, so the scene holds a
+          handful of items regardless of the model's size.
+        - `set_flows` reuses the cached layout structure and only re-shapes the existing items.
+    """
+
+    def __init__(self, model: GraphModel, flows: np.ndarray, parent=None, **kwargs):
+        super().__init__(
+            parent,
+            renderHints=QtGui.QPainter.RenderHint.Antialiasing,
+            backgroundBrush=QtGui.QBrush(SankeyViewOpts["background"]),
+            dragMode=QtWidgets.QGraphicsView.DragMode.ScrollHandDrag,
+        )
+
+        self.setScene(QtWidgets.QGraphicsScene(self))
+        self._model = model
+        self._layout = SankeyLayout(model, **kwargs)
+
+        # Scene items:
+        self._nodes = self.scene().addPath(
+            QtGui.QPainterPath(), QtGui.QPen(QtCore.Qt.PenStyle.NoPen), SankeyViewOpts["node"]
+        )
+        self._nodes.setZValue(1)
+        self._bands: dict[int, QtWidgets.QGraphicsPathItem] = {}
+        self._labels: list[QtWidgets.QGraphicsSimpleTextItem] = []
+
+        self.set_flows(flows)
+
+    # Color of a stream:
+    @staticmethod
+    def stream_color(index: int) -> QtGui.QColor:
+        return QtGui.QColor.fromHsv(int(index * 137.5) % 360, 140, 230, SankeyViewOpts["alpha"])
+
+    # Show a new set of flows:
+    def set_flows(self, flows: np.ndarray, epoch: int | None = None) -> None:
+        """
+        Re-lay out the diagram for new flows (e.g. after a re-solve) or another epoch.
+        """
+
+        geometry = self._layout.update(flows, epoch)
+        self._draw_nodes(geometry)
+        self._draw_bands(geometry)
+        self._draw_labels(geometry)
+        self.setSceneRect(self.scene().itemsBoundingRect().adjusted(-40, -40, 40, 40))
+
+    # Draw all node bars as one path:
+    def _draw_nodes(self, geometry: SankeyGeometry) -> None:
+
+        width = self._layout.opts["node-width"]
+        path = QtGui.QPainterPath()
+        for x, y, h in zip(geometry.node_x.tolist(), geometry.node_y.tolist(), geometry.node_h.tolist()):
+            path.addRect(x, y, width, max(h, 1.0))
+
+        self._nodes.setPath(path)
+
+    # Draw the bands, one path per stream:
+    def _draw_bands(self, geometry: SankeyGeometry) -> None:
+
+        links = self._layout.links
+        width = self._layout.opts["node-width"]
+        paths: dict[int, QtGui.QPainterPath] = {}
+
+        x0 = geometry.node_x[links.origin] + width
+        x1 = geometry.node_x[links.target]
+        for stream, a, b, y0, y1, w in zip(
+            links.stream.tolist(),
+            x0.tolist(),
+            x1.tolist(),
+            geometry.link_y0.tolist(),
+            geometry.link_y1.tolist(),
+            geometry.link_w.tolist(),
+        ):
+            if w <= 0:
+                continue
+
+            # Cubic top edge forward, cubic bottom edge back:
+            mid = (a + b) / 2 if b > a else a + 40
+            path = paths.setdefault(stream, QtGui.QPainterPath())
+            path.moveTo(a, y0)
+            path.cubicTo(mid, y0, mid if b > a else b - 40, y1, b, y1)
+            path.lineTo(b, y1 + w)
+            path.cubicTo(mid if b > a else b - 40, y1 + w, mid, y0 + w, a, y0 + w)
+            path.closeSubpath()
+
+        for stream in set(self._bands) | set(paths):
+            if stream not in self._bands:
+                color = self.stream_color(stream)
+                item = self.scene().addPath(QtGui.QPainterPath(), QtGui.QPen(QtCore.Qt.PenStyle.NoPen), color)
+                item.setToolTip(self._model.streams[stream])
+                self._bands[stream] = item
+
+            self._bands[stream].setPath(paths.get(stream, QtGui.QPainterPath()))
+
+    # Place node labels (created once per structure):
+    def _draw_labels(self, geometry: SankeyGeometry) -> None:
+
+        if self._model.num_nodes > SankeyViewOpts["max-labels"]:
+            return
+
+        if not self._labels:
+            for name in self._model.node_names:
+                label = self.scene().addSimpleText(name, SankeyViewOpts["font"])
+                label.setBrush(SankeyViewOpts["node"])
+                label.setZValue(2)
+                self._labels.append(label)
+
+        width = self._layout.opts["node-width"]
+        for label, x, y, h in zip(
+            self._labels, geometry.node_x.tolist(), geometry.node_y.tolist(), geometry.node_h.tolist()
+        ):
+            label.setPos(x + width + 4, y + h / 2 - label.boundingRect().height() / 2)
+
+    # Zoom with the mouse wheel:
+    def wheelEvent(self, event: QtGui.QWheelEvent) -> None:
+        factor = 1.15 if event.angleDelta().y() > 0 else 1 / 1.15
+        self.scale(factor, factor)
+
+
+# Open a Sankey diagram in a new tab:
+def open_sankey(model: GraphModel, flows: np.ndarray, label: str = "Sankey") -> SankeyView:
+    """
+    Create a SankeyView and show it in a new tab via the EventBus (see TabbedWidget.new_tab).
+    """
+
+    view = SankeyView(model, flows)
+    EventBus.instance().publish(OpenInTab(widget=view, label=label, icon=qta_icon("mdi.chart-sankey", color="#899878")))
+    return view
+
+
+# Exported names
+__all__ = ["SankeyView", "SankeyViewOpts", "open_sankey"]
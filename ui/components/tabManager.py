@@ -0,0 +1,231 @@
+# Encoding: utf-8
+# Module name: tabManager
+# Description: Bounds the number of live canvases in a tab widget by snapshotting the least recently used ones
+
+# Imports (standard)
+from __future__ import annotations
+import os
+import tempfile
+from typing import Callable
+
+# Imports (third party)
+from PySide6 import QtCore, QtWidgets
+
+# Imports (local)
+from ui.components.graphicsView import GraphicsView
+from ui.graph.clipboard import pack, unpack
+
+# Default options:
+TabOpts = {
+    "resident": 4,  # Canvases kept alive, including the current one.
+    "spill": None,  # Directory for snapshots of evicted canvases; None keeps them in memory.
+}
+
+
+# Class Snapshot:
+class Snapshot(QtWidgets.QWidget):
+    """
+    Stands in for an evicted canvas in its tab, holding the canvas's compact snapshot (see ui/graph/clipboard.py).
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+        view: dict,
+        spill: str | None = None,
+        history: QtCore.QObject | None = None,
+        parent: QtWidgets.QWidget | None = None,
+    ):
+        super().__init__(parent)
+
+        self.view = view  # Zoom and center of the evicted view.
+        self.history = history  # Undo history of the evicted canvas (see GraphicsScene.take_history).
+        if history is not None:
+            history.setParent(self)
+        self._data: bytes | None = data
+        self._path: str | None = None
+
+        if spill is not None:
+            handle, self._path = tempfile.mkstemp(prefix="canvas-", suffix=".clmt", dir=spill)
+            with os.fdopen(handle, "wb") as file:
+                file.write(data)
+            self._data = None
+
+    # Snapshot size in bytes:
+    def size_bytes(self) -> int:
+        return len(self._data) if self._data is not None else os.path.getsize(self._path)
+
+    # Snapshot contents:
+    def payload(self) -> dict:
+
+        if self._data is not None:
+            return unpack(self._data)
+
+        with open(self._path, "rb") as file:
+            return unpack(file.read())
+
+    # Delete the on-disk copy, if any:
+    def discard(self) -> None:
+
+        if self._path is not None and os.path.exists(self._path):
+            os.remove(self._path)
+
+        self._data = self._path = None
+
+
+# Class TabManager:
+class TabManager(QtCore.QObject):
+    """
+    Tracks the canvases of a QTabWidget in least-recently-used order.
+
+    Note:
+        - When more than `resident` canvases are alive, the least recently shown ones are snapshotted and their views,
+          scenes and items released; the tab keeps its label and shows a Snapshot until it is selected again, when the
+          canvas is rebuilt in one batch.
+        - The undo history is kept with the snapshot and handed to the rebuilt canvas; its commands find their items
+          by id, which the rebuild keeps. Bundles (see ui/graph/bundle.py) are part of the snapshot.
+        - Closed tabs are released right away: items, worker threads and history are freed before the call returns
+          and the widgets are deleted on the next event-loop iteration.
+    """
+
+    def __init__(self, tabs: QtWidgets.QTabWidget, factory: Callable[[], GraphicsView], **kwargs):
+        """
+        :param tabs: The managed tab widget.
+        :param factory: Returns a new, empty canvas view; used to rebuild evicted tabs.
+        :param kwargs: Overrides of TabOpts.
+        """
+        super().__init__(tabs)
+
+        self._opts = {**TabOpts, **kwargs}
+        self._tabs = tabs
+        self._factory = factory
+        self._order: list[QtWidgets.QWidget] = []  # Least recently used first.
+
+        tabs.currentChanged.connect(self._on_current_changed)
+
+    # Register a new tab's widget:
+    def track(self, widget: QtWidgets.QWidget) -> None:
+
+        if widget not in self._order:
+            self._order.append(widget)
+        self._enforce()
+
+    # Close a tab and free its widget:
+    def close(self, index: int) -> None:
+
+        widget = self._tabs.widget(index)
+        if widget is None:
+            return
+
+        self._tabs.removeTab(index)
+        if widget in self._order:
+            self._order.remove(widget)
+
+        self._free(widget)
+
+    # Memory report:
+    def report(self) -> list[dict]:
+        """
+        :return: One entry per tab: {"label", "state" ("live", "evicted" or "other"), "items", "bytes",
+                 "history"}; `bytes` is the snapshot size of evicted tabs, `history` the footprint of the undo history.
+        """
+
+        entries = []
+        for index in range(self._tabs.count()):
+            widget = self._tabs.widget(index)
+            entry = {"label": self._tabs.tabText(index), "state": "other", "items": 0, "bytes": 0, "history": 0}
+            if isinstance(widget, Snapshot):
+                entry.update(state="evicted", bytes=widget.size_bytes())
+                entry.update(history=widget.history.footprint() if widget.history is not None else 0)
+            elif isinstance(widget, GraphicsView):
+                scene = widget.scene()
+                entry.update(state="live", items=len(scene.items()), history=scene.undo_stack.footprint())
+            entries.append(entry)
+
+        return entries
+
+    # Most recently used first, rebuilding evicted canvases on selection:
+    def _on_current_changed(self, index: int) -> None:
+
+        widget = self._tabs.widget(index)
+        if widget is None:
+            return
+
+        if isinstance(widget, Snapshot):
+            widget = self._rebuild(index, widget)
+
+        if widget in self._order:
+            self._order.remove(widget)
+        self._order.append(widget)
+        self._enforce()
+
+    # Evict the least recently used canvases beyond the limit:
+    def _enforce(self) -> None:
+
+        live = [widget for widget in self._order if isinstance(widget, GraphicsView)]
+        current = self._tabs.currentWidget()
+
+        for view in live[: max(0, len(live) - self._opts["resident"])]:
+            if view is not current:
+                self._evict(view)
+
+    # Replace a canvas with its snapshot:
+    def _evict(self, view: GraphicsView) -> None:
+
+        scene = view.scene()
+        state = {"zoom": view.zoom, "center": view.center.toTuple()}
+        snapshot = Snapshot(pack(scene.snapshot()), state, self._opts["spill"], scene.take_history())
+
+        self._swap(view, snapshot)
+        self._free(view)
+
+    # Rebuild a canvas from its snapshot:
+    def _rebuild(self, index: int, snapshot: Snapshot) -> GraphicsView:
+
+        view = self._factory()
+        view.scene().restore(snapshot.payload())
+        view.zoom = snapshot.view["zoom"]
+        view.center = QtCore.QPointF(*snapshot.view["center"])
+        if snapshot.history is not None:
+            view.scene().adopt_history(snapshot.history)
+            snapshot.history = None
+
+        self._swap(snapshot, view)
+        self._free(snapshot)
+        return view
+
+    # Put `new` in the tab of `old`, keeping the tab's label, icon and position:
+    def _swap(self, old: QtWidgets.QWidget, new: QtWidgets.QWidget) -> None:
+
+        index = self._tabs.indexOf(old)
+        current = self._tabs.currentIndex()
+        label, icon, tip = self._tabs.tabText(index), self._tabs.tabIcon(index), self._tabs.tabToolTip(index)
+
+        blocked = self._tabs.blockSignals(True)
+        self._tabs.removeTab(index)
+        self._tabs.insertTab(index, new, icon, label)
+        self._tabs.setTabToolTip(index, tip)
+        self._tabs.setCurrentIndex(current)
+        self._tabs.blockSignals(blocked)
+
+        self._order[self._order.index(old)] = new
+
+    # Release a widget and everything it owns:
+    def _free(self, widget: QtWidgets.QWidget) -> None:
+
+        if isinstance(widget, GraphicsView):
+            scene = widget.scene()
+            widget.setScene(None)
+            if hasattr(scene, "release"):
+                scene.release()
+            scene.deleteLater()
+
+        elif isinstance(widget, Snapshot):
+            widget.discard()
+
+        widget.setParent(None)
+        widget.deleteLater()
+
+
+# Exported names
+__all__ = ["TabOpts", "TabManager", "Snapshot"]
@@ -4,7 +4,6 @@
 
 # Imports (standard)
 from __future__ import annotations
-from typing import Dict, Any
 
 
 # Imports (third-party)
@@ -12,8 +11,10 @@ from PySide6 import QtGui, QtCore, QtWidgets
 
 
 # Imports (local)
+from events.messages import OpenInTab
 from events.widgetEvents import EventBus
 from ui.components.graphicsView import GraphicsView, GraphicsScene
+from ui.components.tabManager import TabManager
 
 
 # Tabbed widget class
@@ -25,6 +26,7 @@ class TabbedWidget(QtWidgets.QTabWidget):
         - Create/close/rename tabs.
         - Configurable max-tabs.
         - Creates Viewer instances in new tabs, by default.
+        - Keeps at most `resident` canvases alive; the others are snapshotted (see ui/components/tabManager.py).
 
     Note:
         - Beeps when max-tabs reached or trying to close the last tab.
@@ -42,7 +44,16 @@ class TabbedWidget(QtWidgets.QTabWidget):
         )
 
         instance = EventBus.instance()  # Get the singleton EventBus instance
-        instance.instruction.connect(self._handle_instructions)
+        instance.subscribe(OpenInTab.topic, self._on_open_in_tab)
+
+        # Canvas lifecycle:
+        self._manager = TabManager(
+            self,
+            self._create_view,
+            resident=kwargs.get("resident", 4),
+            spill=kwargs.get("spill", None),
+        )
+        self.tabCloseRequested.connect(self._close_tab)
 
     # Override getitem method
     def __getitem__(self, index) -> QtWidgets.QWidget:
@@ -54,27 +65,32 @@ class TabbedWidget(QtWidgets.QTabWidget):
     # Close tab method
     def _close_tab(self, index) -> None:
         """
-        Close the tab at the specified index.
+        Close the tab at the specified index and free its widget.
         """
-        self.removeTab(index)
+        self._manager.close(index)
 
-    # Instructions handler
-    def _handle_instructions(self, message: dict) -> None:
-        """
-        Handle incoming instructions from the EventBus.
+    # Default canvas of new tabs:
+    def _create_view(self) -> GraphicsView:
 
-        :param message: A dictionary containing the command and payload.
-        """
-        command: str = message.get("command", "")
-        payload: Dict[str, Any] = message.get("payload", {})
+        canvas = GraphicsScene(QtCore.QRectF(0, 0, 100, 100))
+        return GraphicsView(
+            canvas,
+            sceneRect=QtCore.QRectF(0, 0, 5000, 5000),
+            renderHints=QtGui.QPainter.RenderHint.Antialiasing,
+            viewportUpdateMode=QtWidgets.QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate,
+            backgroundBrush=QtGui.QBrush(QtGui.QColor(0x232A2E)),
+        )
 
-        if command == "open_in_tab":
+    # Memory report of the open tabs (see TabManager.report):
+    def memory_report(self) -> list[dict]:
+        return self._manager.report()
 
-            self.new_tab(
-                widget=payload.get("widget", None),
-                label=payload.get("label", None),
-                icon=payload.get("icon", None),
-            )
+    # Open-in-tab requests from the EventBus:
+    def _on_open_in_tab(self, message: OpenInTab) -> None:
+        """
+        Show the message's widget in a new tab.
+        """
+        self.new_tab(widget=message.widget, label=message.label, icon=message.icon)
 
     # Reimplement paint event
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
@@ -110,17 +126,12 @@ class TabbedWidget(QtWidgets.QTabWidget):
             self.setCurrentIndex(index)  # Switch to the existing tab.
             return  # Exit the method.
 
-        canvas = GraphicsScene(QtCore.QRectF(0, 0, 100, 100))
-        widget = widget or GraphicsView(
-            canvas,
-            sceneRect=QtCore.QRectF(0, 0, 5000, 5000),
-            renderHints=QtGui.QPainter.RenderHint.Antialiasing,
-            viewportUpdateMode=QtWidgets.QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate,
-            backgroundBrush=QtGui.QBrush(QtGui.QColor(0x232A2E)),
-        )  # Use a QGraphicsView as the default widget if no widget is provided.
+        widget = widget or self._create_view()  # Use a QGraphicsView as the default widget if no widget is provided.
 
         self.addTab(
             widget,  # Set the provided widget or the default widget.
             icon or QtGui.QIcon(),  # The default icon is empty.
             label or f"Tab {count + 1}",  # Use an updated tab count as the default.
         )  # Display the widget in a new tab
+
+        self._manager.track(widget)
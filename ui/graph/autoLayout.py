@@ -0,0 +1,164 @@
+# Encoding: utf-8
+# Module name: autoLayout
+# Description: Runs the layered layout of a canvas in a worker thread and animates its nodes into place
+
+# Imports (standard)
+from __future__ import annotations
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Imports (third party)
+import numpy as np
+from PySide6 import QtCore, QtWidgets
+
+# Imports (local)
+from core.layout import hierarchical_layout
+
+# Default options:
+AutoLayoutOpts = {
+    "duration": 400,  # Animation length in milliseconds.
+    "animate-limit": 2000,  # Larger canvases jump to the result without animating.
+}
+
+
+# Class AutoLayout:
+class AutoLayout(QtCore.QObject):
+    """
+    Arranges the nodes of a GraphicsScene with `core.layout.hierarchical_layout`.
+
+    Note:
+        - The layout is computed from the scene's GraphModel in a single worker thread; only the final positions are
+          applied on the GUI thread.
+        - One QVariantAnimation drives every node, so each frame is a single batched position update with the scene's
+          item index disabled.
+        - A result is discarded if the canvas changed while it was being computed.
+    """
+
+    # Signals:
+    sig_finished = QtCore.Signal()
+    _sig_future_done = QtCore.Signal(object)  # Internal, crosses from the worker thread.
+
+    # Default constructor:
+    def __init__(self, scene: QtWidgets.QGraphicsScene, **kwargs):
+        super().__init__(scene)
+
+        self._scene = scene
+        self._opts = {**AutoLayoutOpts, **kwargs}
+        self._logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="layout")
+
+        # State of the current run:
+        self._nodes: list = []
+        self._version = None
+        self._index = QtWidgets.QGraphicsScene.ItemIndexMethod.BspTreeIndex
+        self._start = self._end = np.empty((0, 2))
+
+        self._anim = QtCore.QVariantAnimation(
+            self,
+            startValue=0.0,
+            endValue=1.0,
+            duration=self._opts["duration"],
+            easingCurve=QtCore.QEasingCurve.Type.OutCubic,
+        )
+        self._anim.valueChanged.connect(self._on_frame)
+        self._anim.finished.connect(self._on_animation_finished)
+        self._sig_future_done.connect(self._on_future_done)
+
+    # Start a layout run:
+    def run(self, **kwargs) -> None:
+        """
+        Lay out the scene's nodes in the background.
+        :param kwargs: Overrides of core.layout.LayoutOpts.
+        """
+
+        from ui.graph.node import NodeItem
+
+        # A run started mid-animation first lands the previous one, which also restores the scene's index:
+        self._settle()
+
+        model = self._scene.model()
+        lookup = {
+            item.attr["id"]: item for item in self._scene.items() if isinstance(item, NodeItem)
+        }
+
+        self._nodes = [lookup[uid] for uid in model.node_ids.tolist()]
+        self._version = self._scene.version
+        if not self._nodes:
+            return
+
+        frames = [node.attr["frame"] for node in self._nodes]
+        sizes = np.array([(frame.width(), frame.height()) for frame in frames])
+        future = self._executor.submit(hierarchical_layout, model, sizes, **kwargs)
+        future.add_done_callback(self._sig_future_done.emit)
+
+    # Stop the worker thread:
+    def shutdown(self) -> None:
+        self._anim.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # Apply a finished layout:
+    @QtCore.Slot(object)
+    def _on_future_done(self, future: Future) -> None:
+
+        if future.cancelled():
+            return
+
+        if (error := future.exception()) is not None:
+            self._logger.error(f"Layout failed: {error}")
+            return
+
+        if self._scene.version != self._version:
+            self._logger.info("Canvas changed during layout, result discarded")
+            return
+
+        self._settle()
+
+        # Centers -> item positions (each node's frame is offset from its origin):
+        frames = [node.attr["frame"] for node in self._nodes]
+        offsets = np.array([(frame.center().x(), frame.center().y()) for frame in frames])
+        self._end = future.result() - offsets
+        self._start = np.array([(node.x(), node.y()) for node in self._nodes])
+
+        # Keep the arrangement where the nodes were:
+        self._end += self._start.min(axis=0) - self._end.min(axis=0)
+
+        # The scene's BSP index would be rebuilt on every move; disable it until the nodes have settled:
+        self._index = self._scene.itemIndexMethod()
+        self._scene.setItemIndexMethod(QtWidgets.QGraphicsScene.ItemIndexMethod.NoIndex)
+
+        if len(self._nodes) > self._opts["animate-limit"]:
+            self._on_frame(1.0)
+            self._on_animation_finished()
+        else:
+            self._anim.start()
+
+    # Finish a running animation at its final positions:
+    def _settle(self) -> None:
+
+        if self._anim.state() != QtCore.QAbstractAnimation.State.Running:
+            return
+
+        self._anim.stop()
+        self._on_frame(1.0)
+        self._on_animation_finished()
+
+    # Move every node for one animation frame:
+    def _on_frame(self, value: float) -> None:
+
+        # Nodes deleted during the animation are skipped:
+        positions = (self._start + (self._end - self._start) * value).tolist()
+        for node, (x, y) in zip(self._nodes, positions):
+            if node.scene() is self._scene:
+                node.setPos(x, y)
+
+    # Positions are saved with the project, so the canvas has changed:
+    def _on_animation_finished(self) -> None:
+
+        self._scene.setItemIndexMethod(self._index)
+        self._nodes = []
+        self._scene.touch()
+        self.sig_finished.emit()
+
+
+# Exported names
+__all__ = ["AutoLayout", "AutoLayoutOpts"]
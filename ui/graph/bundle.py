@@ -0,0 +1,233 @@
+# Encoding: utf-8
+# Module name: bundle
+# Description: A bundle of edges drawn as one path (see core/bundling.py)
+
+# Imports (standard)
+from __future__ import annotations
+import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+# Imports (third party)
+import numpy as np
+from PySide6 import QtGui, QtCore, QtWidgets
+
+# Imports (local)
+from core.bundling import bundle
+
+# Worker thread shared by every bundle (created on first use):
+_executor: ThreadPoolExecutor | None = None
+
+
+# Shared worker:
+def _worker() -> ThreadPoolExecutor:
+
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bundling")
+    return _executor
+
+
+# Class BundleItem:
+class BundleItem(QtWidgets.QGraphicsObject):
+    """
+    Draws a group of bundled edges with a single path.
+
+    Note:
+        - Member edges stay in the scene for hit-testing, selection and serialization, but skip painting while they are
+          bundled (unless selected); their shapes follow the bundled polylines.
+        - When a member's endpoint moves, the bundle is recomputed for its members only, after a short delay, in a
+          worker thread shared by all bundles; only the newest result of a bundle is applied.
+    """
+
+    # Signals:
+    _sig_future_done = QtCore.Signal(object)  # Internal, crosses from the worker thread.
+
+    # Default constructor:
+    def __init__(self, edges: list, points: np.ndarray, parent: QtWidgets.QGraphicsObject | None = None, **kwargs):
+        super().__init__(parent)
+        super().setZValue(-11)  # Beneath the (invisible) member edges.
+
+        self._edges = [weakref.ref(edge) for edge in edges]
+        self._opts = kwargs  # Overrides of core.bundling.BundleOpts.
+        self._points = weakref.WeakKeyDictionary()  # Current polyline of each member edge.
+        self._path = QtGui.QPainterPath()
+        self._logger = logging.getLogger(__name__)
+        self._generation = 0  # Incremented by every refresh, so that older results are dropped.
+
+        self._timer = QtCore.QTimer(self, singleShot=True, interval=150)
+        self._timer.timeout.connect(self.refresh)
+        self._sig_future_done.connect(self._on_future_done)
+
+        for edge in edges:
+            edge.set_bundle(self)
+
+        self.set_points(dict(zip(edges, points)))
+
+    # Live member edges:
+    def edges(self) -> list:
+        return [edge for ref in self._edges if (edge := ref()) is not None]
+
+    # Reimplement QGraphicsObject.boundingRect():
+    def boundingRect(self) -> QtCore.QRectF:
+        return self._path.boundingRect().adjusted(-4, -4, 4, 4)
+
+    # Reimplement QGraphicsObject.paint():
+    def paint(self, painter, option, /, widget=...):
+
+        edges = self.edges()
+        if not edges:
+            return
+
+        stroke = edges[0].property("stroke")
+        painter.setPen(
+            QtGui.QPen(
+                stroke["color"],
+                stroke["width"],
+                stroke["style"],
+                QtCore.Qt.PenCapStyle.RoundCap,
+                QtCore.Qt.PenJoinStyle.RoundJoin,
+            )
+        )
+        painter.setBrush(QtCore.Qt.BrushStyle.NoBrush)
+        painter.drawPath(self._path)
+
+    # Apply bundled polylines, keyed by member edge:
+    def set_points(self, points: dict) -> None:
+        """
+        Route the member edges along their bundled polylines and redraw the bundle.
+        :param points: Polyline (an array of shape (n, 2)) of each edge; members without one keep their route.
+        """
+
+        path = QtGui.QPainterPath()
+        for edge in self.edges():
+            if (line := points.get(edge)) is not None:
+                self._points[edge] = QtGui.QPolygonF([QtCore.QPointF(x, y) for x, y in np.asarray(line).tolist()])
+                edge.set_bundled_route(self._points[edge])
+            if (polyline := self._points.get(edge)) is not None:
+                path.addPolygon(polyline)
+
+        self.prepareGeometryChange()
+        self._path = path
+        self.update()
+
+    # Serialize the bundle, with its members identified by their (origin, target) handle ids:
+    def serialize_to_dict(self) -> dict:
+
+        edges, points = [], []
+        for edge in self.edges():
+            if (polyline := self._points.get(edge)) is None or edge.origin() is None or edge.target() is None:
+                continue
+            edges.append([edge.origin().attr["id"], edge.target().attr["id"]])
+            points.append([point.toTuple() for point in polyline])
+
+        return {"edges": edges, "points": points, "opts": dict(self._opts)}
+
+    # Rebuild a bundle from serialize_to_dict() output:
+    @classmethod
+    def from_dict(cls, data: dict, edges: dict) -> "BundleItem | None":
+        """
+        Returns a new bundle (not yet added to a scene), or None if fewer than two of its members still exist.
+        :param data: A dictionary produced by serialize_to_dict().
+        :param edges: (origin handle id, target handle id) -> EdgeItem.
+        """
+
+        members = [(edges.get(tuple(ends)), line) for ends, line in zip(data["edges"], data["points"])]
+        members = [(edge, line) for edge, line in members if edge is not None]
+        if len(members) < 2:
+            return None
+
+        return cls([edge for edge, _ in members], [np.asarray(line) for _, line in members], **data.get("opts", {}))
+
+    # Schedule a refresh (e.g. when an endpoint moves):
+    def invalidate(self) -> None:
+        self._timer.start()
+
+    # Recompute the bundle for the current endpoints:
+    def refresh(self) -> None:
+
+        edges = [edge for edge in self.edges() if edge.origin() is not None and edge.target() is not None]
+        if len(edges) < 2:
+            self.release()
+            return
+
+        self._edges = [weakref.ref(edge) for edge in edges]
+        self._generation += 1
+
+        segments = np.array([(edge.origin().scenePos().toTuple(), edge.target().scenePos().toTuple()) for edge in edges])
+        future = _worker().submit(bundle, segments, **{**self._opts, "min-size": 1})
+        request = (self._generation, [weakref.ref(edge) for edge in edges])
+        future.add_done_callback(lambda done, request=request: self._sig_future_done.emit((request, done)))
+
+    # Apply a finished bundle:
+    @QtCore.Slot(object)
+    def _on_future_done(self, item: tuple) -> None:
+
+        (generation, refs), future = item
+        if generation != self._generation or future.cancelled():
+            return
+
+        if (error := future.exception()) is not None:
+            self._logger.error(f"Bundling failed: {error}")
+            return
+
+        # Members that died or left meanwhile are skipped by set_points:
+        points = future.result().points
+        self.set_points({edge: line for ref, line in zip(refs, points) if (edge := ref()) is not None})
+
+    # Restore the member edges and remove the bundle:
+    def release(self) -> None:
+
+        self._timer.stop()
+        self._generation += 1  # Drop a result still being computed.
+        for edge in self.edges():
+            edge.set_bundle(None)
+
+        self._edges = []
+        if self.scene() is not None:
+            self.scene().removeItem(self)
+
+
+# Bundle the edges of a scene:
+def bundle_scene(scene: QtWidgets.QGraphicsScene, **kwargs) -> list[BundleItem]:
+    """
+    Replace the scene's bundles with new ones computed from all connected edges.
+    :param kwargs: Overrides of core.bundling.BundleOpts.
+    :return: The new bundles.
+    """
+
+    from ui.graph.edge import EdgeItem
+
+    unbundle_scene(scene)
+
+    edges = [
+        item
+        for item in scene.items()
+        if isinstance(item, EdgeItem)
+        and getattr(item, "origin", None)
+        and item.origin() is not None
+        and item.target() is not None
+    ]
+    if len(edges) < 2:
+        return []
+
+    segments = np.array([(edge.origin().scenePos().toTuple(), edge.target().scenePos().toTuple()) for edge in edges])
+    result = bundle(segments, **kwargs)
+
+    bundles = []
+    for members in result.bundles():
+        item = BundleItem([edges[index] for index in members], result.points[members], **kwargs)
+        scene.addItem(item)
+        bundles.append(item)
+
+    return bundles
+
+
+# Remove all bundles from a scene:
+def unbundle_scene(scene: QtWidgets.QGraphicsScene) -> None:
+    for item in [item for item in scene.items() if isinstance(item, BundleItem)]:
+        item.release()
+
+
+# Exported names
+__all__ = ["BundleItem", "bundle_scene", "unbundle_scene"]
@@ -0,0 +1,175 @@
+# Encoding: utf-8
+# Module name: clipboard
+# Description: Copying and pasting canvas selections through the system clipboard
+
+# Imports (standard)
+from __future__ import annotations
+import json
+import zlib
+
+# Imports (third party)
+from PySide6 import QtGui, QtCore
+
+# Imports (local)
+from core.templates import NodeTemplate, TemplateLibrary
+
+# Default options:
+ClipboardOpts = {
+    "mime": "application/x-climact-selection",  # Compressed payload, see `encode`.
+    "json": "application/json",  # Plain JSON fallback for other applications and older versions.
+    "magic": b"CLMT",
+    "format": 1,
+    "offset": QtCore.QPointF(25, 25),  # Shift of a selection pasted without a target position.
+    "budget": 0.012,  # Seconds of node construction per event-loop tick; larger pastes continue on the next tick.
+}
+
+
+# JSON encoding of the Qt values found in serialized nodes:
+def _encode(value):
+
+    if isinstance(value, QtCore.QRectF):
+        return {"__rect__": [value.x(), value.y(), value.width(), value.height()]}
+
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode(value: dict):
+
+    if "__rect__" in value:
+        return QtCore.QRectF(*value["__rect__"])
+
+    return value
+
+
+# The clipboard payload of a selection:
+def selection(scene, nodes: list) -> dict:
+    """
+    :return: {"format", "templates", "nodes", "edges"}, with only the edges between the given nodes.
+    """
+
+    records, templates, handles = [], {}, set()
+    for node in nodes:
+        records.append(node.serialize_to_dict())
+        handles.update(handle.attr["id"] for handle in (*node.database.inp, *node.database.out))
+        if node.template is not None:
+            templates[node.template.key] = node.template.template.to_dict()
+
+    edges, seen = [], set()
+    for node in nodes:
+        for edge in scene.connections.edges_of_node(node):
+            origin, target = scene.connections.ends(edge)
+            if edge not in seen and origin.attr["id"] in handles and target.attr["id"] in handles:
+                seen.add(edge)
+                edges.append(
+                    {"origin": origin.attr["id"], "target": target.attr["id"], "curve": edge.property("curve")}
+                )
+
+    return {"format": ClipboardOpts["format"], "templates": templates, "nodes": records, "edges": edges}
+
+
+# Payload -> compact bytes:
+def pack(payload: dict) -> bytes:
+    """
+    Layout: magic (4 bytes), format (1 byte), zlib-compressed compact JSON.
+    """
+
+    return _pack_text(json.dumps(payload, default=_encode, separators=(",", ":")))
+
+
+def _pack_text(text: str) -> bytes:
+    return ClipboardOpts["magic"] + bytes([ClipboardOpts["format"]]) + zlib.compress(text.encode("utf-8"))
+
+
+# Compact bytes -> payload:
+def unpack(data: bytes) -> dict | None:
+
+    magic = ClipboardOpts["magic"]
+    if len(data) <= len(magic) or data[: len(magic)] != magic or data[len(magic)] > ClipboardOpts["format"]:
+        return None
+
+    try:
+        return json.loads(zlib.decompress(data[len(magic) + 1 :]).decode("utf-8"), object_hook=_decode)
+    except (ValueError, zlib.error):
+        return None
+
+
+# Payload -> QMimeData:
+def encode(payload: dict) -> QtCore.QMimeData:
+
+    text = json.dumps(payload, default=_encode, separators=(",", ":"))
+    data = _pack_text(text)
+
+    mime = QtCore.QMimeData()
+    mime.setData(ClipboardOpts["mime"], QtCore.QByteArray(data))
+    mime.setData(ClipboardOpts["json"], QtCore.QByteArray(text.encode("utf-8")))
+    mime.setText(text)
+    return mime
+
+
+# QMimeData -> payload:
+def decode(mime: QtCore.QMimeData) -> dict | None:
+    """
+    :return: The payload, or None if the clipboard holds no canvas selection.
+    """
+
+    try:
+        if mime.hasFormat(ClipboardOpts["mime"]):
+            payload = unpack(mime.data(ClipboardOpts["mime"]).data())
+
+        elif mime.hasFormat(ClipboardOpts["json"]):
+            payload = json.loads(mime.data(ClipboardOpts["json"]).data().decode("utf-8"), object_hook=_decode)
+
+        elif mime.hasText():
+            payload = json.loads(mime.text(), object_hook=_decode)
+
+        else:
+            return None
+
+    except ValueError:
+        return None
+
+    if not isinstance(payload, dict) or not isinstance(payload.get("nodes"), list):
+        return None
+
+    payload.setdefault("edges", [])
+    payload.setdefault("templates", {})
+    return payload
+
+
+# Copy nodes to the system clipboard:
+def copy_nodes(scene, nodes: list) -> None:
+
+    if nodes:
+        QtGui.QGuiApplication.clipboard().setMimeData(encode(selection(scene, nodes)))
+
+
+# Paste the clipboard's selection:
+def paste_nodes(scene, position: QtCore.QPointF | None = None) -> list:
+    """
+    Insert the clipboard's nodes (with new ids) and the edges between them.
+    :param position: Where the top-left node of the selection goes; by default the copy is shifted slightly.
+    :return: The new nodes.
+    """
+
+    payload = decode(QtGui.QGuiApplication.clipboard().mimeData())
+    if not payload or not payload["nodes"]:
+        return []
+
+    # Templates unknown to this session are added, so that pasted nodes keep their template:
+    library = TemplateLibrary.instance()
+    for key, template in payload["templates"].items():
+        if key not in library:
+            library.add(NodeTemplate.from_dict(template))
+
+    if position is None:
+        offset = ClipboardOpts["offset"]
+    else:
+        left = min(record["cpos"]["x"] for record in payload["nodes"])
+        top = min(record["cpos"]["y"] for record in payload["nodes"])
+        offset = position - QtCore.QPointF(left, top)
+
+    return scene.paste_nodes(payload["nodes"], payload["edges"], offset)
+
+
+# Exported names
+__all__ = ["ClipboardOpts", "selection", "pack", "unpack", "encode", "decode", "copy_nodes", "paste_nodes"]
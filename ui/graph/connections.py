@@ -0,0 +1,160 @@
+# Encoding: utf-8
+# Module name: connections
+# Description: Scene-level registry of the edges between handles, with per-handle adjacency sets
+
+# Imports (standard)
+from __future__ import annotations
+from typing import TYPE_CHECKING, Iterator
+
+# Imports (third party)
+from PySide6 import QtWidgets
+
+if TYPE_CHECKING:
+    from ui.graph.edge import EdgeItem
+    from ui.graph.handle import HandleItem
+    from ui.graph.node import NodeItem
+
+
+# Class HandleConnectionError:
+class HandleConnectionError(ValueError):
+    """
+    Raised when an edge cannot be registered, e.g. because a one-to-one handle is already connected.
+    """
+
+
+# Class ConnectionRegistry:
+class ConnectionRegistry:
+    """
+    The canvas's edges, indexed by edge and by handle.
+
+    Note:
+        - Every query touches only the handles and edges involved: connecting and disconnecting are O(1), edges and
+          neighbours of a node are O(handles + degree).
+        - Items are held strongly until they are disconnected; `detach_node` disconnects and removes all edges of a node
+          in one batch.
+    """
+
+    def __init__(self):
+        self._edges: dict[EdgeItem, tuple[HandleItem, HandleItem]] = {}  # Edge -> (origin, target).
+        self._adjacency: dict[HandleItem, set[EdgeItem]] = {}
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def __contains__(self, edge: EdgeItem) -> bool:
+        return edge in self._edges
+
+    def __iter__(self) -> Iterator[tuple[EdgeItem, HandleItem, HandleItem]]:
+        return ((edge, origin, target) for edge, (origin, target) in self._edges.items())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Mutation
+
+    def connect(self, edge: EdgeItem, origin: HandleItem, target: HandleItem) -> None:
+        """
+        Register an edge from `origin` to `target`.
+        :raise HandleConnectionError: If either handle does not accept another connection.
+        """
+
+        if edge in self._edges:
+            self.disconnect(edge)
+
+        for handle in (origin, target):
+            if not handle.is_connectable():
+                raise HandleConnectionError(f"Handle '{handle.attr['name']}' is already connected")
+
+        self._edges[edge] = (origin, target)
+        self._adjacency.setdefault(origin, set()).add(edge)
+        self._adjacency.setdefault(target, set()).add(edge)
+
+    def disconnect(self, edge: EdgeItem) -> tuple[HandleItem, HandleItem] | None:
+        """
+        Unregister an edge.
+        :return: Its (origin, target), or None if it was not registered.
+        """
+
+        ends = self._edges.pop(edge, None)
+        if ends is None:
+            return None
+
+        for handle in ends:
+            edges = self._adjacency.get(handle)
+            if edges is not None:
+                edges.discard(edge)
+                if not edges:
+                    del self._adjacency[handle]
+
+        return ends
+
+    def detach_node(self, node: NodeItem) -> list[EdgeItem]:
+        """
+        Disconnect every edge of a node and remove the edges from their scene, in one batch.
+        :return: The removed edges.
+        """
+
+        edges = self.edges_of_node(node)
+        scene = node.scene()
+
+        for edge in edges:
+            self.disconnect(edge)
+            edge.detach()
+
+        if scene is not None:
+            index = scene.itemIndexMethod()
+            scene.setItemIndexMethod(QtWidgets.QGraphicsScene.ItemIndexMethod.NoIndex)
+            for edge in edges:
+                if edge.scene() is scene:
+                    scene.removeItem(edge)
+            scene.setItemIndexMethod(index)
+
+        return edges
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Queries
+
+    def ends(self, edge: EdgeItem) -> tuple[HandleItem, HandleItem] | None:
+        return self._edges.get(edge)
+
+    def edges_of(self, handle: HandleItem) -> set[EdgeItem]:
+        return set(self._adjacency.get(handle, ()))
+
+    def degree(self, handle: HandleItem) -> int:
+        return len(self._adjacency.get(handle, ()))
+
+    def conjugates(self, handle: HandleItem) -> list[HandleItem]:
+        """
+        Handles connected to `handle`.
+        """
+
+        result = []
+        for edge in self._adjacency.get(handle, ()):
+            origin, target = self._edges[edge]
+            result.append(target if origin is handle else origin)
+        return result
+
+    def edges_of_node(self, node: NodeItem) -> list[EdgeItem]:
+        """
+        Edges attached to any handle of `node` (each listed once).
+        """
+
+        edges = {}
+        for handle in (*node.database.inp, *node.database.out):
+            for edge in self._adjacency.get(handle, ()):
+                edges[edge] = None
+        return list(edges)
+
+    def neighbours(self, node: NodeItem) -> list[NodeItem]:
+        """
+        Nodes connected to `node` by at least one edge (each listed once).
+        """
+
+        result = {}
+        for handle in (*node.database.inp, *node.database.out):
+            for other in self.conjugates(handle):
+                if (parent := other.parentItem()) is not None and parent is not node:
+                    result[parent] = None
+        return list(result)
+
+
+# Exported names
+__all__ = ["HandleConnectionError", "ConnectionRegistry"]
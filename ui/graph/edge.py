@@ -12,11 +12,16 @@ import weakref
 from PySide6 import QtGui, QtCore, QtWidgets
 
 # Import (local):
+from core.routing import RoutingOpts
+from events.messages import ItemFocused
+from events.widgetEvents import EventBus
 from ui.graph.image import Image
+from ui.graph.paintProfiler import profiled
 import opts
 
 EdgeOpts = {
     "frame": QtCore.QRectF(-2.5, -2.5, 5, 5),  # Default bounding rectangle.
+    "curve": "bezier",  # "bezier" or "angular" (orthogonal, routed around nodes).
     "slack": 0.40,  # Higher values result in more slacked beziers.
     "radius": 4,  # Radius for rounded corners (only for the angular curve).
     "stroke": {
@@ -77,13 +82,15 @@ class EdgeItem(QtWidgets.QGraphicsObject):
     # Initialize attribute(s):
     def _init_attr(self, kwargs: dict[str, Any]):
 
-        self.setProperty("curve", "bezier")
+        self.setProperty("curve", kwargs.get("curve", EdgeOpts["curve"]))
         self.setProperty("route", QtGui.QPainterPath())
         self.setProperty("slack", kwargs.get("slack", EdgeOpts["slack"]))
+        self.setProperty("radius", kwargs.get("radius", EdgeOpts["radius"]))
         self.setProperty("frame", kwargs.get("frame", EdgeOpts["frame"]))
         self.setProperty("stroke", kwargs.get("stroke", EdgeOpts["stroke"]))
 
         self.base_width = EdgeOpts["stroke"]["width"]  # Base width for the stroke.
+        self.bundle = None  # Weak reference to the BundleItem that draws this edge (see ui/graph/bundle.py).
 
     # Initialize animation(s):
     def _init_anim(self):
@@ -92,8 +99,21 @@ class EdgeItem(QtWidgets.QGraphicsObject):
         self._anim.setEasingCurve(QtCore.QEasingCurve.Type.InOutSine)
         self._anim.setDuration(240)
 
+    # Forward focus requests to the application-wide EventBus:
+    def _register_with_bus(self):
+
+        bus = EventBus.instance()
+        self.sig_item_focused.connect(lambda item: bus.publish(ItemFocused(item)))
+
     # Connect the vector to origin and target:
     def _connect(self, origin: "HandleItem", target: "HandleItem") -> None:
+        """
+        Attach the edge to its handles and register it with the scene's connection registry (if in a scene).
+        :raise HandleConnectionError: If a one-to-one handle is already connected.
+        """
+
+        if (registry := origin.registry) is not None:
+            registry.connect(self, origin, target)
 
         self.origin = weakref.ref(origin)  # Weak reference to the origin handle.
         self.target = weakref.ref(target)  # Weak reference to the target handle.
@@ -102,20 +122,40 @@ class EdgeItem(QtWidgets.QGraphicsObject):
         # Initial path construction:
         self.update_path(origin, target)
 
-        # Pair the origin to the target:
-        origin.pair(self, target)
-        target.pair(self, origin)
-        target.set_stream(origin.attr["flow"].LABEL, mirror=False)
+        # The target takes the origin's stream:
+        target.set_stream(origin.attr["flow"].LABEL, mirror=False, color=origin.attr["flow"].COLOR)
 
         # Connect signals to monitor endpoint shifts:
         origin.sig_handle_moved.connect(self.on_endpoint_shifted)
         target.sig_handle_moved.connect(self.on_endpoint_shifted)
 
+    # Release the handles (the registry entry is removed by the caller, see ConnectionRegistry):
+    def detach(self) -> None:
+
+        for ref in (getattr(self, "origin", None), getattr(self, "target", None)):
+            if ref is not None and (handle := ref()) is not None:
+                handle.sig_handle_moved.disconnect(self.on_endpoint_shifted)
+
+        self.origin = self.target = lambda: None  # Behaves like a dead weak reference.
+        if self.bundle is not None and (bundle := self.bundle()) is not None:
+            bundle.invalidate()
+
+    # Reimplement QGraphicsObject.itemChange():
+    def itemChange(self, change, value, /):
+
+        # Unregister when removed from the canvas:
+        if change == QtWidgets.QGraphicsObject.GraphicsItemChange.ItemSceneChange and value is None:
+            if (registry := getattr(self.scene(), "connections", None)) is not None:
+                registry.disconnect(self)
+
+        return super().itemChange(change, value)
+
     # Reimplement QGraphicsObject.boundingRect():
     def boundingRect(self) -> QtCore.QRectF:
         return self.property("route").boundingRect().adjusted(-4, -4, 4, 4)
 
     # Reimplement QGraphicsObject.paint():
+    @profiled
     def paint(
         self,
         painter: QtGui.QPainter,
@@ -123,6 +163,10 @@ class EdgeItem(QtWidgets.QGraphicsObject):
         widget: QtWidgets.QWidget | None = None,
     ) -> None:
 
+        # Bundled edges are drawn by their bundle:
+        if self.bundle is not None and not self.isSelected():
+            return
+
         color = self.property("stroke")["color"]
         width = self.property("stroke")["width"]
         style = self.property("stroke")["style"]
@@ -203,6 +247,9 @@ class EdgeItem(QtWidgets.QGraphicsObject):
             path.cubicTo(ctrl_one, ctrl_two, final)
             return path
 
+        if self.property("curve") == "angular":
+            return self._elbow(initial, final)
+
         slack = (
             self.property("slack")
             if initial.x() < final.x()
@@ -210,6 +257,51 @@ class EdgeItem(QtWidgets.QGraphicsObject):
         )
         return _bezier(slack)
 
+    # Provisional orthogonal path, shown until the router delivers a route around the nodes:
+    def _elbow(self, initial: QtCore.QPointF, final: QtCore.QPointF) -> QtGui.QPainterPath:
+
+        stub = RoutingOpts["stub"]
+        middle = (initial.x() + final.x()) / 2 if final.x() - initial.x() > 2 * stub else None
+        points = [(initial.x(), initial.y())]
+        if middle is None:
+            points += [
+                (initial.x() + stub, initial.y()),
+                (initial.x() + stub, (initial.y() + final.y()) / 2),
+                (final.x() - stub, (initial.y() + final.y()) / 2),
+                (final.x() - stub, final.y()),
+            ]
+        else:
+            points += [(middle, initial.y()), (middle, final.y())]
+
+        points.append((final.x(), final.y()))
+        return self.rounded_path(points, self.property("radius"))
+
+    # Polyline with rounded corners:
+    @staticmethod
+    def rounded_path(points, radius: float) -> QtGui.QPainterPath:
+        """
+        Build a path through the given points, rounding every corner with a quadratic arc.
+        :param points: Sequence of (x, y) pairs.
+        :param radius: Corner radius, reduced where segments are too short.
+        """
+
+        points = [QtCore.QPointF(float(x), float(y)) for x, y in points]
+        path = QtGui.QPainterPath(points[0])
+
+        for prev, corner, succ in zip(points, points[1:], points[2:]):
+            inward, outward = corner - prev, succ - corner
+            len_in = abs(inward.x()) + abs(inward.y())  # Segments are axis-aligned.
+            len_out = abs(outward.x()) + abs(outward.y())
+            if not len_in or not len_out:
+                continue
+
+            r = min(radius, len_in / 2, len_out / 2)
+            path.lineTo(corner - inward * (r / len_in))
+            path.quadTo(corner, corner + outward * (r / len_out))
+
+        path.lineTo(points[-1])
+        return path
+
     # Callback function to update the path:
     def update_path(
         self,
@@ -223,8 +315,43 @@ class EdgeItem(QtWidgets.QGraphicsObject):
             origin = origin.scenePos()
             target = target.scenePos()
 
-        self.setProperty("route", self.construct_path(origin, target))
+        self._set_route(self.construct_path(origin, target))
+
+        # Bundled edges are re-bundled with their bundle:
+        if self.bundle is not None and (bundle := self.bundle()) is not None:
+            bundle.invalidate()
+            return
+
+        # Angular edges between two handles are then routed around the nodes:
+        router = getattr(self.scene(), "router", None)
+        if self.property("curve") == "angular" and router is not None and getattr(self, "origin", None):
+            router.request(self)
+
+    # Apply a route computed by the canvas's router:
+    def set_route(self, points) -> None:
+        self._set_route(self.rounded_path(points, self.property("radius")))
+
+    # Join or leave a bundle:
+    def set_bundle(self, bundle: QtWidgets.QGraphicsObject | None) -> None:
+
+        self.bundle = weakref.ref(bundle) if bundle is not None else None
+        self._arrow.setVisible(bundle is None)
+        if bundle is None and getattr(self, "origin", None):
+            if self.origin() is not None and self.target() is not None:
+                self.update_path(self.origin(), self.target())
+
+    # Follow the bundled polyline (used for hit-testing while the bundle paints):
+    def set_bundled_route(self, polyline: QtGui.QPolygonF) -> None:
+
+        path = QtGui.QPainterPath()
+        path.addPolygon(polyline)
+        self._set_route(path)
+
+    # Replace the drawn path:
+    def _set_route(self, path: QtGui.QPainterPath) -> None:
+
         self.prepareGeometryChange()
+        self.setProperty("route", path)
         self.update()
 
         route = QtGui.QPainterPath(self.property("route"))
@@ -0,0 +1,159 @@
+# Encoding: utf-8
+# Module name: edgeRouter
+# Description: Routes the canvas's angular edges around nodes in a worker thread
+
+# Imports (standard)
+from __future__ import annotations
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Imports (third party)
+from PySide6 import QtCore, QtWidgets
+
+# Imports (local)
+from core.routing import Router, route_batch
+
+
+# Class EdgeRouter:
+class EdgeRouter(QtCore.QObject):
+    """
+    Keeps a core.routing.Router in sync with the canvas's nodes and routes edges in the background.
+
+    Note:
+        - Requests made during one event-loop iteration are coalesced into a single worker job, and at most one job
+          runs at a time; requests arriving meanwhile are sent with the next job.
+        - When a node moves or is resized, only the edges whose cached routes pass near it are re-routed.
+        - Edges show a provisional elbow until their route arrives (see EdgeItem.construct_path).
+    """
+
+    # Signals:
+    _sig_future_done = QtCore.Signal(object)  # Internal, crosses from the worker thread.
+
+    # Default constructor:
+    def __init__(self, parent: QtCore.QObject | None = None, **kwargs):
+        super().__init__(parent)
+
+        self._router = Router(**kwargs)
+        self._executor: ThreadPoolExecutor | None = None
+        self._running = False
+
+        # Routed edges and their current keys (both ways), and the edges waiting for a route:
+        self._edges: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._by_key: dict[tuple, weakref.WeakSet] = {}
+        self._queued: weakref.WeakSet = weakref.WeakSet()
+
+        self._timer = QtCore.QTimer(self, singleShot=True, interval=0)
+        self._timer.timeout.connect(self._flush)
+        self._sig_future_done.connect(self._on_future_done)
+
+    # Node geometry changed:
+    def obstacle_moved(self, node: QtWidgets.QGraphicsItem) -> None:
+        """
+        Update a node's obstacle and re-route the affected edges.
+        """
+
+        for edge in self._edges_of(self._router.set_obstacle(id(node), node.sceneBoundingRect().getCoords())):
+            self.request(edge)
+
+    # Node left the canvas:
+    def obstacle_removed(self, node: QtWidgets.QGraphicsItem) -> None:
+
+        for edge in self._edges_of(self._router.set_obstacle(id(node), None)):
+            self.request(edge)
+
+    # Live edges with the given keys:
+    def _edges_of(self, keys) -> list:
+
+        edges = []
+        for key in keys:
+            group = self._by_key.get(key)
+            if group is not None:
+                edges.extend(group)
+                if not group:
+                    del self._by_key[key]
+        return edges
+
+    # Route an edge:
+    def request(self, edge: QtWidgets.QGraphicsItem) -> None:
+        """
+        Apply a cached route to the edge right away, or queue it for the worker.
+        """
+
+        origin, target = edge.origin(), edge.target()
+        if origin is None or target is None:
+            return
+
+        key = Router.key(origin.scenePos().toTuple(), target.scenePos().toTuple())
+        previous = self._edges.get(edge)
+        if previous != key:
+            if previous is not None and (group := self._by_key.get(previous)) is not None:
+                group.discard(edge)
+                if not group:
+                    del self._by_key[previous]
+            self._by_key.setdefault(key, weakref.WeakSet()).add(edge)
+            self._edges[edge] = key
+
+        cached = self._router.lookup(key)
+        if cached is not None:
+            edge.set_route(cached.points)
+            return
+
+        self._queued.add(edge)
+        if not self._running:
+            self._timer.start()
+
+    # Send the queued edges to the worker:
+    def _flush(self) -> None:
+
+        requests = {}
+        for edge in list(self._queued):
+            if (key := self._edges.get(edge)) is not None:
+                requests[key] = (key, key[:2], key[2:])
+
+        self._queued.clear()
+        if not requests:
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="routing")
+
+        self._running = True
+        snapshot = self._router.snapshot()
+        future = self._executor.submit(route_batch, snapshot, list(requests.values()), **self._router.opts)
+        future.add_done_callback(self._sig_future_done.emit)
+
+    # Apply the routes of a finished job:
+    @QtCore.Slot(object)
+    def _on_future_done(self, future: Future) -> None:
+
+        self._running = False
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        valid, stale = {}, set()
+        for key, result in future.result():
+            if self._router.store(key, result):
+                valid[key] = result.points
+            else:
+                stale.add(key)  # An obstacle near the route changed while it was computed.
+
+        for key, points in valid.items():
+            for edge in self._edges_of((key,)):
+                edge.set_route(points)
+
+        self._queued.update(self._edges_of(stale))
+
+        if len(self._queued):
+            self._timer.start()
+
+    # Stop the worker thread:
+    def shutdown(self) -> None:
+
+        self._timer.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Exported names
+__all__ = ["EdgeRouter"]
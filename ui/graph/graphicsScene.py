@@ -4,6 +4,7 @@
 
 # Import (standard)
 from __future__ import annotations
+import time
 import dataclasses
 
 
@@ -12,13 +13,34 @@ from PySide6 import QtGui, QtCore, QtWidgets
 from PySide6.QtCore import QPointF
 from qtawesome import icon as qta_icon
 
+# Imports (local)
+from core.graphModel import GraphModel
+from core.templates import TemplateLibrary
+from core.validation import Issue, validate
+from ui.graph.connections import ConnectionRegistry
+from ui.graph.edgeRouter import EdgeRouter
+from ui.graph.handleIndex import HandleIndex
+from ui.graph.transient import TransientEdge
+from ui.graph.undo import UndoStack, Command, InsertCommand, RemoveCommand, MoveCommand, ResizeCommand, ConnectCommand
+
+# Default options:
+SceneOpts = {
+    "batch": 64,  # Batch edits of more items than this drop the BSP index and rebuild it once at the end.
+}
 
 # GraphicsScene class
 class GraphicsScene(QtWidgets.QGraphicsScene):
     """
     A QGraphicsScene-based canvas for the Climact application.
+
+    Note:
+        - `version` is incremented on every structural or data change (see `touch`); the GraphModel built by `model()`
+          and everything cached on it are reused until the version changes.
     """
 
+    # Signals:
+    sig_canvas_updated = QtCore.Signal()
+
     def __init__(self, scene_rect: QtCore.QRectF, **kwargs):
         super().__init__(
             scene_rect,
@@ -28,13 +50,50 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
         )
 
         self._mpos = QtCore.QPointF()
+
+        # BSP-tree rebuilds (scene-rect changes and batch edits), for the paint profiler:
+        self.index_rebuilds = 0
+        self.sceneRectChanged.connect(self._on_scene_rect_changed)
+        self._gesture: tuple | None = None  # State of the item being dragged (see _begin_gesture).
+
+        # Undo history (see ui/graph/undo.py):
+        self.undo_stack = UndoStack(self)
         self._menu = self._init_menu()
 
+        # Version counter and the model built for it:
+        self.version = 0
+        self._model: GraphModel | None = None
+        self._flagged: list[QtWidgets.QGraphicsItem] = []
+        self._layout = None  # AutoLayout, created on first use.
+        self._map = None  # MapLayer, created by load_map().
+
+        # Edges between handles, indexed by edge and by handle:
+        self.connections = ConnectionRegistry()
+
+        # Handle positions, for snapping (see ui/graph/handleIndex.py):
+        self.handles = HandleIndex()
+
+        # Nodes and handles by id (`attr["id"]`), kept by the nodes as they and their handles enter and leave:
+        self.by_id: dict[int, QtWidgets.QGraphicsItem] = {}
+
+        # Routes angular edges around nodes:
+        self.router = EdgeRouter(self)
+        self.edge_curve = "bezier"  # Curve of new edges (see EdgeOpts).
+
+        # Preview of the edge being dragged out of a handle, reused for every drag:
+        self._transient = TransientEdge()
+        self.addItem(self._transient)
+
+        # Refresh templated nodes when their template is edited:
+        TemplateLibrary.instance().subscribe(self.on_template_updated)
+
     # Helper method to initialize the context menu
-    @staticmethod
-    def _init_menu():
+    def _init_menu(self):
 
         menu = QtWidgets.QMenu()
+        menu.addAction(self.undo_stack.createUndoAction(menu))
+        menu.addAction(self.undo_stack.createRedoAction(menu))
+        menu.addSeparator()
         subm = menu.addMenu("Add")
         menu.addSeparator()
 
@@ -42,11 +101,30 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
         subm.addAction(
             qta_icon("ph.cube", color="cyan"),
             "Node",
-            lambda: GraphicsScene.create_item("NodeItem"),
+            lambda: self.create_item("NodeItem"),
+        )
+
+        # Templates are listed when the sub-menu opens, so that it reflects the current library:
+        templates = subm.addMenu(qta_icon("mdi.library", color="cyan"), "Template")
+        templates.aboutToShow.connect(lambda: self._fill_template_menu(templates))
+
+        menu.addAction(qta_icon("mdi.content-copy", color="#efefef"), "Copy", self.copy_selection)
+        menu.addAction(qta_icon("mdi.content-paste", color="blue"), "Paste", lambda: self.paste(self._mpos))
+        menu.addSeparator()
+        menu.addAction(
+            qta_icon("mdi.check-network", color="#899878"), "Validate", self.highlight_issues
+        )
+        menu.addAction(
+            qta_icon("mdi.graph-outline", color="#efefef"), "Arrange", self.auto_layout
         )
 
-        menu.addAction(qta_icon("mdi.content-copy", color="#efefef"), "Copy")
-        menu.addAction(qta_icon("mdi.content-paste", color="blue"), "Paste")
+        # Edge style:
+        style = menu.addMenu("Edges")
+        style.addAction("Bezier", lambda: self.set_edge_curve("bezier"))
+        style.addAction("Angular", lambda: self.set_edge_curve("angular"))
+        style.addSeparator()
+        style.addAction("Bundle", self.bundle_edges)
+        style.addAction("Unbundle", self.unbundle_edges)
         return menu
 
     # Reimplement QGraphicsScene.contextMenuEvent():
@@ -56,13 +134,561 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
             self._mpos = event.scenePos()
             self._menu.exec(event.screenPos())
 
+    # Reimplement QGraphicsScene.mousePressEvent():
+    def mousePressEvent(self, event: QtWidgets.QGraphicsSceneMouseEvent) -> None:
+
+        super().mousePressEvent(event)
+        self._gesture = self._begin_gesture()
+
+    # Reimplement QGraphicsScene.mouseMoveEvent():
+    def mouseMoveEvent(self, event: QtWidgets.QGraphicsSceneMouseEvent) -> None:
+
+        if self._transient.active():
+            self._transient.drag(event.scenePos())
+
+        super().mouseMoveEvent(event)
+
+    # Reimplement QGraphicsScene.mouseReleaseEvent():
+    def mouseReleaseEvent(self, event: QtWidgets.QGraphicsSceneMouseEvent) -> None:
+
+        if self._transient.active():
+            self._transient.drag(event.scenePos())
+            self.end_transient(*self._transient.end())
+
+        super().mouseReleaseEvent(event)
+        self._end_gesture()
+
+    # Reimplement QGraphicsScene.keyPressEvent():
+    def keyPressEvent(self, event: QtGui.QKeyEvent) -> None:
+
+        if self._transient.active() and event.key() == QtCore.Qt.Key.Key_Escape:
+            self._transient.end()
+            event.accept()
+            return
+
+        super().keyPressEvent(event)
+
+    # List the library's templates:
+    def _fill_template_menu(self, menu: QtWidgets.QMenu) -> None:
+
+        menu.clear()
+        library = TemplateLibrary.instance()
+        for template in library:
+            menu.addAction(
+                template.name,
+                lambda *_, key=template.key: self.create_item(
+                    "NodeItem", template=library.instantiate(key)
+                ),
+            )
+
+        if not len(library):
+            menu.addAction("No templates").setEnabled(False)
+
     # Method to create a new item
-    @staticmethod
-    def create_item(item_class: str):
+    def create_item(self, item_class: str, **kwargs):
 
         # Import graph items
         from ui.graph.node import NodeItem
         from ui.graph.handle import HandleItem
 
         _type = locals().get(item_class, None)
-        _item = _type(self._mpos)
+        _item = _type(self._mpos, **kwargs)
+        self.addItem(_item)
+        self.touch()
+
+        if isinstance(_item, NodeItem):
+            self.undo_stack.push(InsertCommand(self, [_item], text="Add node"))
+
+        return _item
+
+    # Record the state of the items a drag may change:
+    def _begin_gesture(self) -> tuple | None:
+
+        from ui.graph.node import NodeItem, ResizeHandle
+
+        grabber = self.mouseGrabberItem()
+        if isinstance(grabber, NodeItem):
+            nodes = {grabber, *(item for item in self.selectedItems() if isinstance(item, NodeItem))}
+            return "move", {node: node.pos().toTuple() for node in nodes}
+
+        if isinstance(grabber, ResizeHandle) and isinstance(node := grabber.parentItem(), NodeItem):
+            return "resize", node, node.attr["frame"].bottom()
+
+        return None
+
+    # Record a finished drag as one command:
+    def _end_gesture(self) -> None:
+
+        gesture, self._gesture = self._gesture, None
+        if gesture is None:
+            return
+
+        if gesture[0] == "move":
+            moves = {
+                node.attr["id"]: (before, node.pos().toTuple())
+                for node, before in gesture[1].items()
+                if node.scene() is self and node.pos().toTuple() != before
+            }
+            if moves:
+                self.undo_stack.push(MoveCommand(self, moves))
+
+        elif gesture[0] == "resize":
+            node, before = gesture[1], gesture[2]
+            if node.scene() is self and node.attr["frame"].bottom() != before:
+                self.undo_stack.push(ResizeCommand(self, node.attr["id"], before, node.attr["frame"].bottom()))
+
+    # Start dragging an edge out of a handle (connected to HandleItem.sig_handle_clicked):
+    def begin_transient(self, handle) -> None:
+
+        if self._transient.active() or handle.scene() is not self:
+            return
+
+        self._transient.begin(handle)
+
+    # Finish dragging an edge:
+    def end_transient(self, origin, target):
+        """
+        Connect the dragged handle to the handle it snapped to, if any.
+        :return: The new EdgeItem, or None.
+        """
+
+        from ui.graph.handle import HandleRole
+
+        if origin is None or target is None:
+            return None
+
+        # Edges always run from an output to an input:
+        if origin.attr["role"] == HandleRole.INP:
+            origin, target = target, origin
+
+        edge = self.connect_handles(origin, target)
+        if edge is not None:
+            self.touch()
+            self.undo_stack.push(ConnectCommand(self, edge))
+
+        return edge
+
+    # Connect two handles:
+    def connect_handles(self, origin, target, curve: str | None = None):
+        """
+        Add an edge from `origin` to `target`.
+        :return: The new EdgeItem, or None if either handle refuses the connection.
+        """
+
+        from ui.graph.edge import EdgeItem
+        from ui.graph.connections import HandleConnectionError
+
+        try:
+            edge = EdgeItem(origin=origin, target=target, curve=curve or self.edge_curve)
+        except HandleConnectionError:
+            return None
+
+        self.addItem(edge)
+        return edge
+
+    # Remove the edge(s) from `origin` to `target`:
+    def disconnect_handles(self, origin, target) -> None:
+
+        for edge in self.connections.edges_of(origin):
+            if self.connections.ends(edge) == (origin, target):
+                self.connections.disconnect(edge)
+                edge.detach()
+                self.removeItem(edge)
+
+    # Find nodes and handles by id:
+    def find_items(self, uids) -> dict:
+        """
+        :param uids: Serialized ids (`attr["id"]`) of nodes and/or handles.
+        :return: id -> item, for the ids found on the canvas.
+        """
+
+        return {uid: self.by_id[uid] for uid in uids if uid in self.by_id}
+
+    # Add serialized nodes and edges in one batch:
+    def insert_nodes(
+        self,
+        nodes: list[dict],
+        edges: list[dict] = (),
+        offset: QPointF = QPointF(),
+        keep_ids: bool = True,
+    ) -> tuple[list, list]:
+        """
+        Rebuild nodes from NodeItem.serialize_to_dict() output and reconnect them.
+        :param edges: {"origin": handle id, "target": handle id, "curve": str} records. With keep_ids=False, only edges
+                      between the inserted nodes are restored.
+        :return: (new nodes, new edges)
+        """
+
+        items: list = []
+        *_, links = self._insert_steps(nodes, edges, offset, keep_ids, items)
+        return items, links
+
+    # Steps of insert_nodes(): yields None after each node and edge, then the new edges:
+    def _insert_steps(self, nodes: list[dict], edges: list[dict], offset: QPointF, keep_ids: bool, items: list):
+
+        from ui.graph.node import NodeItem
+
+        index = self._begin_batch(len(nodes) + len(edges))
+
+        try:
+            handles = {}
+            for data in nodes:
+                node = NodeItem.from_dict(data, offset, keep_ids, handles)
+                self.addItem(node)
+                items.append(node)
+                yield None
+
+            # Edges to nodes that stayed on the canvas:
+            missing = {uid for edge in edges for uid in (edge["origin"], edge["target"]) if uid not in handles}
+            if keep_ids and missing:
+                handles.update(self.find_items(missing))
+
+            # Nodes may have been deleted meanwhile, when the insertion spans several event-loop ticks:
+            links = []
+            for edge in edges:
+                origin, target = handles.get(edge["origin"]), handles.get(edge["target"])
+                if origin is not None and target is not None and origin.scene() is self and target.scene() is self:
+                    if (link := self.connect_handles(origin, target, edge.get("curve"))) is not None:
+                        links.append(link)
+                yield None
+
+        finally:
+            self._set_index(index)
+
+        yield links
+
+    # Remove nodes and their edges in one batch:
+    def remove_nodes(self, nodes: list) -> dict:
+        """
+        :return: {"nodes": [...], "edges": [...]}, the input of insert_nodes() that restores them.
+        """
+
+        records, edges = [], {}
+        for node in nodes:
+            records.append(node.serialize_to_dict())
+            edges.update(dict.fromkeys(self.connections.edges_of_node(node)))
+
+        links = []
+        for edge in edges:
+            origin, target = self.connections.ends(edge)
+            links.append({"origin": origin.attr["id"], "target": target.attr["id"], "curve": edge.property("curve")})
+
+        index = self._begin_batch(len(nodes) + len(edges))
+
+        for edge in edges:
+            self.connections.disconnect(edge)
+            edge.detach()
+            self.removeItem(edge)
+
+        for node in nodes:
+            self.removeItem(node)
+
+        self._set_index(index)
+        return {"nodes": records, "edges": links}
+
+    # Copy the selected nodes (and the edges between them) to the clipboard:
+    def copy_selection(self) -> None:
+
+        from ui.graph.node import NodeItem
+        from ui.graph.clipboard import copy_nodes
+
+        copy_nodes(self, [item for item in self.selectedItems() if isinstance(item, NodeItem)])
+
+    # Paste the clipboard's nodes:
+    def paste(self, position: QPointF | None = None) -> list:
+        """
+        :param position: Scene position of the pasted selection's top-left node; by default the copy is shifted slightly.
+        """
+
+        from ui.graph.clipboard import paste_nodes
+
+        return paste_nodes(self, position)
+
+    # Insert copies of serialized nodes (undoable):
+    def paste_nodes(self, nodes: list[dict], edges: list[dict], offset: QPointF) -> list:
+        """
+        Insert nodes with new ids and select them, as one undo step.
+        :return: The new nodes. Large pastes are spread over several event-loop ticks, each building nodes for at most
+                 ClipboardOpts["budget"] seconds, so that the window stays responsive; the list fills up as they proceed.
+        """
+
+        from ui.graph.clipboard import ClipboardOpts
+
+        items: list = []
+        steps = self._insert_steps(nodes, edges, offset, False, items)
+
+        def run():
+            deadline = time.perf_counter() + ClipboardOpts["budget"]
+            for step in steps:
+                if step is not None:
+                    self._on_pasted([item for item in items if item.scene() is self])
+                    return
+
+                if time.perf_counter() > deadline:
+                    QtCore.QTimer.singleShot(0, self, run)  # Dropped if the canvas is deleted meanwhile.
+                    return
+
+        run()
+        return items
+
+    # Select the pasted nodes and record the paste:
+    def _on_pasted(self, items: list) -> None:
+
+        if not items:
+            return
+
+        self.clearSelection()
+        for item in items:
+            item.setSelected(True)
+
+        self.touch()
+        self.undo_stack.push(InsertCommand(self, items, text="Paste"))
+
+    # Delete nodes (undoable):
+    def delete_nodes(self, nodes: list) -> None:
+
+        if nodes:
+            self.undo_stack.push(RemoveCommand(self, nodes))
+
+    # Drop the item index for a large batch edit; small ones update the BSP tree in place, which is cheaper than a
+    # rebuild of the whole tree:
+    def _begin_batch(self, count: int) -> QtWidgets.QGraphicsScene.ItemIndexMethod:
+
+        index = self.itemIndexMethod()
+        if count > SceneOpts["batch"]:
+            self.setItemIndexMethod(QtWidgets.QGraphicsScene.ItemIndexMethod.NoIndex)
+        return index
+
+    # Restore the item index after a batch edit; returning to the BSP tree rebuilds it:
+    def _set_index(self, method: QtWidgets.QGraphicsScene.ItemIndexMethod) -> None:
+
+        if method == self.itemIndexMethod():
+            return
+
+        self.setItemIndexMethod(method)
+        if method == QtWidgets.QGraphicsScene.ItemIndexMethod.BspTreeIndex:
+            self.index_rebuilds += 1
+
+    # Qt rebuilds the BSP tree when the scene rect changes:
+    def _on_scene_rect_changed(self, *args) -> None:
+
+        if self.itemIndexMethod() == QtWidgets.QGraphicsScene.ItemIndexMethod.BspTreeIndex:
+            self.index_rebuilds += 1
+
+    # Mark the canvas as modified:
+    def touch(self, *args) -> int:
+
+        self.version += 1
+        self.sig_canvas_updated.emit()
+        return self.version
+
+    # Serialize the canvas to a project dictionary (see core.project):
+    def to_project(self) -> dict:
+
+        from ui.graph.node import NodeItem
+
+        nodes, templates = [], {}
+        for item in self.items():
+            if isinstance(item, NodeItem):
+                nodes.append(item.serialize_to_dict())
+                if item.template is not None:
+                    templates[item.template.key] = item.template.template.to_dict()
+
+        edges = [
+            {"origin": origin.attr["id"], "target": target.attr["id"]}
+            for _, origin, target in self.connections
+        ]
+
+        return {"templates": templates, "nodes": nodes, "edges": edges}
+
+    # Everything needed to rebuild the canvas (see restore):
+    def snapshot(self) -> dict:
+
+        from ui.graph.node import NodeItem
+        from ui.graph.bundle import BundleItem
+        from ui.graph.clipboard import selection
+
+        items = self.items()
+        data = selection(self, [item for item in items if isinstance(item, NodeItem)])
+        data["edge-curve"] = self.edge_curve
+        data["bundles"] = [item.serialize_to_dict() for item in items if isinstance(item, BundleItem)]
+        return data
+
+    # Rebuild the canvas from a snapshot, keeping the ids:
+    def restore(self, snapshot: dict) -> None:
+
+        from ui.graph.bundle import BundleItem
+
+        self.edge_curve = snapshot.get("edge-curve", self.edge_curve)
+        self.insert_nodes(snapshot["nodes"], snapshot["edges"], keep_ids=True)
+
+        if snapshot.get("bundles"):
+            edges = {(origin.attr["id"], target.attr["id"]): edge for edge, origin, target in self.connections}
+            for record in snapshot["bundles"]:
+                if (item := BundleItem.from_dict(record, edges)) is not None:
+                    self.addItem(item)
+
+        self.touch()
+
+    # Detach the undo history, e.g. to keep it while the canvas is evicted (see adopt_history):
+    def take_history(self) -> UndoStack:
+
+        stack = self.undo_stack
+        stack.setParent(None)
+
+        self.undo_stack = UndoStack(self)
+        self._menu = self._init_menu()
+        return stack
+
+    # Continue a history taken from another canvas, e.g. one restored from a snapshot of this canvas:
+    def adopt_history(self, stack: UndoStack) -> None:
+        """
+        Note:
+            - Commands find their items by id, and restore() keeps the ids; only their scene needs re-pointing.
+        """
+
+        for index in range(stack.count()):
+            if isinstance(command := stack.command(index), Command):
+                command._scene = self
+
+        previous, self.undo_stack = self.undo_stack, stack
+        stack.setParent(self)
+        previous.deleteLater()
+        self._menu = self._init_menu()
+
+    # Release the canvas's items, workers and history (the canvas cannot be used afterwards):
+    def release(self) -> None:
+
+        TemplateLibrary.instance().unsubscribe(self.on_template_updated)
+        self.router.shutdown()
+        if self._layout is not None:
+            self._layout.shutdown()
+        if self._map is not None:
+            self._map.shutdown()
+
+        self.undo_stack.clear()
+        self.setItemIndexMethod(QtWidgets.QGraphicsScene.ItemIndexMethod.NoIndex)
+        self.clear()
+
+        self.connections = ConnectionRegistry()
+        self.handles = HandleIndex()
+        self.by_id = {}
+        self._model, self._flagged, self._transient, self._map = None, [], None, None
+
+    # Get the model of the current canvas state:
+    def model(self) -> GraphModel:
+        """
+        Return a GraphModel of the canvas, rebuilt only if the canvas changed since the last call.
+        """
+
+        if self._model is None or self._model.version != self.version:
+            self._model = GraphModel.from_dict(self.to_project())
+            self._model.version = self.version
+
+        return self._model
+
+    # Validate the canvas and highlight the affected items:
+    def highlight_issues(self) -> list[Issue]:
+
+        from ui.graph.node import NodeItem
+        from ui.graph.handle import HandleItem
+
+        issues = validate(self.model())
+
+        # Map node and handle ids to nodes:
+        lookup = {}
+        for item in self.items():
+            if isinstance(item, NodeItem):
+                lookup[item.attr["id"]] = item
+            elif isinstance(item, HandleItem) and isinstance(item.parentItem(), NodeItem):
+                lookup[item.attr["id"]] = item.parentItem()
+
+        # Errors take precedence over warnings:
+        severity = {}
+        for issue in issues:
+            for uid in issue.ids:
+                if (node := lookup.get(uid)) is not None and severity.get(node) != "error":
+                    severity[node] = issue.severity
+
+        for node in self._flagged:
+            if node.scene() is self:
+                node.set_issue(None)
+
+        for node, level in severity.items():
+            node.set_issue(level)
+
+        self._flagged = list(severity)
+        return issues
+
+    # Arrange the nodes automatically:
+    def auto_layout(self, **kwargs) -> None:
+        """
+        Compute a layered layout of the canvas in the background and animate the nodes into place.
+        :param kwargs: Overrides of core.layout.LayoutOpts.
+        """
+
+        from ui.graph.autoLayout import AutoLayout
+
+        if self._layout is None:
+            self._layout = AutoLayout(self)
+
+        self._layout.run(**kwargs)
+
+    # Draw a map beneath the schematic:
+    def load_map(self, path: str) -> None:
+        """
+        Show the outlines of a GeoJSON file behind the nodes, coarse first and refined as the workers finish.
+        """
+
+        from ui.graph.mapLayer import MapLayer
+
+        if self._map is None:
+            self._map = MapLayer()
+            self.addItem(self._map)
+
+        self._map.load(path)
+
+    # Switch all edges between bezier and (routed) angular curves:
+    def set_edge_curve(self, curve: str) -> None:
+
+        from ui.graph.edge import EdgeItem
+
+        self.edge_curve = curve
+        for item in self.items():
+            if isinstance(item, EdgeItem) and getattr(item, "origin", None):
+                item.setProperty("curve", curve)
+                if item.origin() is not None and item.target() is not None:
+                    item.update_path(item.origin(), item.target())
+
+    # Bundle parallel edges into shared trunks:
+    def bundle_edges(self, **kwargs) -> list:
+        """
+        Bundle compatible edges (see core.bundling); each bundle is drawn as a single path.
+        :param kwargs: Overrides of core.bundling.BundleOpts.
+        """
+
+        from ui.graph.bundle import bundle_scene
+
+        return bundle_scene(self, **kwargs)
+
+    # Remove all bundles:
+    def unbundle_edges(self) -> None:
+
+        from ui.graph.bundle import unbundle_scene
+
+        unbundle_scene(self)
+
+    # Refresh the nodes of an edited template in one pass:
+    def on_template_updated(self, template, instances: list, changed: set[str]) -> None:
+
+        nodes = [
+            node
+            for instance in instances
+            if (node := instance.owner) is not None and node.scene() is self
+        ]
+
+        for node in nodes:
+            node.apply_template(changed)
+
+        if nodes:
+            self.update()
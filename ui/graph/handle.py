@@ -5,6 +5,7 @@
 # Import (standard)
 from __future__ import annotations
 import enum
+import dataclasses
 from typing import Any
 
 # Import (third party)
@@ -15,6 +16,7 @@ from PySide6 import QtWidgets
 
 # Import (local)
 from qtawesome import icon as qta_icon
+from ui.graph.paintProfiler import profiled
 
 
 # Default options for HandleItem:
@@ -36,6 +38,17 @@ class HandleConnectivity(enum.Enum):
     MANY_TO_MANY = enum.auto()
 
 
+# Class Stream:
+@dataclasses.dataclass(frozen=True)
+class Stream:
+    """
+    The resource a handle carries: its label (see GraphModel.streams) and display color.
+    """
+
+    LABEL: str = "Resource"
+    COLOR: QtGui.QColor = dataclasses.field(default_factory=lambda: QtGui.QColor(0x363E41))
+
+
 # Class Handle:
 class HandleItem(QtWidgets.QGraphicsObject):
 
@@ -65,7 +78,7 @@ class HandleItem(QtWidgets.QGraphicsObject):
             "role": role,
             "xpos": position.x(),
             "name": kwargs.get("name", "Resource"),
-            # "flow": kwargs.get("flow", BasicFlows["ItemFlow"]),
+            "flow": Stream(kwargs.get("flow", kwargs.get("name", "Resource"))),
             "frame": QtCore.QRectF(kwargs.get("frame", HandleOpts["frame"])),
             "color": QtGui.QColor(kwargs.get("color", HandleOpts["color"])),
             "icon-size": kwargs.get("icon-size", 12),
@@ -77,16 +90,9 @@ class HandleItem(QtWidgets.QGraphicsObject):
 
         # Sub-component initialization:
         self._anim = self._init_anim()
-        self._menu = self._init_menu()
-
-        self.connected = False
-        self.conjugate = None
-        self.connector = None
-
-        # Import:
-        from ui.graph.edge import EdgeItem
+        self._menu: QtWidgets.QMenu | None = None  # Built on first use (see contextMenuEvent).
 
-        self._connections: dict[EdgeItem, HandleItem] = {}
+        # Connections are kept in the scene's registry (see ui/graph/connections.py).
 
         # If provided, connect to the callback:
         if kwargs.get("callback", None):
@@ -170,6 +176,7 @@ class HandleItem(QtWidgets.QGraphicsObject):
         return frame
 
     # Reimplement paint(...):
+    @profiled
     def paint(self, painter, option, widget=...):
 
         color = QtGui.QColor(self.attr["color"])
@@ -195,9 +202,12 @@ class HandleItem(QtWidgets.QGraphicsObject):
         ):
             self.sig_handle_moved.emit(self)
 
+        # Handles of a node reach the canvas through the node's signal (see NodeItem.itemChange); only standalone
+        # handles connect themselves, so that a click starts one transient, not two:
         if (
             change == QtWidgets.QGraphicsObject.GraphicsItemChange.ItemSceneHasChanged
             and value
+            and self.parentItem() is None
         ):
             if hasattr(value, "begin_transient"):
                 self.sig_handle_clicked.connect(value.begin_transient)
@@ -207,6 +217,9 @@ class HandleItem(QtWidgets.QGraphicsObject):
     # Reimplementation of QtWidgets.QGraphicsObject.contextMenuEvent():
     def contextMenuEvent(self, event, /):
 
+        if self._menu is None:
+            self._init_menu()
+
         # Clear the flow-menu:
         self._flow_submenu.clear()
 
@@ -246,7 +259,7 @@ class HandleItem(QtWidgets.QGraphicsObject):
         if self.scene():
             self.scene().clearSelection()
 
-        if not self.connected and event.button() == QtCore.Qt.MouseButton.LeftButton:
+        if self.is_connectable() and event.button() == QtCore.Qt.MouseButton.LeftButton:
             self.sig_handle_clicked.emit(self)
 
         else:
@@ -277,33 +290,75 @@ class HandleItem(QtWidgets.QGraphicsObject):
         action = self.sender()
         pass
 
-    # When the user connects this handle to another:
-    def pair(
-        self, connector: QtWidgets.QGraphicsObject, conjugate: "HandleItem"
-    ) -> None:
-        self.connected = True
-        self.connector = connector
-        self.conjugate = conjugate
+    # The scene's connection registry:
+    @property
+    def registry(self):
+        return getattr(self.scene(), "connections", None)
+
+    # Handle connectivity (ONE_TO_ONE or MANY_TO_MANY):
+    @property
+    def connectivity(self) -> HandleConnectivity:
+        return self._connectivity
+
+    @connectivity.setter
+    def connectivity(self, value: HandleConnectivity) -> None:
+        self._connectivity = value
+
+    # Whether at least one edge is attached:
+    @property
+    def connected(self) -> bool:
+        return self.registry is not None and self.registry.degree(self) > 0
+
+    # Attached edges:
+    def edges(self) -> set:
+        return self.registry.edges_of(self) if self.registry is not None else set()
 
-    # When the user disconnects this handle from another:
-    def free(self, mirror: bool = True) -> None:
+    # Handles at the other end of the attached edges:
+    def conjugates(self) -> list["HandleItem"]:
+        return self.registry.conjugates(self) if self.registry is not None else []
 
-        if mirror and self.connector and self.conjugate:
-            self.connector.hide()
-            self.conjugate.free(mirror=False)  # Avoids infinite recursion.
+    # When the user disconnects this handle from all others:
+    def free(self) -> None:
 
-        self.connected = False
-        self.connector = None
-        self.conjugate = None
+        registry, scene = self.registry, self.scene()
+        if registry is None:
+            return
+
+        for edge in registry.edges_of(self):
+            registry.disconnect(edge)
+            edge.detach()
+            scene.removeItem(edge)
+
+    # Set the handle's stream (and, with mirror=True, that of the connected handles):
+    def set_stream(self, label: str, mirror: bool = True, color: QtGui.QColor | None = None) -> None:
+
+        self.attr["flow"] = Stream(label, QtGui.QColor(color) if color is not None else self.attr["flow"].COLOR)
+        self.attr["name"] = label
+        self.update()
+
+        if mirror:
+            for handle in self.conjugates():
+                handle.set_stream(label, mirror=False, color=self.attr["flow"].COLOR)
+
+    # Serialize the handle to a JSON-compatible dictionary:
+    def serialize_to_dict(self) -> dict:
+
+        return {
+            "id": self.attr["id"],
+            "name": self.attr["name"],
+            "flow": self.attr["flow"].LABEL,
+            "color": self.attr["color"].name(),
+            "cpos": {"x": self.pos().x(), "y": self.pos().y()},
+            "connectivity": self._connectivity.name,
+        }
 
     # Method to check if the handle can be connected to:
     def is_connectable(self) -> bool:
 
-        if self.connected:
+        if self._connectivity == HandleConnectivity.MANY_TO_MANY:
             return True
 
-        else:
-            return not len(self._connections)
+        return not self.connected
 
     # Declare the `radius` property using the `@Property` decorator to register with Qt's metaobject system:
     @QtCore.Property(float)
@@ -0,0 +1,152 @@
+# Encoding: utf-8
+# Module name: handleIndex
+# Description: Uniform-grid index of handle positions for nearest-handle queries
+
+# Imports (standard)
+from __future__ import annotations
+import math
+from typing import TYPE_CHECKING, Callable, Iterator
+
+if TYPE_CHECKING:
+    from ui.graph.handle import HandleItem, HandleRole
+
+# Default options:
+HandleIndexOpts = {
+    "cell": 64.0,  # Cell size in scene units; queries are cheapest when the radius is about a cell or less.
+}
+
+
+# Class HandleIndex:
+class HandleIndex:
+    """
+    The canvas's handles bucketed by scene position, one grid per role.
+
+    Note:
+        - Positions are cached at insertion and refreshed from `HandleItem.sig_handle_moved`, so a query never calls
+          into Qt and only visits the cells that overlap the search radius.
+        - Stream labels are read when queried, so changing a handle's stream needs no update.
+    """
+
+    def __init__(self, **kwargs):
+        self._cell = float(kwargs.get("cell", HandleIndexOpts["cell"]))
+        self._grids: dict[HandleRole, dict[tuple[int, int], dict[HandleItem, tuple[float, float]]]] = {}
+        self._where: dict[HandleItem, tuple[int, int]] = {}  # Handle -> cell.
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, handle: HandleItem) -> bool:
+        return handle in self._where
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Mutation
+
+    def insert(self, handle: HandleItem) -> None:
+        """
+        Add a handle and follow its moves.
+        """
+
+        if handle in self._where:
+            return
+
+        self._place(handle)
+        handle.sig_handle_moved.connect(self.update)
+
+    def remove(self, handle: HandleItem) -> None:
+
+        cell = self._where.pop(handle, None)
+        if cell is None:
+            return
+
+        grid = self._grids[handle.attr["role"]]
+        bucket = grid[cell]
+        del bucket[handle]
+        if not bucket:
+            del grid[cell]
+
+        handle.sig_handle_moved.disconnect(self.update)
+
+    def update(self, handle: HandleItem) -> None:
+        """
+        Refresh a handle's position (connected to `sig_handle_moved`).
+        """
+
+        cell = self._where.get(handle)
+        if cell is None:
+            return
+
+        grid = self._grids[handle.attr["role"]]
+        bucket = grid[cell]
+        del bucket[handle]
+        if not bucket:
+            del grid[cell]
+
+        self._place(handle)
+
+    def _place(self, handle: HandleItem) -> None:
+
+        x, y = handle.scenePos().toTuple()
+        cell = (math.floor(x / self._cell), math.floor(y / self._cell))
+        grid = self._grids.setdefault(handle.attr["role"], {})
+        grid.setdefault(cell, {})[handle] = (x, y)
+        self._where[handle] = cell
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Queries
+
+    def within(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        role: HandleRole | None = None,
+        label: str | None = None,
+    ) -> Iterator[tuple[float, HandleItem]]:
+        """
+        Handles within `radius` of (x, y).
+        :param role: Only handles of this role.
+        :param label: Only handles carrying this stream.
+        :return: (squared distance, handle) pairs, in no particular order.
+        """
+
+        size, limit = self._cell, radius * radius
+        cx0, cx1 = math.floor((x - radius) / size), math.floor((x + radius) / size)
+        cy0, cy1 = math.floor((y - radius) / size), math.floor((y + radius) / size)
+        grids = [self._grids.get(role, {})] if role is not None else list(self._grids.values())
+
+        for grid in grids:
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    bucket = grid.get((cx, cy))
+                    if bucket is None:
+                        continue
+
+                    for handle, (hx, hy) in bucket.items():
+                        distance = (hx - x) ** 2 + (hy - y) ** 2
+                        if distance <= limit and (label is None or handle.attr["flow"].LABEL == label):
+                            yield distance, handle
+
+    def nearest(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        role: HandleRole | None = None,
+        label: str | None = None,
+        accept: Callable[[HandleItem], bool] | None = None,
+    ) -> HandleItem | None:
+        """
+        The closest handle within `radius` of (x, y) that passes the filters.
+        :param accept: Optional predicate applied after the role and label filters.
+        """
+
+        best, best_distance = None, math.inf
+        for distance, handle in self.within(x, y, radius, role, label):
+            if distance < best_distance and (accept is None or accept(handle)):
+                best, best_distance = handle, distance
+
+        return best
+
+
+# Exported names
+__all__ = ["HandleIndex", "HandleIndexOpts"]
@@ -4,6 +4,7 @@
 
 # Import(s):
 from PySide6 import QtSvg, QtCore, QtWidgets, QtGui
+from ui.graph.paintProfiler import profiled
 
 # Default options:
 ImageOpts = {
@@ -47,6 +48,7 @@ class Image(QtWidgets.QGraphicsObject):
         )
 
     # Reimplementation of QGraphicsObject.paint():
+    @profiled
     def paint(self, painter, option, widget=None):
         """
         Paints the SVG icon using the QSvgRenderer.
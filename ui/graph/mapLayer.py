@@ -0,0 +1,186 @@
+# Encoding: utf-8
+# Module name: mapLayer
+# Description: A progressively refined map layer whose geometry is built in background worker processes
+
+# Imports (standard)
+from __future__ import annotations
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Imports (third party)
+from PySide6 import QtGui, QtCore, QtWidgets
+
+# Imports (local)
+from core.geometry import GeometryOpts
+from events.messages import GeometryFailed, GeometryProgress
+from events.widgetEvents import EventBus
+from ui.graph.mapWorker import build_path, read_path
+
+# Default map-layer options:
+MapOpts = {
+    "scale": 20.0,  # Scene units per degree.
+    "workers": max(1, min(4, (os.cpu_count() or 2) - 1)),
+    "pen": QtGui.QPen(QtGui.QColor(0x8A9499), 0.0),
+    "brush": QtGui.QBrush(QtGui.QColor(0x2E363A)),
+}
+
+
+# Class GeometryLoader:
+class GeometryLoader(QtCore.QObject):
+    """
+    Builds map geometry in a pool of worker processes and delivers it on the GUI thread.
+
+    Note:
+        - Workers build each level's QPainterPath and return it serialized through shared memory; only small headers
+          are pickled, and the GUI thread merely deserializes the path.
+        - Levels are submitted coarse-to-fine, progress is reported to the EventBus.
+    """
+
+    # Signals:
+    sig_level_ready = QtCore.Signal(str, int, QtGui.QPainterPath)
+    _sig_future_done = QtCore.Signal(object)  # Internal, crosses from the executor thread.
+
+    # Default constructor:
+    def __init__(self, parent: QtCore.QObject | None = None, **kwargs):
+        super().__init__(parent)
+
+        self._workers = kwargs.get("workers", MapOpts["workers"])
+        self._levels = tuple(kwargs.get("levels", GeometryOpts["levels"]))
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending: dict[str, int] = {}
+
+        # Signals emitted from the executor's thread are queued onto this object's thread:
+        self._sig_future_done.connect(self._on_future_done)
+
+    # Lazily start the process pool:
+    def _pool(self) -> ProcessPoolExecutor:
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        return self._executor
+
+    # Load a GeoJSON file:
+    def load(self, path: str, scale: float = MapOpts["scale"]) -> None:
+        """
+        Schedule all levels of detail for the given file, coarsest first.
+        :param path: Path to a GeoJSON file on disk.
+        :param scale: Scene units per degree.
+        """
+
+        self._pending[path] = self._pending.get(path, 0) + len(self._levels)
+        for level, tolerance in enumerate(self._levels):
+            future = self._pool().submit(build_path, path, level, tolerance, scale)
+            future.add_done_callback(lambda done, path=path: self._sig_future_done.emit((path, done)))
+
+    # Shut down the worker pool:
+    def shutdown(self) -> None:
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # Callback (GUI thread) when a worker finishes a level:
+    @QtCore.Slot(object)
+    def _on_future_done(self, item: tuple) -> None:
+
+        path, future = item
+        if future.cancelled():
+            return
+
+        # Every finished level counts, failed ones included:
+        self._pending[path] = remaining = self._pending.get(path, 1) - 1
+        if remaining <= 0:
+            self._pending.pop(path, None)
+
+        bus = EventBus.instance()
+        try:
+            header = future.result()
+            route = read_path(header)
+
+        except Exception as exception:
+            logging.getLogger(__name__).error(f"Geometry worker failed: {exception}")
+            bus.publish(GeometryFailed(str(exception)))
+            return
+
+        bus.publish(
+            GeometryProgress(
+                path=path,
+                level=header["level"],
+                levels=len(self._levels),
+                remaining=max(0, remaining),
+                points=header["points"],
+            )
+        )
+
+        self.sig_level_ready.emit(path, header["level"], route)
+
+
+# Class MapLayer:
+class MapLayer(QtWidgets.QGraphicsObject):
+    """
+    A scene item that draws map outlines, showing coarse geometry first and swapping in finer levels as they arrive.
+    """
+
+    # Default constructor:
+    def __init__(
+        self,
+        path: str | None = None,
+        parent: QtWidgets.QGraphicsObject | None = None,
+        **kwargs,
+    ):
+        super().__init__(parent)
+        super().setZValue(-100)  # Draw beneath all schematic items.
+
+        self.attr = {
+            "path": path,
+            "level": -1,  # Finest level currently displayed.
+            "scale": kwargs.get("scale", MapOpts["scale"]),
+        }
+
+        self._route = QtGui.QPainterPath()
+        self._loader = kwargs.get("loader", None) or GeometryLoader(self)
+        self._loader.sig_level_ready.connect(self.on_level_ready)
+
+        if path:
+            self.load(path)
+
+    # Load a map file:
+    def load(self, path: str) -> None:
+
+        self.attr["path"] = path
+        self.attr["level"] = -1
+        self._loader.load(path, self.attr["scale"])
+
+    # Reimplement QGraphicsObject.boundingRect():
+    def boundingRect(self) -> QtCore.QRectF:
+        return self._route.boundingRect()
+
+    # Reimplement QGraphicsObject.paint():
+    def paint(self, painter, option, /, widget=...):
+
+        painter.setPen(MapOpts["pen"])
+        painter.setBrush(MapOpts["brush"])
+        painter.drawPath(self._route)
+
+    # Callback when the loader delivers a level:
+    @QtCore.Slot(str, int, QtGui.QPainterPath)
+    def on_level_ready(self, path: str, level: int, route: QtGui.QPainterPath) -> None:
+
+        # Discard stale files and levels coarser than the one already displayed:
+        if path != self.attr["path"] or level <= self.attr["level"]:
+            return
+
+        self.prepareGeometryChange()
+        self._route = route
+        self.attr["level"] = level
+        self.update()
+
+    # Stop the loader's workers:
+    def shutdown(self) -> None:
+        self._loader.shutdown()
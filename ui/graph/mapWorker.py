@@ -0,0 +1,76 @@
+# Encoding: utf-8
+# Module name: mapWorker
+# Description: Builds the painter paths of map levels inside worker processes (see ui/graph/mapLayer.py)
+
+# Imports (standard)
+from __future__ import annotations
+from multiprocessing import shared_memory
+
+# Imports (third party)
+from PySide6 import QtGui, QtCore
+
+# Imports (local)
+from core.geometry import level_arrays
+
+
+# Worker entry point:
+def build_path(path: str, level: int, tolerance: float, scale: float) -> dict:
+    """
+    Build one level-of-detail of a GeoJSON file as a QPainterPath and publish it, serialized, through shared memory.
+    The caller owns the shared-memory block and must release it (see `read_path`).
+    :param scale: Scene units per degree.
+    :return: A picklable header describing the shared-memory block.
+
+    Note:
+        - QPainterPath and QDataStream need no QGuiApplication, so workers only import QtCore and QtGui.
+    """
+
+    coords, offsets, _ = level_arrays(path, tolerance)
+    coords = coords * (scale, -scale)  # Latitude grows upwards.
+
+    route = QtGui.QPainterPath()
+    route.setFillRule(QtCore.Qt.FillRule.WindingFill)
+    for first, last in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        route.addPolygon(QtGui.QPolygonF([QtCore.QPointF(x, y) for x, y in coords[first:last].tolist()]))
+
+    data = QtCore.QByteArray()
+    stream = QtCore.QDataStream(data, QtCore.QIODevice.OpenModeFlag.WriteOnly)
+    stream << route
+
+    block = shared_memory.SharedMemory(create=True, size=max(data.size(), 1))
+    try:
+        block.buf[: data.size()] = data.data()
+    finally:
+        block.close()
+
+    return {
+        "path": path,
+        "level": level,
+        "block": block.name,
+        "bytes": data.size(),
+        "points": len(coords),
+        "rings": len(offsets) - 1,
+    }
+
+
+# Read (and release) a path published by `build_path`:
+def read_path(header: dict) -> QtGui.QPainterPath:
+    """
+    Deserialize a level's path (a single copy, no per-point work) and unlink its block.
+    """
+
+    block = shared_memory.SharedMemory(name=header["block"])
+    try:
+        data = QtCore.QByteArray(bytes(block.buf[: header["bytes"]]))
+    finally:
+        block.close()
+        block.unlink()
+
+    route = QtGui.QPainterPath()
+    stream = QtCore.QDataStream(data)
+    stream >> route
+    return route
+
+
+# Exported names
+__all__ = ["build_path", "read_path"]
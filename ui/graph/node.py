@@ -9,10 +9,14 @@ import types
 from qtawesome import icon as qta_icon
 from PySide6 import QtGui, QtCore, QtWidgets
 
-from ui.components import Label
+from core.templates import TemplateInstance, TemplateLibrary
+from events.messages import ItemUpdated
+from events.widgetEvents import EventBus
+from ui.components import StaticLabel
 from ui.graph.image import Image
 from ui.graph.anchor import AnchorItem
-from ui.graph.handle import HandleItem, HandleRole
+from ui.graph.paintProfiler import profiled
+from ui.graph.handle import HandleItem, HandleRole, HandleConnectivity
 
 # Default vertex options:
 NodeOpts = {
@@ -27,6 +31,8 @@ NodeOpts = {
         "pen": {
             "normal": QtGui.QPen(QtGui.QColor(0x3A4043), 2.0),
             "select": QtGui.QPen(QtGui.QColor(0xFFCB00), 2.0),
+            "error": QtGui.QPen(QtGui.QColor(0xE5484D), 2.0),
+            "warning": QtGui.QPen(QtGui.QColor(0xF76B15), 2.0),
         },
         "brush": {
             "normal": QtGui.QBrush(QtGui.QColor(0x3A4043)),
@@ -120,6 +126,7 @@ class NodeItem(QtWidgets.QGraphicsObject):
         self.setAcceptHoverEvents(True)
         self.setFlag(QtWidgets.QGraphicsObject.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QtWidgets.QGraphicsObject.GraphicsItemFlag.ItemIsSelectable)
+        self.setFlag(QtWidgets.QGraphicsObject.GraphicsItemFlag.ItemSendsGeometryChanges)
 
         # Handle database:
         self.setProperty("style", NodeOpts["style"])
@@ -127,11 +134,20 @@ class NodeItem(QtWidgets.QGraphicsObject):
             inp=dict(), out=dict(), par=dict(), eqn=list()
         )
 
+        # Templated nodes share their template's parameters and (immutable) equations and store only overrides:
+        self.template: TemplateInstance | None = kwargs.get("template", None)
+        if self.template is not None:
+            self.template.owner = self
+            self.database.par = self.template.par
+            self.database.eqn = self.template.eqn  # A tuple, see core.templates.NodeTemplate.
+
         # Initialize an attribute dictionary for serialization and deserialization.
         # This is simpler and faster than using Qt's property system:
         self.attr = {
             "id": id(self),
-            "name": kwargs.get("name", "Process"),
+            "name": kwargs.get(
+                "name", self.template.name if self.template else "Process"
+            ),
             "icon": kwargs.get("icon", None),
             "limit": NodeOpts["frame"].bottom(),
             "frame": QtCore.QRectF(kwargs.get("frame", NodeOpts["frame"])),
@@ -166,7 +182,7 @@ class NodeItem(QtWidgets.QGraphicsObject):
         self._image.setOpacity(0.20)
 
         # Vertex-label:
-        self._label = Label(
+        self._label = StaticLabel(
             parent=self,
             label=self.attr["name"],
             color=QtCore.Qt.GlobalColor.white,
@@ -177,16 +193,62 @@ class NodeItem(QtWidgets.QGraphicsObject):
         self._label.sig_text_changed.connect(self.on_text_changed)
 
         # Initialize configurator and menu:
-        self._menu = self._init_menu()
+        self._menu: QtWidgets.QMenu | None = None  # Built on first use (see contextMenuEvent).
         self._register_with_bus()
 
+        # Create the template's handles:
+        if self.template is not None:
+            self._sync_handles()
+
+    # Forward item updates to the application-wide EventBus:
+    def _register_with_bus(self):
+
+        bus = EventBus.instance()
+        self.sig_item_updated.connect(lambda item: bus.publish(ItemUpdated(item)))
+
+    # Match the node's handles to the template's definitions (in order):
+    def _sync_handles(self):
+
+        for role, definitions, existing in (
+            (HandleRole.INP, self.template.get("inp"), self.database.inp),
+            (HandleRole.OUT, self.template.get("out"), self.database.out),
+        ):
+            handles = list(existing)
+
+            # Handles with a definition follow it; a changed stream disconnects the handle's edges:
+            for handle, definition in zip(handles, definitions):
+                name = definition.get("name", definition.get("flow", "Resource"))
+                flow = definition.get("flow", definition.get("name", "Resource"))
+                if handle.attr["flow"].LABEL != flow:
+                    handle.free()
+                    handle.set_stream(flow, mirror=False)
+                handle.attr["name"] = name
+                handle.connectivity = HandleConnectivity[definition.get("connectivity", "ONE_TO_ONE")]
+                handle.update()
+
+            # Handles without one are removed with their edges:
+            for handle in handles[len(definitions):]:
+                self.remove_handle(handle)
+
+            anchor = self._inp_anchor if role == HandleRole.INP else self._out_anchor
+            for index in range(len(existing), len(definitions)):
+                definition = definitions[index]
+                handle = self.create_handle(
+                    role,
+                    QtCore.QPointF(anchor.x(), 12 * index - 12),
+                    name=definition.get("name", definition.get("flow", "Resource")),
+                    flow=definition.get("flow", definition.get("name", "Resource")),
+                    connectivity=HandleConnectivity[definition.get("connectivity", "ONE_TO_ONE")],
+                )
+                self._set_limit(handle)
+
     # Context-menu initializer:
     def _init_menu(self):
 
         menu = QtWidgets.QMenu()
         edit = menu.addAction(qta_icon("mdi.pencil"), "Configure", self.configure)
         lock = menu.addAction(qta_icon("mdi.lock"), "Lock")
-        delete = menu.addAction(qta_icon("mdi.delete"), "Delete")
+        delete = menu.addAction(qta_icon("mdi.delete"), "Delete", self.delete)
 
         edit.setIconVisibleInMenu(True)
         lock.setIconVisibleInMenu(True)
@@ -213,10 +275,13 @@ class NodeItem(QtWidgets.QGraphicsObject):
         return self.attr["frame"].adjusted(-4, -4, 4, 4)
 
     # Reimplementation of QtWidgets.QGraphicsObject.paint():
+    @profiled
     def paint(self, painter, option, /, widget=...):
 
-        # Stylize the painter:
-        pen = self.property("style")["pen"]["select" if self.isSelected() else "normal"]
+        # Stylize the painter (validation issues are shown on the outline):
+        pen = self.property("style")["pen"][
+            "select" if self.isSelected() else self.property("issue") or "normal"
+        ]
         brush = self.property("style")["brush"][
             "select" if self.isSelected() else "normal"
         ]
@@ -243,13 +308,51 @@ class NodeItem(QtWidgets.QGraphicsObject):
         # Flag alias:
         scene_flag = QtWidgets.QGraphicsObject.GraphicsItemChange.ItemSceneHasChanged
 
+        # Report changes to the canvas's version counter while in a scene:
+        if change == scene_flag and hasattr(value, "touch"):
+            self.sig_item_updated.connect(value.touch)
+            self.sig_handle_created.connect(value.touch)
+
+        # Disconnect from the canvas that the node is leaving (the connections are made again on re-insertion):
+        if change == QtWidgets.QGraphicsObject.GraphicsItemChange.ItemSceneChange and (old := self.scene()):
+            if hasattr(old, "touch"):
+                self.sig_item_updated.disconnect(old.touch)
+                self.sig_handle_created.disconnect(old.touch)
+            if hasattr(old, "begin_transient"):
+                self.sig_handle_clicked.disconnect(old.begin_transient)
+
+        # Keep the canvas's handle index in sync with the node's handles:
+        if change == QtWidgets.QGraphicsObject.GraphicsItemChange.ItemSceneChange:
+            if (index := getattr(self.scene(), "handles", None)) is not None:
+                for handle in (*self.database.inp, *self.database.out):
+                    index.remove(handle)
+        elif change == scene_flag and (index := getattr(value, "handles", None)) is not None:
+            for handle in (*self.database.inp, *self.database.out):
+                index.insert(handle)
+
+        # Likewise the canvas's id lookup (see GraphicsScene.find_items):
+        if change == QtWidgets.QGraphicsObject.GraphicsItemChange.ItemSceneChange:
+            if (ids := getattr(self.scene(), "by_id", None)) is not None:
+                for item in (self, *self.database.inp, *self.database.out):
+                    if ids.get(item.attr["id"]) is item:
+                        del ids[item.attr["id"]]
+        elif change == scene_flag and (ids := getattr(value, "by_id", None)) is not None:
+            ids.update((item.attr["id"], item) for item in (self, *self.database.inp, *self.database.out))
+
+        # Keep the canvas's edge router informed of the node's extent (see ui/graph/edgeRouter.py):
+        router = getattr(self.scene(), "router", None)
+        if router is not None:
+            if change == QtWidgets.QGraphicsObject.GraphicsItemChange.ItemSceneChange and value is None:
+                router.obstacle_removed(self)
+            elif change in (
+                scene_flag,
+                QtWidgets.QGraphicsObject.GraphicsItemChange.ItemPositionHasChanged,
+            ):
+                router.obstacle_moved(self)
+
         # Connect to the canvas's begin_transient() method when added to a scene:
-        """ 
-        if change == scene_flag and isinstance(value, GraphicsScene):
-            self.sig_item_updated.connect(value.sig_canvas_updated)
-            self.sig_handle_created.connect(value.sig_canvas_updated)
+        if change == scene_flag and hasattr(value, "begin_transient"):
             self.sig_handle_clicked.connect(value.begin_transient)
-        """
 
         # Invoke the base-class implementation:
         return super().itemChange(change, value)
@@ -270,9 +373,11 @@ class NodeItem(QtWidgets.QGraphicsObject):
             self.setSelected(True)
 
         # Display context-menu:
-        if hasattr(self, "_menu"):
-            self._menu.exec(event.screenPos())
-            event.accept()
+        if self._menu is None:
+            self._menu = self._init_menu()
+
+        self._menu.exec(event.screenPos())
+        event.accept()
 
     # Reimplementation of QtWidgets.QGraphicsObject.hoverEnterEvent():
     def hoverEnterEvent(self, event) -> None:
@@ -324,6 +429,9 @@ class NodeItem(QtWidgets.QGraphicsObject):
         # Redraw to avoid artifacts:
         self.update(self.boundingRect().adjusted(-2, -48, 2, 48))
 
+        if (router := getattr(self.scene(), "router", None)) is not None:
+            router.obstacle_moved(self)
+
     # When an anchor is clicked:
     def on_anchor_clicked(self, cpos: QtCore.QPointF):
 
@@ -351,9 +459,15 @@ class NodeItem(QtWidgets.QGraphicsObject):
     # When the label text is changed:
     def on_text_changed(self, text: str):
 
-        # Update the label property:
-        self.attr["name"] = text
-        self.sig_item_updated.emit(self)
+        before = self.attr["name"]
+        if text == before:
+            return
+
+        self.rename(text)
+        if (stack := getattr(self.scene(), "undo_stack", None)) is not None:
+            from ui.graph.undo import RenameCommand
+
+            stack.push(RenameCommand(self.scene(), self.attr["id"], before, text))
 
     # ------------------------------------------------------------------------------------------------------------------
     # Functions that allow programmatic state change. These may return complex objects, and therefore cannot be directly
@@ -366,20 +480,42 @@ class NodeItem(QtWidgets.QGraphicsObject):
         inp = [handle.serialize_to_dict() for handle in self.database.inp.keys()]
         out = [handle.serialize_to_dict() for handle in self.database.out.keys()]
 
-        # Serialize parameters:
-        par = copy.deepcopy(self.database.par)
+        # Serialize parameters and equations (only the overrides of templated nodes):
+        if self.template is not None:
+            diff = copy.deepcopy(self.template.diff())
+            par, eqn = diff.get("par", {}), list(diff.get("eqn", []))
+        else:
+            par, eqn = copy.deepcopy(self.database.par), list(self.database.eqn)
 
         # Construct the dictionary:
         data = {
             "attr": copy.deepcopy(self.attr),
-            "database": {"inp": inp, "out": out, "par": par},
+            "database": {"inp": inp, "out": out, "par": par, "eqn": eqn},
             "cpos": {"x": self.scenePos().x(), "y": self.scenePos().y()},
         }
 
+        if self.template is not None:
+            data["template"] = self.template.key
+
         return data
 
+    # Refresh this node after its template was edited (see GraphicsScene.on_template_updated):
+    def apply_template(self, changed: set[str]):
+
+        if "name" in changed and "name" not in self.template.overrides:
+            self.attr["name"] = self.template.name
+            self._label.setPlainText(self.template.name)
+
+        if "eqn" in changed:
+            self.database.eqn = self.template.eqn  # A tuple, see core.templates.NodeTemplate.
+
+        if changed & {"inp", "out"}:
+            self._sync_handles()
+
+        self.sig_item_updated.emit(self)
+
     # Create a new handle at the specified position:
-    def create_handle(self, role: HandleRole | str, cpos: QtCore.QPointF) -> HandleItem:
+    def create_handle(self, role: HandleRole | str, cpos: QtCore.QPointF, **kwargs) -> HandleItem:
         """
         Returns a new handle of the specified role (INP or OUT) at the given position relative to the vertex.
         Can be used with LLM function-calling frameworks (`role` must be a string in that case).
@@ -399,6 +535,7 @@ class NodeItem(QtWidgets.QGraphicsObject):
             cpos,  # Handle's position relative to the vertex.
             self,
             callback=self.sig_handle_clicked,  # Callback function when the handle is clicked.
+            **kwargs,
         )
 
         # Add the handle to the database:
@@ -407,44 +544,171 @@ class NodeItem(QtWidgets.QGraphicsObject):
         else:
             self.database.out[handle] = True
 
+        if (index := getattr(self.scene(), "handles", None)) is not None:
+            index.insert(handle)
+        if (ids := getattr(self.scene(), "by_id", None)) is not None:
+            ids[handle.attr["id"]] = handle
+
         # Return the new handle:
         return handle
 
+    # Remove a handle and its edges:
+    def remove_handle(self, handle: HandleItem):
+
+        handle.free()  # Disconnects and removes the edges through the canvas's registry.
+        if (index := getattr(self.scene(), "handles", None)) is not None:
+            index.remove(handle)
+        if (ids := getattr(self.scene(), "by_id", None)) is not None and ids.get(handle.attr["id"]) is handle:
+            del ids[handle.attr["id"]]
+
+        self.database.inp.pop(handle, None)
+        self.database.out.pop(handle, None)
+        if (scene := handle.scene()) is not None:
+            scene.removeItem(handle)
+        else:
+            handle.setParentItem(None)
+
+        self.sig_item_updated.emit(self)
+
     # Method to create a new parameter:
     def create_parameter(self, name: str = "Parameter", /):
+        self.set_parameter(name, True)
+
+    # Set or remove (value=None) a parameter:
+    def set_parameter(self, name: str, value, /, undoable: bool = True):
+
+        before = self.database.par.get(name)
+        if undoable and (stack := getattr(self.scene(), "undo_stack", None)) is not None:
+            from ui.graph.undo import ParameterCommand
+
+            stack.push(ParameterCommand(self.scene(), self.attr["id"], name, before, value))
+            return
+
+        if value is None:
+            self.database.par.pop(name, None)
+        else:
+            self.database.par[name] = value
 
-        self.database.par[name] = True
         self.sig_item_updated.emit(self)
 
-    # Delete this vertex:
-    def delete(self):
+    # Rename the vertex:
+    def rename(self, text: str):
+
+        self.attr["name"] = text
+        if self._label.toPlainText() != text:
+            self._label.setPlainText(text)
+
+        if self.template is not None:
+            self.template.override("name", None if text == self.template.template.name else text)
         self.sig_item_updated.emit(self)
-        self.scene().removeItem(self)
 
-    # Clone this vertex:
-    def clone(self) -> "NodeItem":
+    # Move the bottom edge of the vertex's frame:
+    def set_height(self, bottom: float):
+        self._resize_handle.setY(bottom)  # See on_resize_handle_moved().
+
+    # Delete this vertex (undoable when the canvas has an undo stack):
+    def delete(self):
 
-        # Create a new vertex with the same properties:
-        vertex = NodeItem(
-            cpos=self.scenePos() + QtCore.QPointF(25, 25),
-            icon=self.property("icon"),
-            limit=self.attr["limit"],
-            frame=self.attr["frame"],
-            style=self.attr["style"],
-            name=self.attr["name"],
+        scene = self.scene()
+        if scene is None:
+            return
+
+        if hasattr(scene, "delete_nodes"):
+            scene.delete_nodes([self])
+            return
+
+        self.sig_item_updated.emit(self)
+        if (registry := getattr(scene, "connections", None)) is not None:
+            registry.detach_node(self)  # All edges in one batch.
+        scene.removeItem(self)
+
+    # Rebuild a vertex from serialize_to_dict() output:
+    @classmethod
+    def from_dict(
+        cls,
+        data: dict,
+        offset: QtCore.QPointF = QtCore.QPointF(),
+        keep_ids: bool = True,
+        handles: dict | None = None,
+    ) -> "NodeItem":
+        """
+        Returns a new vertex (not yet added to a scene) with the serialized attributes, handles and parameters.
+        :param data: A dictionary produced by serialize_to_dict().
+        :param offset: Added to the serialized position.
+        :param keep_ids: Whether the vertex and its handles keep their serialized ids (e.g. when undoing a deletion).
+        :param handles: If given, filled with serialized handle id -> new handle.
+        """
+
+        attr, database = data["attr"], data["database"]
+        library = TemplateLibrary.instance()
+
+        # Templated vertices store overrides only:
+        template = None
+        if (key := data.get("template")) is not None and key in library:
+            overrides = {"par": dict(database["par"])} if database["par"] else {}
+            if database["eqn"]:
+                overrides["eqn"] = list(database["eqn"])
+            if attr["name"] != library[key].name:
+                overrides["name"] = attr["name"]
+            template = library.instantiate(key, overrides)
+
+        vertex = cls(
+            QtCore.QPointF(data["cpos"]["x"], data["cpos"]["y"]) + offset,
+            name=attr["name"],
+            icon=attr.get("icon"),
+            frame=attr["frame"],
+            template=template,
         )
 
-        # Return the new vertex:
+        if template is None:
+            vertex.database.par = copy.deepcopy(database["par"])
+            vertex.database.eqn = list(database["eqn"])
+
+        # Template handles already exist and are matched in order, the others are created:
+        for role, records, existing in (
+            (HandleRole.INP, database["inp"], vertex.database.inp),
+            (HandleRole.OUT, database["out"], vertex.database.out),
+        ):
+            current = list(existing)
+            for index, record in enumerate(records):
+                cpos = QtCore.QPointF(record["cpos"]["x"], record["cpos"]["y"])
+                if index < len(current):
+                    handle = current[index]
+                    handle.setPos(cpos)
+                else:
+                    handle = vertex.create_handle(
+                        role,
+                        cpos,
+                        name=record["name"],
+                        flow=record["flow"],
+                        color=record["color"],
+                        connectivity=HandleConnectivity[record.get("connectivity", "ONE_TO_ONE")],
+                    )
+
+                vertex._set_limit(handle)
+                if keep_ids:
+                    handle.attr["id"] = record["id"]
+                if handles is not None:
+                    handles[record["id"]] = handle
+
+        if keep_ids:
+            vertex.attr["id"] = attr["id"]
+
+        vertex.on_resize_handle_moved()  # Fit the anchors to the restored frame.
         return vertex
 
+    # Clone this vertex:
+    def clone(self) -> "NodeItem":
+        return NodeItem.from_dict(self.serialize_to_dict(), QtCore.QPointF(25, 25), keep_ids=False)
+
     # Toggle focus on the vertex's label:
     def toggle_focus(self, focus=True):
 
         if focus:
-            self._label.setFocus(QtCore.Qt.FocusReason.MouseFocusReason)
+            self._label.edit()
 
         else:
-            self._label.clearFocus()
+            self._label.finish()
 
     # Open a configuration widget for this vertex:
     def configure(self):
@@ -461,6 +725,12 @@ class NodeItem(QtWidgets.QGraphicsObject):
             viewer.centerOn(self)
             self.setSelected(True)
 
+    # Mark the vertex with a validation issue ("error", "warning" or None):
+    def set_issue(self, severity: str | None):
+
+        self.setProperty("issue", severity)
+        self.update()
+
     # Get the vertex's icon:
     def icon(self):
         return self._image.to_icon()
@@ -0,0 +1,170 @@
+# Encoding: utf-8
+# Module name: paintProfiler
+# Description: Frame-time and per-class paint-cost profiling of a GraphicsView, shown as an overlay
+
+# Imports (standard)
+from __future__ import annotations
+import time
+import functools
+import collections
+from typing import Callable
+
+# Imports (third party)
+from PySide6 import QtCore, QtWidgets
+
+# Default options:
+PaintProfilerOpts = {
+    "window": 60,  # Frames averaged in the overlay.
+    "refresh": 250,  # Overlay refresh interval (ms).
+    "classes": ("NodeItem", "EdgeItem", "HandleItem", "Label", "StaticLabel", "Image"),  # Always listed, even when not painted.
+}
+
+# The profiler of the frame being painted, if that view is profiled (see PaintProfiler.begin_frame):
+_frame: PaintProfiler | None = None
+
+
+# Decorator for QGraphicsItem.paint reimplementations:
+def profiled(paint: Callable) -> Callable:
+    """
+    Time `paint` per item class while a profiled view paints a frame.
+
+    Note:
+        - Outside a profiled frame, the wrapper only tests a module global before calling through.
+        - PySide caches each item's `paint` on its first call, so the wrapper is applied where the method is
+          defined rather than swapped in when profiling starts.
+    """
+
+    @functools.wraps(paint)
+    def wrapper(self, *args, **kwargs):
+
+        profiler = _frame
+        if profiler is None:
+            return paint(self, *args, **kwargs)
+
+        start = time.perf_counter_ns()
+        try:
+            return paint(self, *args, **kwargs)
+        finally:
+            profiler.add(type(self).__name__, time.perf_counter_ns() - start)
+
+    return wrapper
+
+
+# Class PaintProfiler:
+class PaintProfiler:
+    """
+    Paint statistics of one view over its last `window` frames.
+
+    Note:
+        - Paint times are exclusive: Qt paints child items (labels, handles, ...) separately from their parents.
+        - Index rebuilds are those of the scene's BSP tree (see GraphicsScene.index_rebuilds): rebuilds caused by
+          scene-rect changes and batch edits, not Qt's internal re-balancing.
+    """
+
+    def __init__(self, **kwargs):
+
+        self._opts = {**PaintProfilerOpts, **kwargs}
+        self._frames: collections.deque = collections.deque(maxlen=self._opts["window"])
+        self._current: dict[str, list[int]] = {}  # Class -> [items, ns] of the frame being painted.
+        self._start = 0
+        self._outer: PaintProfiler | None = None
+
+    # Called by the wrapper of `profiled`:
+    def add(self, name: str, elapsed: int) -> None:
+
+        entry = self._current.get(name)
+        if entry is None:
+            self._current[name] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def begin_frame(self) -> None:
+
+        global _frame
+        self._outer, _frame = _frame, self
+        self._current = {}
+        self._start = time.perf_counter_ns()
+
+    def end_frame(self, rebuilds: int = 0) -> None:
+
+        global _frame
+        self._frames.append((time.perf_counter_ns() - self._start, self._current, rebuilds))
+        _frame, self._outer = self._outer, None
+
+    def clear(self) -> None:
+        self._frames.clear()
+
+    # Averages over the window:
+    def stats(self) -> dict:
+        """
+        :return: {"frames", "frame_ms", "frame_max_ms", "items", "rebuilds", "classes": {class: (items, ms)}}, with
+                 per-frame averages of the item counts and times.
+        """
+
+        frames = len(self._frames)
+        classes = {name: [0, 0] for name in self._opts["classes"]}
+        if not frames:
+            return {"frames": 0, "frame_ms": 0.0, "frame_max_ms": 0.0, "items": 0.0, "rebuilds": 0, "classes": {}}
+
+        for _, current, _ in self._frames:
+            for name, (items, elapsed) in current.items():
+                entry = classes.setdefault(name, [0, 0])
+                entry[0] += items
+                entry[1] += elapsed
+
+        durations = [frame[0] for frame in self._frames]
+        return {
+            "frames": frames,
+            "frame_ms": sum(durations) / frames / 1e6,
+            "frame_max_ms": max(durations) / 1e6,
+            "items": sum(entry[0] for entry in classes.values()) / frames,
+            "rebuilds": self._frames[-1][2],
+            "classes": {name: (items / frames, elapsed / frames / 1e6) for name, (items, elapsed) in classes.items()},
+        }
+
+    # Overlay text:
+    def report(self) -> str:
+
+        stats = self.stats()
+        lines = [
+            f"frame  {stats['frame_ms']:7.2f} ms  (max {stats['frame_max_ms']:.2f})",
+            f"items  {stats['items']:7.0f} / frame",
+            f"index  {stats['rebuilds']:7d} rebuilds",
+        ]
+
+        ranked = sorted(stats["classes"].items(), key=lambda entry: entry[1][1], reverse=True)
+        lines.extend(f"{name:<12} {items:6.0f} {elapsed:7.2f} ms" for name, (items, elapsed) in ranked)
+        return "\n".join(lines)
+
+
+# Class PaintOverlay:
+class PaintOverlay(QtWidgets.QLabel):
+    """
+    Shows a PaintProfiler's report in the top-left corner of a view, refreshed on a timer (not on every frame, so that
+    showing it does not cause repaints of the canvas).
+    """
+
+    def __init__(self, profiler: PaintProfiler, parent: QtWidgets.QWidget, **kwargs):
+        super().__init__(parent)
+
+        self._profiler = profiler
+        self.setAttribute(QtCore.Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "QLabel { background: rgba(0, 0, 0, 160); color: #E0E0E0; font-family: monospace; font-size: 11px;"
+            " padding: 6px; border-radius: 4px; }"
+        )
+        self.move(8, 8)
+
+        self._timer = QtCore.QTimer(self, interval=kwargs.get("refresh", PaintProfilerOpts["refresh"]))
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start()
+        self.refresh()
+
+    def refresh(self) -> None:
+        self.setText(self._profiler.report())
+        self.adjustSize()
+
+
+# Exported names
+__all__ = ["PaintProfilerOpts", "PaintProfiler", "PaintOverlay", "profiled"]
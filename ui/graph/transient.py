@@ -0,0 +1,122 @@
+# Encoding: utf-8
+# Module name: transient
+# Description: A lightweight preview of an edge while it is being dragged out of a handle
+
+# Imports (standard)
+from __future__ import annotations
+
+# Imports (third party)
+from PySide6 import QtGui, QtCore, QtWidgets
+
+# Imports (local)
+from ui.graph.handle import HandleItem, HandleRole
+
+# Default options:
+TransientOpts = {
+    "snap": 24.0,  # Snapping radius in scene units.
+    "slack": 0.40,  # As EdgeOpts["slack"].
+    "pen": QtGui.QPen(QtGui.QColor(0x899878), 2.0, QtCore.Qt.PenStyle.DashLine, QtCore.Qt.PenCapStyle.RoundCap),
+    "snapped": QtGui.QPen(QtGui.QColor(0xFFCB00), 2.0, QtCore.Qt.PenStyle.SolidLine, QtCore.Qt.PenCapStyle.RoundCap),
+}
+
+
+# Class TransientEdge:
+class TransientEdge(QtWidgets.QGraphicsPathItem):
+    """
+    The edge preview shown while dragging from a handle.
+
+    Note:
+        - One instance per canvas is reused for every drag; it only ever changes its path, so each mouse move repaints
+          the union of the old and new path bounds and nothing else.
+        - It has no arrow, no animation and does not take part in hit-testing.
+    """
+
+    def __init__(self, parent: QtWidgets.QGraphicsItem | None = None):
+        super().__init__(parent)
+
+        self.setZValue(100)
+        self.setPen(TransientOpts["pen"])
+        self.setAcceptedMouseButtons(QtCore.Qt.MouseButton.NoButton)
+        self.setAcceptHoverEvents(False)
+        self.hide()
+
+        self.origin: HandleItem | None = None
+        self.snapped: HandleItem | None = None
+
+    # Start dragging from a handle:
+    def begin(self, origin: HandleItem) -> None:
+
+        self.origin = origin
+        self.snapped = None
+        self.setPath(QtGui.QPainterPath())
+        self.show()
+
+    # Follow the cursor, snapping to the nearest compatible handle:
+    def drag(self, cursor: QtCore.QPointF) -> HandleItem | None:
+
+        self.snapped = self.nearest(cursor)
+        final = self.snapped.scenePos() if self.snapped is not None else cursor
+        self.setPen(TransientOpts["snapped" if self.snapped is not None else "pen"])
+        self.setPath(self.curve(self.origin.scenePos(), final, self.origin.attr["role"]))
+        return self.snapped
+
+    # Stop dragging:
+    def end(self) -> tuple[HandleItem | None, HandleItem | None]:
+        """
+        :return: (origin, snapped handle or None)
+        """
+
+        result = self.origin, self.snapped
+        self.origin = self.snapped = None
+        self.hide()
+        return result
+
+    # Whether a drag is in progress:
+    def active(self) -> bool:
+        return self.origin is not None
+
+    # Nearest handle within the snapping radius that the origin may connect to:
+    def nearest(self, cursor: QtCore.QPointF) -> HandleItem | None:
+
+        role = HandleRole.OUT if self.origin.attr["role"] == HandleRole.INP else HandleRole.INP
+        return self.scene().handles.nearest(
+            cursor.x(), cursor.y(), TransientOpts["snap"], role=role, accept=self.compatible
+        )
+
+    # Whether the origin may connect to a handle:
+    def compatible(self, handle: HandleItem) -> bool:
+
+        origin = self.origin
+        if handle is origin or handle.attr["role"] == origin.attr["role"]:
+            return False
+
+        if handle.parentItem() is not None and handle.parentItem() is origin.parentItem():
+            return False
+
+        if not handle.is_connectable():
+            return False
+
+        # Connected handles keep their stream, free ones adopt the origin's:
+        return not handle.connected or handle.attr["flow"].LABEL == origin.attr["flow"].LABEL
+
+    # The preview curve (the same shape as EdgeItem's bezier):
+    @staticmethod
+    def curve(initial: QtCore.QPointF, final: QtCore.QPointF, role: HandleRole) -> QtGui.QPainterPath:
+
+        if role == HandleRole.INP:
+            initial, final = final, initial  # Always drawn from output to input.
+
+        slack = TransientOpts["slack"] if initial.x() < final.x() else -10 * TransientOpts["slack"]
+        dx, dy = final.x() - initial.x(), final.y() - initial.y()
+
+        path = QtGui.QPainterPath(initial)
+        path.cubicTo(
+            QtCore.QPointF(initial.x() + dx * slack, initial.y() + dy * 0.25),
+            QtCore.QPointF(initial.x() + dx * (1 - slack), final.y() - dy * 0.25),
+            final,
+        )
+        return path
+
+
+# Exported names
+__all__ = ["TransientEdge", "TransientOpts"]
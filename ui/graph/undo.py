@@ -0,0 +1,405 @@
+# Encoding: utf-8
+# Module name: undo
+# Description: Undoable canvas edits, recorded as compact diffs on a memory-bounded QUndoStack
+
+# Imports (standard)
+from __future__ import annotations
+import sys
+from typing import TYPE_CHECKING, Any
+
+# Imports (third party)
+from PySide6 import QtCore, QtGui
+
+if TYPE_CHECKING:
+    from ui.graph.graphicsScene import GraphicsScene
+
+# Default options:
+UndoOpts = {
+    "limit": 0,  # Maximum number of commands (0 = unlimited).
+    "memory": 16 * 2**20,  # Approximate bytes of history kept before the oldest commands are evicted.
+}
+
+
+# Approximate size of a command's payload:
+def _footprint(value: Any) -> int:
+
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_footprint(k) + _footprint(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(_footprint(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# Class Command:
+class Command(QtGui.QUndoCommand):
+    """
+    Base class of the canvas's commands.
+
+    Note:
+        - Commands refer to nodes and handles by their serialized ids (`attr["id"]`), which survive removal and
+          re-insertion, and only store what changed.
+        - Commands created with `done=True` record an edit that was already applied (e.g. at the end of a drag), so
+          their first `redo` does nothing.
+        - An evicted command has dropped its payload and lies below its stack's undo floor (see UndoStack).
+    """
+
+    def __init__(self, scene: GraphicsScene, text: str, done: bool = False):
+        super().__init__(text)
+
+        self._scene = scene
+        self._done = done
+        self._size = 0
+        self._stack: UndoStack | None = None  # Set while the command is on a stack, which then tracks its size.
+        self.evicted = False
+
+    # Payload size in bytes; changes are reported to the stack's running total:
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @size.setter
+    def size(self, value: int) -> None:
+
+        if self._stack is not None:
+            self._stack._total += value - self._size
+        self._size = value
+
+    # Reimplement QUndoCommand.redo():
+    def redo(self) -> None:
+
+        if self._done:
+            self._done = False
+            return
+
+        self.apply()
+        self._scene.touch()
+
+    # Reimplement QUndoCommand.undo():
+    def undo(self) -> None:
+
+        self.revert()
+        self._scene.touch()
+
+    # Drop the payload; the command can no longer be undone:
+    def evict(self) -> None:
+
+        self.evicted = True
+        self.size = 0
+
+    # Make the change; overridden by every command (a no-op here, since abc cannot enforce it on Qt classes):
+    def apply(self) -> None:
+        pass
+
+    # Take the change back; overridden by every command:
+    def revert(self) -> None:
+        pass
+
+
+# Class InsertCommand:
+class InsertCommand(Command):
+    """
+    Nodes (and their edges) added to the canvas, e.g. created or pasted.
+
+    Note:
+        - While the nodes are on the canvas only their ids are kept; they are serialized when the command is undone
+          and rebuilt from that record on redo.
+    """
+
+    def __init__(self, scene: GraphicsScene, nodes: list, done: bool = True, text: str = "Add nodes"):
+        super().__init__(scene, text, done)
+
+        self._uids = [node.attr["id"] for node in nodes]
+        self._record: dict | None = None
+        self.size = _footprint(self._uids)
+
+    def _remove(self) -> None:
+
+        nodes = list(self._scene.find_items(self._uids).values())
+        self._record = self._scene.remove_nodes(nodes)
+        self.size = _footprint(self._uids) + sum(
+            len(records) * _footprint(records[0]) for records in self._record.values() if records
+        )  # Records of one kind are about the same size, so one is measured.
+
+    def _insert(self) -> None:
+
+        self._scene.insert_nodes(self._record["nodes"], self._record["edges"], keep_ids=True)
+        self._record = None
+        self.size = _footprint(self._uids)
+
+    def apply(self) -> None:
+        self._insert()
+
+    def revert(self) -> None:
+        self._remove()
+
+    def evict(self) -> None:
+        super().evict()
+        self._record = None
+
+
+# Class RemoveCommand:
+class RemoveCommand(InsertCommand):
+    """
+    Nodes (and their edges) removed from the canvas.
+    """
+
+    def __init__(self, scene: GraphicsScene, nodes: list, text: str = "Delete nodes"):
+        super().__init__(scene, nodes, done=False, text=text)
+
+    def apply(self) -> None:
+        self._remove()
+
+    def revert(self) -> None:
+        self._insert()
+
+
+# Class MoveCommand:
+class MoveCommand(Command):
+    """
+    Nodes moved by one drag gesture.
+    """
+
+    def __init__(self, scene: GraphicsScene, moves: dict[int, tuple[tuple, tuple]], done: bool = True):
+        """
+        :param moves: Node id -> ((x, y) before, (x, y) after).
+        """
+        super().__init__(scene, "Move nodes", done)
+
+        self._moves = moves
+        self.size = _footprint(moves)
+
+    def _place(self, which: int) -> None:
+
+        for uid, node in self._scene.find_items(self._moves).items():
+            node.setPos(*self._moves[uid][which])
+
+    def apply(self) -> None:
+        self._place(1)
+
+    def revert(self) -> None:
+        self._place(0)
+
+    def evict(self) -> None:
+        super().evict()
+        self._moves = {}
+
+
+# Class ResizeCommand:
+class ResizeCommand(Command):
+    """
+    A node's frame resized by dragging its resize-handle.
+    """
+
+    def __init__(self, scene: GraphicsScene, uid: int, before: float, after: float, done: bool = True):
+        super().__init__(scene, "Resize node", done)
+
+        self._uid, self._heights = uid, (before, after)
+        self.size = 64
+
+    def _resize(self, which: int) -> None:
+
+        if (node := self._scene.find_items([self._uid]).get(self._uid)) is not None:
+            node.set_height(self._heights[which])
+
+    def apply(self) -> None:
+        self._resize(1)
+
+    def revert(self) -> None:
+        self._resize(0)
+
+
+# Class ConnectCommand:
+class ConnectCommand(Command):
+    """
+    An edge drawn between two handles.
+    """
+
+    def __init__(self, scene: GraphicsScene, edge, done: bool = True):
+        super().__init__(scene, "Connect", done)
+
+        self._ends = (edge.origin().attr["id"], edge.target().attr["id"])
+        self._curve = edge.property("curve")
+        self.size = 64
+
+    def apply(self) -> None:
+
+        handles = self._scene.find_items(self._ends)
+        if len(handles) == 2:
+            self._scene.connect_handles(handles[self._ends[0]], handles[self._ends[1]], self._curve)
+
+    def revert(self) -> None:
+
+        handles = self._scene.find_items(self._ends)
+        if len(handles) == 2:
+            self._scene.disconnect_handles(handles[self._ends[0]], handles[self._ends[1]])
+
+
+# Class RenameCommand:
+class RenameCommand(Command):
+    """
+    A node renamed.
+    """
+
+    def __init__(self, scene: GraphicsScene, uid: int, before: str, after: str, done: bool = True):
+        super().__init__(scene, "Rename node", done)
+
+        self._uid, self._names = uid, (before, after)
+        self.size = _footprint(self._names)
+
+    def _rename(self, which: int) -> None:
+
+        if (node := self._scene.find_items([self._uid]).get(self._uid)) is not None:
+            node.rename(self._names[which])
+
+    def apply(self) -> None:
+        self._rename(1)
+
+    def revert(self) -> None:
+        self._rename(0)
+
+
+# Class ParameterCommand:
+class ParameterCommand(Command):
+    """
+    A node's parameter set or removed (`None`). Consecutive edits of the same parameter merge into one command.
+    """
+
+    def __init__(self, scene: GraphicsScene, uid: int, name: str, before: Any, after: Any, done: bool = False):
+        super().__init__(scene, f"Edit '{name}'", done)
+
+        self._uid, self._name, self._values = uid, name, (before, after)
+        self.size = _footprint(self._values)
+
+    def _set(self, which: int) -> None:
+
+        if (node := self._scene.find_items([self._uid]).get(self._uid)) is not None:
+            node.set_parameter(self._name, self._values[which], undoable=False)
+
+    def apply(self) -> None:
+        self._set(1)
+
+    def revert(self) -> None:
+        self._set(0)
+
+    # Reimplement QUndoCommand.id():
+    def id(self) -> int:
+        return 1
+
+    # Reimplement QUndoCommand.mergeWith():
+    def mergeWith(self, other: QtGui.QUndoCommand) -> bool:
+
+        if not isinstance(other, ParameterCommand) or (other._uid, other._name) != (self._uid, self._name):
+            return False
+
+        self._values = (self._values[0], other._values[1])
+        self.size = _footprint(self._values)
+        return True
+
+
+# Class UndoStack:
+class UndoStack(QtGui.QUndoStack):
+    """
+    The canvas's undo history.
+
+    Note:
+        - When the history outgrows `memory` bytes (or `limit` commands), the oldest applied commands are evicted
+          (see Command.evict) and the undo floor rises above them: `undo`, `canUndo` and the action made by
+          `createUndoAction` stop there. QUndoStack cannot delete commands from its bottom, so the emptied commands
+          stay in place below the floor.
+        - The history's size is a running total, updated by the commands themselves (see Command.size).
+    """
+
+    def __init__(self, parent=None, **kwargs):
+        super().__init__(parent)
+
+        self._opts = {**UndoOpts, **kwargs}
+        self._floor = 0  # Number of evicted commands at the bottom of the stack.
+        self._total = 0
+        self.indexChanged.connect(self._enforce)
+
+    # Approximate size of the history in bytes:
+    def footprint(self) -> int:
+        return self._total
+
+    # Reimplement QUndoStack.push():
+    def push(self, command: QtGui.QUndoCommand) -> None:
+
+        # Commands that could be redone are deleted by the push:
+        for index in range(self.index(), self.count()):
+            self._release(self.command(index))
+
+        head = self.index()
+        if isinstance(command, Command):
+            command._stack = self
+            self._total += command.size
+
+        super().push(command)
+
+        # Merged (or obsolete) commands are deleted instead of being pushed:
+        if self.count() <= head and isinstance(command, Command):
+            self._release(command)
+
+    # Reimplement QUndoStack.clear():
+    def clear(self) -> None:
+
+        super().clear()
+        self._floor = self._total = 0
+
+    # Reimplement QUndoStack.canUndo():
+    def canUndo(self) -> bool:
+        return self.index() > self._floor
+
+    # Reimplement QUndoStack.undo():
+    def undo(self) -> None:
+
+        if self.canUndo():
+            super().undo()
+
+    # Reimplement QUndoStack.createUndoAction():
+    def createUndoAction(self, parent: QtCore.QObject, prefix: str = "") -> QtGui.QAction:
+
+        action = QtGui.QAction(parent)
+        action.setShortcuts(QtGui.QKeySequence.StandardKey.Undo)
+        action.triggered.connect(self.undo)
+
+        def sync(*args):
+            action.setEnabled(self.canUndo())
+            action.setText(f"{prefix or 'Undo'} {self.undoText() if self.canUndo() else ''}".rstrip())
+
+        self.indexChanged.connect(sync)
+        action.destroyed.connect(lambda *args: self.indexChanged.disconnect(sync))
+        sync()
+        return action
+
+    # Stop tracking a command that leaves the stack:
+    def _release(self, command: QtGui.QUndoCommand) -> None:
+
+        if isinstance(command, Command) and command._stack is self:
+            self._total -= command.size
+            command._stack = None
+
+    # Evict the oldest commands until the history fits its caps:
+    def _enforce(self, *args) -> None:
+
+        memory, limit = self._opts["memory"], self._opts["limit"]
+        while self._floor < self.index() - 1:  # The most recent applied command is always kept.
+            if self._total <= memory and (not limit or self.index() - self._floor <= limit):
+                break
+
+            self.command(self._floor).evict()
+            self._floor += 1
+
+
+# Exported names
+__all__ = [
+    "UndoOpts",
+    "UndoStack",
+    "Command",
+    "InsertCommand",
+    "RemoveCommand",
+    "MoveCommand",
+    "ResizeCommand",
+    "ConnectCommand",
+    "RenameCommand",
+    "ParameterCommand",
+]
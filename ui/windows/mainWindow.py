@@ -12,8 +12,11 @@ from PySide6 import QtGui, QtCore, QtWidgets
 from qtawesome import icon as qta_icon
 
 # Imports (local)
+from core.solver import solve
+from events.messages import OpenInTab
 from events.widgetEvents import EventBus
 from ui.components.graphicsView import GraphicsView
+from ui.components.sankeyView import open_sankey
 from ui.components.tabbedWidget import TabbedWidget
 from ui.components.toolbar import ToolBar
 from ui.sidebar.sidebar import SideBar
@@ -82,7 +85,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 (qta_icon("mdi.folder", color="#ffcb00"), "Open", None),
                 (qta_icon("mdi.content-save", color="lightblue"), "Save", None),
                 (qta_icon("mdi.language-python", color="#bd6b73"), "Run", None),
-                (qta_icon("mdi.chart-box", color="#899878"), "Run", None),
+                (qta_icon("mdi.chart-box", color="#899878"), "Sankey", self.show_sankey),
             ],
         )
 
@@ -101,16 +104,7 @@ class MainWindow(QtWidgets.QMainWindow):
         )
 
         bus = EventBus.instance()
-        bus.instruction.emit(
-            {
-                "command": "open_in_tab",
-                "payload": {
-                    "widget": GraphicsView(None),
-                    "label": "Home",
-                    "icon": QtGui.QIcon(),
-                },
-            }
-        )
+        bus.publish(OpenInTab(widget=GraphicsView(None), label="Home", icon=QtGui.QIcon()))
 
         return tab_widget
 
@@ -127,6 +121,19 @@ class MainWindow(QtWidgets.QMainWindow):
         view_menu = menubar.addMenu("View")
         help_menu = menubar.addMenu("Help")
 
+        # Undo and redo act on the current canvas:
+        edit_menu.addAction("Undo", self.undo).setShortcut(QtGui.QKeySequence.StandardKey.Undo)
+        edit_menu.addAction("Redo", self.redo).setShortcut(QtGui.QKeySequence.StandardKey.Redo)
+        edit_menu.addSeparator()
+        edit_menu.addAction("Copy", self.copy).setShortcut(QtGui.QKeySequence.StandardKey.Copy)
+        edit_menu.addAction("Paste", self.paste).setShortcut(QtGui.QKeySequence.StandardKey.Paste)
+
+        # Map outlines behind the current canvas:
+        file_menu.addAction("Load map...", self.load_map)
+
+        # Frame-time and paint-cost overlay of the current canvas:
+        view_menu.addAction("Paint profiler", self.toggle_profiler).setShortcut(QtGui.QKeySequence("F12"))
+
         # Traffic light indicators
         traffic_lights = ToolBar(
             self,
@@ -175,6 +182,68 @@ class MainWindow(QtWidgets.QMainWindow):
         if sidebar:
             sidebar.setVisible(not sidebar.isVisible())
 
+    # Slot to solve the current canvas and open its Sankey diagram
+    @QtCore.Slot()
+    def show_sankey(self):
+        """
+        Solve the model of the current canvas and show its flows as a Sankey diagram in a new tab.
+        """
+        view = self._tabview.currentWidget()
+        if not isinstance(view, GraphicsView):
+            return
+
+        model = view.scene().model()
+        result = solve(model)
+        if not result.success:
+            self._logger.warning(f"Cannot show Sankey diagram: {result.message}")
+            return
+
+        open_sankey(model, result.flows, label=f"Sankey ({self._tabview.tabText(self._tabview.currentIndex())})")
+
+    # Slots to undo and redo the last edit of the current canvas
+    @QtCore.Slot()
+    def undo(self):
+        view = self._tabview.currentWidget()
+        if isinstance(view, GraphicsView):
+            view.scene().undo_stack.undo()
+
+    @QtCore.Slot()
+    def redo(self):
+        view = self._tabview.currentWidget()
+        if isinstance(view, GraphicsView):
+            view.scene().undo_stack.redo()
+
+    # Slot to show or hide the paint profiler of the current canvas
+    @QtCore.Slot()
+    def toggle_profiler(self):
+        view = self._tabview.currentWidget()
+        if isinstance(view, GraphicsView):
+            view.set_profiling(not view.profiling)
+
+    # Slot to draw a GeoJSON map behind the current canvas
+    @QtCore.Slot()
+    def load_map(self):
+        view = self._tabview.currentWidget()
+        if not isinstance(view, GraphicsView):
+            return
+
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Load map", "", "GeoJSON (*.geojson *.json)")
+        if path:
+            view.scene().load_map(path)
+
+    # Slots to copy and paste the selection of the current canvas
+    @QtCore.Slot()
+    def copy(self):
+        view = self._tabview.currentWidget()
+        if isinstance(view, GraphicsView):
+            view.scene().copy_selection()
+
+    @QtCore.Slot()
+    def paste(self):
+        view = self._tabview.currentWidget()
+        if isinstance(view, GraphicsView):
+            view.scene().paste()
+
     @QtCore.Slot()
     def toggle_maximize(self):
         """